@@ -0,0 +1,206 @@
+"""initial schema
+
+Everything create_all() used to build on each startup. ai_remedy_cache is
+only created when missing: databases from before migrations kept it across
+restarts (see app/db/migrate.py).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 19:46:59.116313
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def create_ai_remedy_cache() -> None:
+    op.create_table('ai_remedy_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('symptom_key', sa.String(), nullable=False),
+    sa.Column('lang', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('response', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('symptom_key', 'lang', 'model', name='uq_ai_remedy_cache_key')
+    )
+    op.create_index(op.f('ix_ai_remedy_cache_id'), 'ai_remedy_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_remedy_cache_model'), 'ai_remedy_cache', ['model'], unique=False)
+
+
+def upgrade() -> None:
+    # trigram indexes for doctor search
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    if not sa.inspect(op.get_bind()).has_table('ai_remedy_cache'):
+        create_ai_remedy_cache()
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.String(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('generic_name', sa.String(), nullable=True),
+    sa.Column('brand', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('original_price', sa.Float(), nullable=True),
+    sa.Column('image', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('prescription_required', sa.Boolean(), nullable=True),
+    sa.Column('in_stock', sa.Boolean(), nullable=True),
+    sa.Column('pack_size', sa.String(), nullable=True),
+    sa.Column('dosage', sa.String(), nullable=True),
+    sa.Column('manufacturer', sa.String(), nullable=True),
+    sa.Column('uses', sa.JSON(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('reviews', sa.Integer(), nullable=True),
+    sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(generic_name, '')), 'A') || setweight(to_tsvector('simple'::regconfig, coalesce(brand, '') || ' ' || coalesce(category, '')), 'B') || setweight(to_tsvector('simple'::regconfig, coalesce(manufacturer, '') || ' ' || coalesce(uses::text, '')), 'C')", persisted=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_products_id'), 'products', ['id'], unique=False)
+    op.create_index('ix_products_price', 'products', ['price'], unique=False)
+    op.create_index(op.f('ix_products_product_id'), 'products', ['product_id'], unique=True)
+    op.create_index('ix_products_search_vector', 'products', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_table('remedies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('remedy_id', sa.String(), nullable=True),
+    sa.Column('symptoms', sa.JSON(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('remedies_list', sa.JSON(), nullable=True),
+    sa.Column('warning', sa.String(), nullable=True),
+    sa.Column('audio_text', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_remedies_id'), 'remedies', ['id'], unique=False)
+    op.create_index(op.f('ix_remedies_remedy_id'), 'remedies', ['remedy_id'], unique=True)
+    op.create_table('seed_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.String(), nullable=False),
+    sa.Column('seeded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_superuser', sa.Boolean(), nullable=True),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_full_name'), 'users', ['full_name'], unique=False)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('doctors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('doctor_id', sa.String(), nullable=True),
+    sa.Column('name', sa.JSON(), nullable=True),
+    sa.Column('qualification', sa.JSON(), nullable=True),
+    sa.Column('specialization', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('experience', sa.JSON(), nullable=True),
+    sa.Column('image', sa.String(), nullable=True),
+    sa.Column('rating', sa.Float(), nullable=True),
+    sa.Column('reviews', sa.Integer(), nullable=True),
+    sa.Column('availability', sa.Boolean(), nullable=True),
+    sa.Column('fees', sa.Integer(), nullable=True),
+    sa.Column('languages', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('bio', sa.JSON(), nullable=True),
+    sa.Column('available_slots', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('specialization_search', sa.String(), sa.Computed("lower(coalesce(specialization->>'en', '') || ' ' || coalesce(specialization->>'hi', '') || ' ' || coalesce(specialization->>'pa', ''))", persisted=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index('ix_doctors_available', 'doctors', ['id'], unique=False, postgresql_where='availability')
+    op.create_index('ix_doctors_available_slots', 'doctors', ['available_slots', 'id'], unique=False, postgresql_where='available_slots > 0')
+    op.create_index(op.f('ix_doctors_doctor_id'), 'doctors', ['doctor_id'], unique=True)
+    op.create_index('ix_doctors_fees', 'doctors', ['fees'], unique=False)
+    op.create_index(op.f('ix_doctors_id'), 'doctors', ['id'], unique=False)
+    op.create_index('ix_doctors_languages_gin', 'doctors', ['languages'], unique=False, postgresql_using='gin', postgresql_ops={'languages': 'jsonb_path_ops'})
+    op.create_index('ix_doctors_rating', 'doctors', ['rating'], unique=False)
+    op.create_index('ix_doctors_specialization_search_trgm', 'doctors', ['specialization_search'], unique=False, postgresql_using='gin', postgresql_ops={'specialization_search': 'gin_trgm_ops'})
+    op.create_table('health_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('record_type', sa.String(), nullable=True),
+    sa.Column('title', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('file_url', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_health_records_id'), 'health_records', ['id'], unique=False)
+    op.create_table('appointments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('slot_id', sa.String(), nullable=True),
+    sa.Column('time', sa.Time(), nullable=True),
+    sa.Column('date', sa.Date(), nullable=True),
+    sa.Column('available', sa.Boolean(), nullable=True),
+    sa.Column('doctor_id', sa.Integer(), nullable=True),
+    sa.Column('patient_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('symptoms', sa.String(), nullable=True),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('doctor_id', 'date', 'time', name='uq_appointments_doctor_slot')
+    )
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+    op.create_index('ix_appointments_patient_date', 'appointments', ['patient_id', 'date'], unique=False)
+    op.create_index(op.f('ix_appointments_slot_id'), 'appointments', ['slot_id'], unique=True)
+    op.create_table('doctor_slot_counts',
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('available_slots', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('doctor_id', 'date')
+    )
+    op.create_index('ix_doctor_slot_counts_date_available', 'doctor_slot_counts', ['date', 'available_slots', 'doctor_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_doctor_slot_counts_date_available', table_name='doctor_slot_counts')
+    op.drop_table('doctor_slot_counts')
+    op.drop_index(op.f('ix_appointments_slot_id'), table_name='appointments')
+    op.drop_index('ix_appointments_patient_date', table_name='appointments')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments')
+    op.drop_table('appointments')
+    op.drop_index(op.f('ix_health_records_id'), table_name='health_records')
+    op.drop_table('health_records')
+    op.drop_index('ix_doctors_specialization_search_trgm', table_name='doctors', postgresql_using='gin', postgresql_ops={'specialization_search': 'gin_trgm_ops'})
+    op.drop_index('ix_doctors_rating', table_name='doctors')
+    op.drop_index('ix_doctors_languages_gin', table_name='doctors', postgresql_using='gin', postgresql_ops={'languages': 'jsonb_path_ops'})
+    op.drop_index(op.f('ix_doctors_id'), table_name='doctors')
+    op.drop_index('ix_doctors_fees', table_name='doctors')
+    op.drop_index(op.f('ix_doctors_doctor_id'), table_name='doctors')
+    op.drop_index('ix_doctors_available_slots', table_name='doctors', postgresql_where='available_slots > 0')
+    op.drop_index('ix_doctors_available', table_name='doctors', postgresql_where='availability')
+    op.drop_table('doctors')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_full_name'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_table('seed_versions')
+    op.drop_index(op.f('ix_remedies_remedy_id'), table_name='remedies')
+    op.drop_index(op.f('ix_remedies_id'), table_name='remedies')
+    op.drop_table('remedies')
+    op.drop_index('ix_products_search_vector', table_name='products', postgresql_using='gin')
+    op.drop_index(op.f('ix_products_product_id'), table_name='products')
+    op.drop_index('ix_products_price', table_name='products')
+    op.drop_index(op.f('ix_products_id'), table_name='products')
+    op.drop_table('products')
+    op.drop_index(op.f('ix_ai_remedy_cache_model'), table_name='ai_remedy_cache')
+    op.drop_index(op.f('ix_ai_remedy_cache_id'), table_name='ai_remedy_cache')
+    op.drop_table('ai_remedy_cache')
@@ -0,0 +1,61 @@
+"""schedule rules
+
+Recurring availability rules and holiday/leave exceptions, expanded into
+appointment slots by app/services/slot_generator.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 19:57:35.361133
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('schedule_exceptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=True),
+    sa.Column('date_from', sa.Date(), nullable=False),
+    sa.Column('date_to', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=True),
+    sa.Column('end_time', sa.Time(), nullable=True),
+    sa.Column('reason', sa.String(), nullable=True),
+    sa.CheckConstraint('date_to >= date_from', name='ck_schedule_exceptions_date_range'),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_schedule_exceptions_doctor_dates', 'schedule_exceptions', ['doctor_id', 'date_from', 'date_to'], unique=False)
+    op.create_index(op.f('ix_schedule_exceptions_id'), 'schedule_exceptions', ['id'], unique=False)
+    op.create_table('schedule_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('weekdays', postgresql.ARRAY(sa.SmallInteger()), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('slot_minutes', sa.Integer(), nullable=False),
+    sa.Column('valid_from', sa.Date(), nullable=False),
+    sa.Column('valid_until', sa.Date(), nullable=True),
+    sa.CheckConstraint('end_time > start_time', name='ck_schedule_rules_time_range'),
+    sa.CheckConstraint('slot_minutes > 0', name='ck_schedule_rules_slot_minutes'),
+    sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_schedule_rules_doctor_id'), 'schedule_rules', ['doctor_id'], unique=False)
+    op.create_index(op.f('ix_schedule_rules_id'), 'schedule_rules', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_schedule_rules_id'), table_name='schedule_rules')
+    op.drop_index(op.f('ix_schedule_rules_doctor_id'), table_name='schedule_rules')
+    op.drop_table('schedule_rules')
+    op.drop_index(op.f('ix_schedule_exceptions_id'), table_name='schedule_exceptions')
+    op.drop_index('ix_schedule_exceptions_doctor_dates', table_name='schedule_exceptions')
+    op.drop_table('schedule_exceptions')
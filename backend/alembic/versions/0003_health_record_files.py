@@ -0,0 +1,46 @@
+"""health record files
+
+Content-addressed blobs for uploaded health record files, see
+app/services/file_storage.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 20:28:11.967059
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('stored_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.add_column('health_records', sa.Column('file_id', sa.Integer(), nullable=True))
+    op.add_column('health_records', sa.Column('file_name', sa.String(), nullable=True))
+    op.add_column('health_records', sa.Column('file_content_type', sa.String(), nullable=True))
+    op.add_column('health_records', sa.Column('file_size', sa.BigInteger(), nullable=True))
+    op.create_index(op.f('ix_health_records_file_id'), 'health_records', ['file_id'], unique=False)
+    op.create_foreign_key('health_records_file_id_fkey', 'health_records', 'stored_files', ['file_id'], ['id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('health_records_file_id_fkey', 'health_records', type_='foreignkey')
+    op.drop_index(op.f('ix_health_records_file_id'), table_name='health_records')
+    op.drop_column('health_records', 'file_size')
+    op.drop_column('health_records', 'file_content_type')
+    op.drop_column('health_records', 'file_name')
+    op.drop_column('health_records', 'file_id')
+    op.drop_table('stored_files')
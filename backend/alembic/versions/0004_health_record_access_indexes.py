@@ -0,0 +1,30 @@
+"""health record access indexes
+
+Indexes behind the doctor-scoped health record list and the per-patient
+timeline, see app/api/endpoints/health_records.py.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 20:31:18.787324
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_appointments_doctor_patient', 'appointments', ['doctor_id', 'patient_id'], unique=False, postgresql_where='patient_id IS NOT NULL')
+    op.create_index('ix_health_records_patient_created', 'health_records', ['patient_id', sa.literal_column('created_at DESC'), sa.literal_column('id DESC')], unique=False)
+    op.create_index('ix_health_records_patient_type_created', 'health_records', ['patient_id', 'record_type', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_health_records_patient_type_created', table_name='health_records')
+    op.drop_index('ix_health_records_patient_created', table_name='health_records')
+    op.drop_index('ix_appointments_doctor_patient', table_name='appointments', postgresql_where='patient_id IS NOT NULL')
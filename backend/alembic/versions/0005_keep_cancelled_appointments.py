@@ -0,0 +1,39 @@
+"""keep cancelled appointments
+
+A cancelled booking keeps its row and a new open row takes over the slot, so
+(doctor_id, date, time) is only unique among rows that are not cancelled. The
+doctor's calendar gets its own index, as the partial one cannot serve it.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 20:43:32.628428
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('uq_appointments_doctor_slot', 'appointments', type_='unique')
+    op.create_index('uq_appointments_doctor_slot', 'appointments', ['doctor_id', 'date', 'time'], unique=True, postgresql_where=sa.text("status IS DISTINCT FROM 'cancelled'"))
+    op.create_index('ix_appointments_doctor_date', 'appointments', ['doctor_id', 'date', 'time'], unique=False)
+
+
+def downgrade() -> None:
+    # Cancelled bookings whose slot was reopened or cancelled again cannot stay
+    op.execute("""
+        DELETE FROM appointments a
+        USING appointments b
+        WHERE a.status = 'cancelled'
+          AND b.doctor_id = a.doctor_id AND b.date = a.date AND b.time = a.time AND b.id <> a.id
+          AND (b.status IS DISTINCT FROM 'cancelled' OR b.id > a.id)
+    """)
+    op.drop_index('ix_appointments_doctor_date', table_name='appointments')
+    op.drop_index('uq_appointments_doctor_slot', table_name='appointments')
+    op.create_unique_constraint('uq_appointments_doctor_slot', 'appointments', ['doctor_id', 'date', 'time'])
@@ -0,0 +1,50 @@
+"""remedies data version
+
+A version counter per data set. A statement trigger bumps "remedies" on every
+write to the remedies table, whichever process makes it (the import CLI, psql),
+and the API workers reload their symptom index when it changes, see
+app/services/symptom_index.py.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 22:05:47.310215
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('data_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO data_versions (name) VALUES ('remedies')")
+    # OR REPLACE: reset_database() drops the tables but not the function
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_remedies_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE data_versions SET version = version + 1, changed_at = now() WHERE name = 'remedies';
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER remedies_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON remedies
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_remedies_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS remedies_data_version ON remedies")
+    op.execute("DROP FUNCTION IF EXISTS bump_remedies_version()")
+    op.drop_table('data_versions')
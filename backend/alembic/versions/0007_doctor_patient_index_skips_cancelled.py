@@ -0,0 +1,28 @@
+"""doctor patient index skips cancelled
+
+A cancelled booking no longer gives the doctor access to the patient's health
+records, so the index behind that check leaves cancelled rows out as well.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 22:31:09.518734
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_appointments_doctor_patient', table_name='appointments', postgresql_where='patient_id IS NOT NULL')
+    op.create_index('ix_appointments_doctor_patient', 'appointments', ['doctor_id', 'patient_id'], unique=False, postgresql_where=sa.text("patient_id IS NOT NULL AND status IS DISTINCT FROM 'cancelled'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointments_doctor_patient', table_name='appointments', postgresql_where=sa.text("patient_id IS NOT NULL AND status IS DISTINCT FROM 'cancelled'"))
+    op.create_index('ix_appointments_doctor_patient', 'appointments', ['doctor_id', 'patient_id'], unique=False, postgresql_where='patient_id IS NOT NULL')
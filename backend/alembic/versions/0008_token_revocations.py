@@ -0,0 +1,52 @@
+"""token revocations
+
+Token revocations shared by every API worker instead of kept in the memory of
+the one that handled the change. Writes bump the "token_revocations" data
+version, which the workers poll, see app/core/auth_cache.py.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 09:12:40.215873
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('token_revocations',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('revoked_before', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_token_revocations_revoked_before'), 'token_revocations', ['revoked_before'], unique=False)
+    op.execute("INSERT INTO data_versions (name) VALUES ('token_revocations')")
+    # The data version to bump is the trigger argument; OR REPLACE as in 0006
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE data_versions SET version = version + 1, changed_at = now() WHERE name = TG_ARGV[0];
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER token_revocations_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON token_revocations
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('token_revocations')
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS token_revocations_data_version ON token_revocations")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.execute("DELETE FROM data_versions WHERE name = 'token_revocations'")
+    op.drop_index(op.f('ix_token_revocations_revoked_before'), table_name='token_revocations')
+    op.drop_table('token_revocations')
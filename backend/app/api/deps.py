@@ -1,17 +1,28 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+import time
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from jose import JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from app import models, schemas
 from app.core import security
+from app.core.auth_cache import revocations, verified_tokens
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.core.rate_limit import parse_limit, rate_limiter
+from app.db.session import SessionLocal, AsyncSessionLocal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/users/login/access-token")
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
 def get_db() -> Generator:
     try:
         db = SessionLocal()
@@ -19,46 +30,109 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _verify_token(token: str) -> schemas.TokenData:
+    token_data = verified_tokens.get(token)
+    if token_data is None:
+        try:
+            payload = security.decode_access_token(token)
+            token_data = schemas.TokenData(
+                email=payload.get("sub"),
+                id=payload["uid"],
+                role=payload.get("role"),
+                is_active=payload.get("active", False),
+                is_superuser=payload.get("su", False),
+                issued_at=payload.get("iat"),
+                expires_at=payload["exp"],
+            )
+        except (JWTError, ValidationError, KeyError):
+            # KeyError: tokens issued before claims were added, the client has to log in again
+            raise credentials_exception
+        verified_tokens.set(token, token_data, ttl=token_data.expires_at - time.time())
+    elif token_data.expires_at <= time.time():
+        verified_tokens.pop(token)
+        raise credentials_exception
+    if revocations.is_revoked(token_data.id, token_data.issued_at):
+        raise credentials_exception
+    return token_data
+
+async def get_current_claims(token: str = Depends(oauth2_scheme)) -> schemas.TokenData:
+    await revocations.ensure_fresh()
+    return _verify_token(token)
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), token_data: schemas.TokenData = Depends(get_current_claims)
 ) -> models.User:
-    try:
-        payload = jwt.decode(
-            token, security.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = schemas.TokenData(email=payload.get("sub"))
-    except (JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+    """
+    Load the full user row. Only needed where the response is the user itself;
+    authorization checks use the token claims.
+    """
+    result = await db.execute(
+        select(models.User)
+        .options(joinedload(models.User.doctor_profile))
+        .filter(models.User.id == token_data.id)
+    )
+    user = result.scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+async def get_doctor_profile_id(db: AsyncSession, user_id: int) -> Optional[int]:
+    result = await db.execute(select(models.Doctor.id).filter(models.Doctor.user_id == user_id))
+    return result.scalar()
+
+async def get_current_active_user(
+    current_user: schemas.TokenData = Depends(get_current_claims),
+) -> schemas.TokenData:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-def get_current_doctor(
-    current_user: models.User = Depends(get_current_active_user),
-) -> models.User:
+async def get_current_doctor(
+    current_user: schemas.TokenData = Depends(get_current_active_user),
+) -> schemas.TokenData:
     if current_user.role != "doctor" and not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
 
-def get_current_superuser(
-    current_user: models.User = Depends(get_current_active_user),
-) -> models.User:
+async def get_current_superuser(
+    current_user: schemas.TokenData = Depends(get_current_active_user),
+) -> schemas.TokenData:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+async def _no_rate_limit() -> None:
+    pass
+
+def rate_limit(name: str, spec: str, per: str = "ip"):
+    """
+    Dependency charging each request to a token bucket (app/core/rate_limit.py)
+    of the client IP, the authenticated user ("user") or the account a login
+    is for ("account"). Raises RateLimited, answered with 429 and Retry-After.
+    """
+    limit = parse_limit(spec)
+    if limit is None or not settings.RATE_LIMIT_ENABLED:
+        return _no_rate_limit
+
+    if per == "ip":
+        async def by_ip(request: Request) -> None:
+            await rate_limiter.hit(name, request.client.host if request.client else "-", limit)
+        return by_ip
+    if per == "user":
+        async def by_user(current_user: schemas.TokenData = Depends(get_current_active_user)) -> None:
+            await rate_limiter.hit(name, str(current_user.id), limit)
+        return by_user
+    if per == "account":
+        # Same form dependency as the login endpoint, so the body is parsed once
+        async def by_account(form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+            await rate_limiter.hit(name, form_data.username.lower(), limit)
+        return by_account
+    raise ValueError(f"Unknown rate limit key {per!r}")
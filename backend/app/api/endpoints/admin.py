@@ -0,0 +1,180 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.api import deps
+from app.core.hashing import password_hasher
+from app.core.auth_cache import revoke_user_tokens
+from app.core.metrics import metrics
+from app.core.rate_limit import rate_limiter
+from app.db.session import SessionLocal, sync_pool_metrics, async_pool_metrics
+from app.services.importer import DEFAULT_BATCH_SIZE, FORMATS, KINDS, ImportFormatError, detect_format, run_import
+from app.services.llm_scheduler import llm_scheduler
+from app.services.remedy_cache import remedy_cache
+from app.services.slot_counters import reconcile
+from app.services.slot_generator import generate_slots
+from app.services.symptom_index import symptom_index
+
+router = APIRouter()
+
+# Changing any of these invalidates the claims baked into the user's tokens
+TOKEN_CLAIM_FIELDS = {"email", "role", "is_active", "is_superuser", "password"}
+
+@router.get("/db/pool", response_model=Any)
+async def read_pool_metrics(
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Connection pool state and checkout wait times for both engines.
+    """
+    return {
+        "sync": sync_pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot(),
+    }
+
+@router.get("/db/slow-queries", response_model=Any)
+async def read_slow_queries(
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Normalized statements slower than METRICS_SLOW_QUERY_MS, slowest first.
+    """
+    return metrics.slow_query_samples()
+
+@router.put("/users/{user_id}", response_model=schemas.User)
+async def update_user(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    user_id: int,
+    user_in: schemas.UserUpdate,
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Update a user (e.g. deactivate or change role). Outstanding tokens are revoked.
+    """
+    user = await db.get(models.User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    update_data = user_in.model_dump(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        user.hashed_password = await password_hasher.hash(password)
+    for field, value in update_data.items():
+        setattr(user, field, value)
+    if TOKEN_CLAIM_FIELDS & user_in.model_fields_set:
+        # Same transaction: the change and the revocation are committed together
+        await revoke_user_tokens(db, user.id)
+    await db.commit()
+    return user
+
+@router.get("/ai/cache", response_model=Any)
+async def read_ai_cache_stats(
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Hit/miss counters of the AI remedy cache.
+    """
+    return remedy_cache.stats()
+
+@router.delete("/ai/cache", response_model=Any)
+async def invalidate_ai_cache(
+    model: Optional[str] = None,
+    all: bool = False,
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Drop cached AI remedies. Without parameters, removes entries produced by
+    models other than the configured OLLAMA_MODEL.
+    """
+    deleted = await remedy_cache.invalidate(model=model, everything=all)
+    return {"deleted": deleted}
+
+@router.get("/ai/scheduler", response_model=Any)
+async def read_ai_scheduler_stats(
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    In-flight, queued, coalesced and rejected LLM requests.
+    """
+    return llm_scheduler.stats()
+
+@router.get("/rate-limits", response_model=Any)
+async def read_rate_limit_stats(
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Rate limit backend and rejected requests per limit since startup (this worker).
+    """
+    return rate_limiter.stats()
+
+@router.get("/remedies/index", response_model=Any)
+async def read_symptom_index_stats(
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    return symptom_index.stats()
+
+@router.post("/remedies/index", response_model=Any)
+async def rebuild_symptom_index(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Rebuild this worker's symptom index now. Remedy writes are picked up by every
+    worker within SYMPTOM_INDEX_VERSION_CHECK_SECONDS anyway.
+    """
+    symptom_index.mark_stale()
+    await symptom_index.ensure_fresh(db)
+    return symptom_index.stats()
+
+@router.post("/slots/reconcile", response_model=Any)
+async def reconcile_slot_counters(
+    db: AsyncSession = Depends(deps.get_async_db),
+    dry_run: bool = False,
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Recount available slots from the appointments table and report any drift in
+    the stored counters. Appointment writes wait until this finishes.
+    """
+    return await reconcile(db, dry_run=dry_run)
+
+@router.post("/slots/generate", response_model=Any)
+async def generate_schedule_slots(
+    db: AsyncSession = Depends(deps.get_async_db),
+    days: Optional[int] = Query(None, ge=1, le=366, description="Default: SLOT_HORIZON_DAYS"),
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Extend every doctor's slots to the horizon and retire open slots that no
+    schedule rule produces any more. Safe to repeat, e.g. from a daily cron.
+    """
+    return await generate_slots(db, days=days)
+
+@router.post("/import/{kind}", response_model=Any)
+async def import_data(
+    kind: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, enum=list(FORMATS), description="Default: from the file name"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=50000),
+    current_user: schemas.TokenData = Depends(deps.get_current_superuser),
+):
+    """
+    Stream an uploaded JSON, CSV or NDJSON file into doctors, products, remedies
+    or slots (see app/services/importer.py). Returns counts and the first rejects.
+    """
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown import {kind!r}")
+
+    def run():
+        with SessionLocal() as db:
+            fmt = format or detect_format(file.filename or "")
+            return run_import(db, kind, file.file, fmt, batch_size=batch_size)
+
+    try:
+        # The importer is synchronous and commits batch by batch
+        report = await run_in_threadpool(run)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return report.as_dict()
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Query, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, Query, HTTPException, Depends, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from openai import OpenAI
+from sqlalchemy.ext.asyncio import AsyncSession
+from openai import AsyncOpenAI
+import httpx
 import json
 from app.core.config import settings
 from app.api import deps
-from app import models
+from app import models, schemas
+from app.services.llm_scheduler import PRIORITY_INTERACTIVE, SchedulerOverloaded, llm_scheduler
+from app.services.remedy_cache import remedy_cache
+from app.services.symptom_index import SymptomMatch, symptom_index
 
 router = APIRouter()
 
@@ -19,18 +27,23 @@ class HomeRemedies(BaseModel):
     description: str
     language: LanguageInfo
 
-client = OpenAI(
+class RemedyAnswer(HomeRemedies):
+    # Which path served the answer: curated (symptom index), cache or llm
+    source: str = "llm"
+    remedy_id: Optional[str] = None
+    match_confidence: Optional[float] = None
+
+client = AsyncOpenAI(
     api_key=settings.OLLAMA_API_KEY,
-    base_url=settings.OLLAMA_BASE_URL
+    base_url=settings.OLLAMA_BASE_URL,
+    timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT),
+    max_retries=settings.OLLAMA_MAX_RETRIES,
 )
 
-@router.post("/remedy", response_model=HomeRemedies)
-async def get_remedy(
-    symptom: str = Query(..., description="User symptom text"),
-    lang: str = Query("en", enum=["en", "hi", "pa"], description="Response language: en, hi, pa"),
-    current_user: models.User = Depends(deps.get_current_active_user)
-):
-    
+# For streaming the read timeout applies between chunks rather than to the whole answer
+stream_timeout = httpx.Timeout(settings.OLLAMA_STREAM_IDLE_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT)
+
+def build_completion_request(symptom: str, lang: str) -> dict:
     lang_map = {"en": "English", "hi": "Hindi", "pa": "Punjabi"}
     lang_name = lang_map[lang]
 
@@ -46,21 +59,139 @@ async def get_remedy(
         },
         {"role": "user", "content": symptom}
     ]
+    return {
+        "model": settings.OLLAMA_MODEL,
+        "messages": messages,
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "HomeRemedies",
+                "schema": HomeRemedies.model_json_schema()
+            }
+        },
+    }
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def curated_answer(match: SymptomMatch) -> RemedyAnswer:
+    remedy = match.remedy
+    description = remedy["description"]
+    if remedy.get("warning"):
+        description = f"{description}. {remedy['warning']}"
+    return RemedyAnswer(
+        symptom=match.symptom,
+        remedy="; ".join(remedy.get("remedies_list") or []),
+        description=description,
+        language=LanguageInfo(name="English", code="en", confidence=1.0),
+        source="curated",
+        remedy_id=remedy["remedy_id"],
+        match_confidence=match.confidence,
+    )
+
+async def stream_ready_remedy(result: dict):
+    yield sse_event("result", result)
+
+def ready_stream_response(answer: RemedyAnswer) -> StreamingResponse:
+    return StreamingResponse(
+        stream_ready_remedy(answer.model_dump()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Remedy-Source": answer.source},
+    )
+
+async def stream_remedy(completion_stream, cache_key, lease):
+    """
+    Relay generated tokens as SSE `token` events, then the parsed HomeRemedies as
+    a final `result` event (or an `error` event).
+    """
+    content = []
     try:
-        response = client.chat.completions.create(
-            model=settings.OLLAMA_MODEL,
-            messages=messages,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {
-                    "name": "HomeRemedies",
-                    "schema": HomeRemedies.model_json_schema()
-                }
-            },
-            stream=False
+        async for chunk in completion_stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                content.append(delta)
+                yield sse_event("token", {"text": delta})
+        result = HomeRemedies(**json.loads("".join(content))).model_dump()
+        yield sse_event("result", {**result, "source": "llm"})
+        await remedy_cache.set(cache_key, result)
+    except Exception as e:
+        yield sse_event("error", {"detail": f"AI Service unavailable: {str(e)}"})
+    finally:
+        await completion_stream.close()
+        lease.release()
+
+@router.post(
+    "/remedy",
+    response_model=RemedyAnswer,
+    dependencies=[
+        Depends(deps.rate_limit("ai-remedy-user", settings.RATE_LIMIT_AI_PER_USER, per="user")),
+        Depends(deps.rate_limit("ai-remedy-ip", settings.RATE_LIMIT_AI_PER_IP)),
+    ],
+)
+async def get_remedy(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    symptom: str = Query(..., description="User symptom text"),
+    lang: str = Query("en", enum=["en", "hi", "pa"], description="Response language: en, hi, pa"),
+    stream: bool = Query(False, description="Stream tokens as server-sent events"),
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user)
+):
+    # Curated remedies are English only, so the fast path serves English requests
+    if lang == "en":
+        index = await symptom_index.ensure_fresh(db)
+        match = index.match(symptom)
+        symptom_index.record(match)
+        if match is not None:
+            answer = curated_answer(match)
+            if stream:
+                return ready_stream_response(answer)
+            response.headers["X-Remedy-Source"] = answer.source
+            return answer
+
+    cache_key = remedy_cache.key(symptom, lang)
+    cached = await remedy_cache.get(cache_key)
+    if cached is not None:
+        answer = RemedyAnswer(**cached, source="cache")
+        if stream:
+            return ready_stream_response(answer)
+        response.headers["X-Remedy-Source"] = answer.source
+        return answer
+
+    request = build_completion_request(symptom, lang)
+
+    if stream:
+        # Token streams can't be shared, but they still count against the Ollama limit
+        lease = await llm_scheduler.acquire(PRIORITY_INTERACTIVE)
+        try:
+            # Awaiting here surfaces connection errors as a 503 before the stream starts
+            completion_stream = await client.chat.completions.create(
+                **request, stream=True, timeout=stream_timeout
+            )
+        except Exception as e:
+            lease.release()
+            raise HTTPException(status_code=503, detail=f"AI Service unavailable: {str(e)}")
+        return StreamingResponse(
+            stream_remedy(completion_stream, cache_key, lease),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Remedy-Source": "llm"},
+            background=BackgroundTask(lease.release),
         )
-        data = json.loads(response.choices[0].message.content)
-        return HomeRemedies(**data)
+
+    async def generate():
+        completion = await client.chat.completions.create(**request, stream=False)
+        data = json.loads(completion.choices[0].message.content)
+        result = HomeRemedies(**data).model_dump()
+        await remedy_cache.set(cache_key, result)
+        return result
+
+    try:
+        # Identical (normalized) questions in flight share one generation
+        result = await llm_scheduler.run(cache_key, generate)
+    except SchedulerOverloaded:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=503, detail=f"AI Service unavailable: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=503, detail=f"AI Service unavailable: {str(e)}")
+    response.headers["X-Remedy-Source"] = "llm"
+    return RemedyAnswer(**result, source="llm")
@@ -1,16 +1,21 @@
-from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from datetime import date, datetime
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app import models, schemas
-from app.api import deps
+from app.api import deps, pagination, responses
+from app.schemas.common import SlotTime
+from app.services.slot_counters import adjust_available_slots
 from pydantic import BaseModel
 
 router = APIRouter()
 
 class AppointmentCreate(BaseModel):
     doctor_id: int
-    date: str
-    time: str
+    date: date
+    time: SlotTime
     symptoms: str
 
 class AppointmentUpdate(BaseModel):
@@ -22,74 +27,164 @@ class AppointmentSchema(BaseModel):
     doctor_id: int
     patient_id: Optional[int]
     patient: Optional[schemas.User] = None
-    date: str
-    time: str
+    date: date
+    time: SlotTime
     status: str
     symptoms: Optional[str]
     notes: Optional[str]
-    created_at: Optional[Any] = None
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 @router.get("/", response_model=List[AppointmentSchema])
-def read_appointments(
-    db: Session = Depends(deps.get_db),
+async def read_appointments(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    cursor: Optional[str] = pagination.CursorParam,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    current_user: schemas.TokenData = Depends(deps.get_current_claims),
 ):
+    """
+    Own appointments in calendar order, optionally limited to a date range
+    (inclusive) and a status.
+    """
     if current_user.role == "doctor":
         # Ensure doctor profile exists
-        if not current_user.doctor_profile:
+        doctor_profile_id = await deps.get_doctor_profile_id(db, current_user.id)
+        if not doctor_profile_id:
              raise HTTPException(status_code=404, detail="Doctor profile not found")
-        return db.query(models.Appointment).filter(models.Appointment.doctor_id == current_user.doctor_profile.id).offset(skip).limit(limit).all()
+        query = select(models.Appointment).filter(models.Appointment.doctor_id == doctor_profile_id)
     else:
         # Patient sees their own
-        return db.query(models.Appointment).filter(models.Appointment.patient_id == current_user.id).offset(skip).limit(limit).all()
+        query = select(models.Appointment).filter(models.Appointment.patient_id == current_user.id)
+    # Range scan on (doctor_id, date, time) or (patient_id, date)
+    if date_from:
+        query = query.filter(models.Appointment.date >= date_from)
+    if date_to:
+        query = query.filter(models.Appointment.date <= date_to)
+    if status:
+        query = query.filter(models.Appointment.status == status)
+    query = query.options(joinedload(models.Appointment.patient))
+    key = [models.Appointment.date, models.Appointment.time, models.Appointment.id]
+    # Accept: application/x-ndjson streams every matching row (skip/limit/cursor ignored)
+    if responses.wants_ndjson(request):
+        return responses.ndjson_response(AppointmentSchema, pagination.ordered(query, key))
+    appointments, next_cursor = await pagination.fetch_page(
+        db, query, key, limit=limit, skip=skip, cursor=cursor
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return responses.list_response(AppointmentSchema, appointments, response)
 
 @router.post("/", response_model=AppointmentSchema)
-def create_appointment(
+async def create_appointment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     appointment_in: AppointmentCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.TokenData = Depends(deps.get_current_claims),
 ):
-    appointment = models.Appointment(
-        doctor_id=appointment_in.doctor_id,
-        patient_id=current_user.id,
-        date=appointment_in.date,
-        time=appointment_in.time,
-        symptoms=appointment_in.symptoms,
-        status="pending",
-        available=False # Booked
+    """
+    Book a published slot. The open slot is claimed with a conditional UPDATE,
+    so of two patients racing for it exactly one wins and the other gets 409.
+    Times the doctor has not published get 404.
+    """
+    Appointment = models.Appointment
+    slot = (
+        Appointment.doctor_id == appointment_in.doctor_id,
+        Appointment.date == appointment_in.date,
+        Appointment.time == appointment_in.time,
     )
-    db.add(appointment)
-    db.commit()
-    db.refresh(appointment)
-    return appointment
+    claim = (
+        update(Appointment)
+        .where(*slot, Appointment.available == True)
+        .values(
+            patient_id=current_user.id,
+            symptoms=appointment_in.symptoms,
+            status="pending",
+            available=False, # Booked
+            notes=None,
+            created_at=func.now(),
+        )
+        .returning(Appointment.id)
+        .execution_options(synchronize_session=False)
+    )
+    appointment_id = (await db.execute(claim)).scalar()
+    if appointment_id is None:
+        taken = (await db.execute(
+            select(Appointment.patient_id).filter(*slot, Appointment.status.is_distinct_from("cancelled"))
+        )).first()
+        if taken is not None:
+            detail = "This slot is already booked" if taken.patient_id is not None else "This slot is not available"
+            raise HTTPException(status_code=409, detail=detail)
+        if await db.get(models.Doctor, appointment_in.doctor_id) is None:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+        raise HTTPException(status_code=404, detail="The doctor has no slot at this time")
+    await adjust_available_slots(db, appointment_in.doctor_id, appointment_in.date, -1)
+    await db.commit()
+
+    result = await db.execute(
+        select(Appointment)
+        .options(joinedload(Appointment.patient))
+        .filter(Appointment.id == appointment_id)
+    )
+    return result.scalars().one()
 
 @router.put("/{id}", response_model=AppointmentSchema)
-def update_appointment(
+async def update_appointment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
     appointment_in: AppointmentUpdate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: schemas.TokenData = Depends(deps.get_current_claims),
 ):
-    appointment = db.query(models.Appointment).filter(models.Appointment.id == id).first()
+    """
+    The appointment's doctor (or an admin) sets status and notes; the patient
+    may only cancel. Cancelling keeps the booking as the patient's history and
+    puts the time back on offer as a new open slot.
+    """
+    Appointment = models.Appointment
+    result = await db.execute(
+        select(Appointment)
+        .options(joinedload(Appointment.patient))
+        .filter(Appointment.id == id)
+        .with_for_update(of=Appointment)
+    )
+    appointment = result.scalars().first()
     if not appointment:
         raise HTTPException(status_code=404, detail="Appointment not found")
-    
-    # Permission check (Doctor only)
-    if current_user.role != "doctor" and not current_user.is_superuser:
-         raise HTTPException(status_code=403, detail="Not authorized")
 
-    if appointment_in.status:
+    is_doctor = current_user.is_superuser or (
+        current_user.role == "doctor"
+        and appointment.doctor_id == await deps.get_doctor_profile_id(db, current_user.id)
+    )
+    if not is_doctor:
+        if appointment.patient_id is None or appointment.patient_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        if appointment_in.status != "cancelled" or appointment_in.notes:
+            raise HTTPException(status_code=403, detail="Patients can only cancel their appointments")
+
+    if appointment_in.status and appointment_in.status != appointment.status:
+        if appointment.patient_id is None:
+            raise HTTPException(status_code=409, detail="This slot is not booked")
+        if appointment.status == "cancelled":
+            raise HTTPException(status_code=409, detail="This appointment is cancelled")
         appointment.status = appointment_in.status
+        if appointment_in.status == "cancelled":
+            # The booking leaves the slot's unique index before the new open row takes it over
+            slot_id, appointment.slot_id = appointment.slot_id, None
+            await db.flush()
+            db.add(Appointment(
+                slot_id=slot_id, doctor_id=appointment.doctor_id, date=appointment.date,
+                time=appointment.time, available=True, status="pending",
+            ))
+            await adjust_available_slots(db, appointment.doctor_id, appointment.date, 1)
     if appointment_in.notes:
         appointment.notes = appointment_in.notes
-        
-    db.commit()
-    db.refresh(appointment)
+
+    await db.commit()
     return appointment
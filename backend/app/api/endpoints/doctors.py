@@ -1,54 +1,102 @@
-from typing import List, Any, Optional
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import date as Date
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
-from app.api import deps
-from app.models.appointment import Appointment
+from app.api import deps, pagination, responses
+from app.db.readonly import column_select, localized_select
+from app.schemas.common import Language
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Doctor])
-def read_doctors(
-    db: Session = Depends(deps.get_db),
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+LangParam = Query(None, description="Return name, qualification, specialization, experience and bio "
+                                    "in this language only (English where a translation is missing)")
+
+def doctor_select(lang: Optional[str]):
+    """(response schema, base select) for all languages or the ?lang= projection."""
+    if lang is None:
+        return schemas.Doctor, column_select(models.Doctor, schemas.Doctor)
+    return schemas.DoctorLocalized, localized_select(models.Doctor, schemas.DoctorLocalized, lang)
+
+@router.get("/", response_model=Union[List[schemas.Doctor], List[schemas.DoctorLocalized]])
+async def read_doctors(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = pagination.CursorParam,
     available_only: bool = False,
-    specialization: Optional[str] = None,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    specialization: Optional[str] = Query(None, description="Substring of the specialization, any language"),
+    language: Optional[str] = Query(None, description="Spoken language, e.g. Hindi"),
+    min_fee: Optional[int] = None,
+    max_fee: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    lang: Optional[Language] = LangParam,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
-    query = db.query(models.Doctor)
+    # All filters run in the database so pagination applies to the filtered rows.
+    # Read-only: plain rows with just the response columns, no ORM instances.
+    schema, query = doctor_select(lang)
     if available_only:
         query = query.filter(models.Doctor.availability == True)
-    
-    doctors = query.offset(skip).limit(limit).all()
-    
     if specialization:
-        doctors = [d for d in doctors if specialization.lower() in str(d.specialization).lower()]
-        
-    return doctors
+        pattern = "%" + escape_like(specialization.strip().lower()) + "%"
+        query = query.filter(models.Doctor.specialization_search.like(pattern, escape="\\"))
+    if language:
+        query = query.filter(models.Doctor.languages.contains([language.strip().capitalize()]))
+    if min_fee is not None:
+        query = query.filter(models.Doctor.fees >= min_fee)
+    if max_fee is not None:
+        query = query.filter(models.Doctor.fees <= max_fee)
+    if min_rating is not None:
+        query = query.filter(models.Doctor.rating >= min_rating)
+    if max_rating is not None:
+        query = query.filter(models.Doctor.rating <= max_rating)
+
+    # Accept: application/x-ndjson streams every matching row (skip/limit/cursor ignored)
+    if responses.wants_ndjson(request):
+        return responses.ndjson_response(schema, pagination.ordered(query, [models.Doctor.id]))
+    doctors, next_cursor = await pagination.fetch_page(
+        db, query, [models.Doctor.id], limit=limit, skip=skip, cursor=cursor
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return responses.list_response(schema, doctors, response)
 
 @router.get("/available", response_model=List[Any])
-def get_available_doctors(
-    db: Session = Depends(deps.get_db),
+async def get_available_doctors(
+    db: AsyncSession = Depends(deps.get_async_db),
     limit: int = 10,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    date: Optional[Date] = Query(None, description="Only count slots on this day"),
+    lang: Optional[Language] = LangParam,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
-    # This query finds doctors and counts their available slots
-    results = db.query(
-        models.Doctor,
-        func.count(Appointment.id).label("available_slots_count")
-    ).join(Appointment, models.Doctor.id == Appointment.doctor_id) \
-     .filter(Appointment.available == True) \
-     .group_by(models.Doctor.id) \
-     .order_by(func.count(Appointment.id).desc()) \
-     .limit(limit).all()
+    # Doctors with the most open slots, read from the maintained counters
+    schema, query = doctor_select(lang)
+    if date:
+        count, tiebreak = models.DoctorSlotCount.available_slots, models.DoctorSlotCount.doctor_id
+        query = (
+            query.add_columns(count.label("available_slots_count"))
+            .join(models.DoctorSlotCount, models.DoctorSlotCount.doctor_id == models.Doctor.id)
+            .filter(models.DoctorSlotCount.date == date, count > 0)
+        )
+    else:
+        count, tiebreak = models.Doctor.available_slots, models.Doctor.id
+        query = query.add_columns(count.label("available_slots_count")).filter(count > 0)
+    results = (await db.execute(
+        query.order_by(count.desc(), tiebreak.desc()).limit(limit)
+    )).all()
     
     # Format response
+    encode = responses.row_encoder(schema)
     output = []
-    for doc, count in results:
-        doc_data = schemas.Doctor.from_orm(doc).dict()
-        doc_data["available_slots_count"] = count
+    for row in results:
+        doc_data = encode(row)
+        doc_data["available_slots_count"] = row.available_slots_count
         output.append(doc_data)
         
-    return output
\ No newline at end of file
+    return output
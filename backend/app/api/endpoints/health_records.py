@@ -1,31 +1,155 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import mimetypes
+from datetime import datetime
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from app import models, schemas
-from app.api import deps
+from app.api import deps, pagination, responses
+from app.core.config import settings
+from app.services import file_storage
 
 router = APIRouter()
 
+async def patient_scope(db: AsyncSession, current_user: schemas.TokenData, patient_id):
+    """
+    Condition limiting `patient_id` (a column, or a value for doctors) to the
+    patients whose records the caller may read: their own, and for doctors
+    anyone who booked an appointment with them that was not cancelled, an
+    EXISTS answered by the partial (doctor_id, patient_id) index on
+    appointments. None for admins.
+    """
+    if current_user.is_superuser:
+        return None
+    if current_user.role != "doctor":
+        return patient_id == current_user.id
+    doctor_id = await deps.get_doctor_profile_id(db, current_user.id)
+    if not doctor_id:
+        raise HTTPException(status_code=404, detail="Doctor profile not found")
+    return exists().where(
+        models.Appointment.doctor_id == doctor_id,
+        models.Appointment.patient_id == patient_id,
+        # Same predicate as the index; a cancelled booking keeps its patient_id
+        models.Appointment.status.is_distinct_from("cancelled"),
+    )
+
+async def check_patient_access(db: AsyncSession, current_user: schemas.TokenData, patient_id: int) -> None:
+    if current_user.is_superuser or patient_id == current_user.id:
+        return
+    if current_user.role == "doctor":
+        scope = await patient_scope(db, current_user, patient_id)
+        if (await db.execute(select(scope))).scalar():
+            return
+    raise HTTPException(status_code=403, detail="Not authorized to access this record")
+
+def record_filters(
+    patient_id: Optional[int] = None,
+    record_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> list:
+    HealthRecord = models.HealthRecord
+    filters = []
+    if patient_id is not None:
+        filters.append(HealthRecord.patient_id == patient_id)
+    if record_type:
+        filters.append(HealthRecord.record_type == record_type)
+    if created_from:
+        filters.append(HealthRecord.created_at >= created_from)
+    if created_to:
+        filters.append(HealthRecord.created_at < created_to)
+    return filters
+
 @router.get("/", response_model=List[schemas.HealthRecord])
-def read_health_records(
-    db: Session = Depends(deps.get_db),
+async def read_health_records(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = pagination.CursorParam,
+    patient_id: Optional[int] = None,
+    record_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
+):
+    """
+    Health records the caller may see, newest first: their own, or for a
+    doctor those of their patients. Optionally limited to one patient, a
+    record type and a created_at range (from inclusive, to exclusive).
+    """
+    HealthRecord = models.HealthRecord
+    query = select(HealthRecord).options(joinedload(HealthRecord.patient))
+    scope = await patient_scope(db, current_user, HealthRecord.patient_id)
+    if scope is not None:
+        query = query.filter(scope)
+    query = query.filter(*record_filters(patient_id, record_type, created_from, created_to))
+    # Served by (patient_id, created_at DESC, id DESC) per patient
+    key = [HealthRecord.created_at, HealthRecord.id]
+    # Accept: application/x-ndjson streams every matching row (skip/limit/cursor ignored)
+    if responses.wants_ndjson(request):
+        return responses.ndjson_response(schemas.HealthRecord, pagination.ordered(query, key, descending=True))
+    records, next_cursor = await pagination.fetch_page(
+        db, query, key, limit=limit, skip=skip, cursor=cursor, descending=True,
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return responses.list_response(schemas.HealthRecord, records, response)
+
+@router.get("/patients/{patient_id}/timeline", response_model=schemas.HealthRecordTimeline)
+async def read_health_record_timeline(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    patient_id: int,
+    record_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
     """
-    Retrieve health records for the current user.
+    A patient's records counted per month and type (UTC months), newest
+    month first. One GROUP BY over the (patient_id, record_type, created_at)
+    index; no record is loaded.
     """
-    if current_user.role == "doctor" or current_user.is_superuser:
-        return db.query(models.HealthRecord).offset(skip).limit(limit).all()
-    return db.query(models.HealthRecord).filter(models.HealthRecord.patient_id == current_user.id).offset(skip).limit(limit).all()
+    await check_patient_access(db, current_user, patient_id)
+    HealthRecord = models.HealthRecord
+    month = func.date_trunc("month", HealthRecord.created_at).label("month")
+    rows = (await db.execute(
+        select(
+            month,
+            HealthRecord.record_type,
+            func.count().label("count"),
+            func.min(HealthRecord.created_at).label("first_at"),
+            func.max(HealthRecord.created_at).label("last_at"),
+        )
+        .filter(*record_filters(patient_id, record_type, created_from, created_to))
+        .group_by(month, HealthRecord.record_type)
+        .order_by(month.desc(), HealthRecord.record_type)
+    )).all()
+
+    months = {}
+    by_type = {}
+    for row in rows:
+        bucket = months.setdefault(row.month, {"month": row.month.date(), "total": 0, "by_type": {}})
+        bucket["total"] += row.count
+        bucket["by_type"][row.record_type] = row.count
+        by_type[row.record_type] = by_type.get(row.record_type, 0) + row.count
+    return {
+        "patient_id": patient_id,
+        "total": sum(by_type.values()),
+        "first_at": min((row.first_at for row in rows), default=None),
+        "last_at": max((row.last_at for row in rows), default=None),
+        "by_type": by_type,
+        "months": list(months.values()),
+    }
 
 @router.post("/", response_model=schemas.HealthRecord)
-def create_health_record(
+async def create_health_record(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     record_in: schemas.HealthRecordCreate,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
     """
     Create a new health record for the current user.
@@ -35,23 +159,148 @@ def create_health_record(
         patient_id=current_user.id
     )
     db.add(record)
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record, attribute_names=["created_at", "updated_at", "patient"])
     return record
 
 @router.get("/{id}", response_model=schemas.HealthRecord)
-def read_health_record(
+async def read_health_record(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
     """
     Get a specific health record by ID.
     """
-    record = db.query(models.HealthRecord).filter(models.HealthRecord.id == id).first()
+    result = await db.execute(
+        select(models.HealthRecord)
+        .options(joinedload(models.HealthRecord.patient))
+        .filter(models.HealthRecord.id == id)
+    )
+    record = result.scalars().first()
     if not record:
         raise HTTPException(status_code=404, detail="Health record not found")
-    if record.patient_id != current_user.id and current_user.role != "doctor" and not current_user.is_superuser:
-        raise HTTPException(status_code=403, detail="Not authorized to access this record")
+    await check_patient_access(db, current_user, record.patient_id)
+    return record
+
+async def lock_own_record(db: AsyncSession, id: int, current_user: schemas.TokenData) -> models.HealthRecord:
+    result = await db.execute(
+        select(models.HealthRecord)
+        .options(joinedload(models.HealthRecord.patient))
+        .filter(models.HealthRecord.id == id)
+        .with_for_update(of=models.HealthRecord)
+    )
+    record = result.scalars().first()
+    if not record:
+        raise HTTPException(status_code=404, detail="Health record not found")
+    if record.patient_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not authorized to change this record")
+    return record
+
+@router.put("/{id}/file", response_model=schemas.HealthRecord)
+async def upload_health_record_file(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    filename: Optional[str] = Query(None, max_length=255),
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
+):
+    """
+    Attach a file sent as the raw request body (e.g. `curl -T report.pdf`),
+    replacing any earlier one. The body is streamed to storage, never held in
+    memory; identical content is stored once.
+    """
+    await lock_own_record(db, id, current_user)
+    # Don't hold a pooled connection (and the row lock) while the body streams in
+    await db.rollback()
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > settings.FILE_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    try:
+        stored = await file_storage.save_upload(db, request.stream(), settings.FILE_UPLOAD_MAX_BYTES)
+    except file_storage.FileTooLarge:
+        raise HTTPException(status_code=413, detail="File too large")
+    try:
+        record = await lock_own_record(db, id, current_user)
+    except HTTPException:
+        # The record was deleted or reassigned during the upload
+        await db.rollback()
+        await file_storage.discard(stored)
+        raise
+
+    previous_file_id = record.file_id
+    record.file_id = stored.id
+    record.file_name = filename or f"record-{id}"
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    record.file_content_type = (
+        content_type or mimetypes.guess_type(record.file_name)[0] or "application/octet-stream"
+    )
+    record.file_size = stored.size
+    record.file_url = f"{settings.API_V1_STR}/health-records/{id}/file"
+    await db.commit()
+    await db.refresh(record, attribute_names=["updated_at"])
+
+    if previous_file_id is not None and previous_file_id != stored.id:
+        await file_storage.release(previous_file_id)
+    return record
+
+@router.get("/{id}/file", response_class=Response)
+async def download_health_record_file(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
+):
+    """
+    The attached file. Supports Range requests; the ETag is the content hash,
+    so If-None-Match answers 304 without touching storage.
+    """
+    HealthRecord, StoredFile = models.HealthRecord, models.StoredFile
+    row = (await db.execute(
+        select(
+            HealthRecord.patient_id, HealthRecord.file_name, HealthRecord.file_content_type,
+            StoredFile.storage_key, StoredFile.sha256,
+        )
+        .outerjoin(StoredFile, StoredFile.id == HealthRecord.file_id)
+        .filter(HealthRecord.id == id)
+    )).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Health record not found")
+    await check_patient_access(db, current_user, row.patient_id)
+    # The file may stream for a long time; give the connection back first
+    await db.rollback()
+    if row.storage_key is None:
+        raise HTTPException(status_code=404, detail="No file attached to this record")
+
+    etag = f'"{row.sha256}"'
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag})
+    return await file_storage.get_storage().download(
+        row.storage_key, request, filename=row.file_name, media_type=row.file_content_type, etag=etag,
+    )
+
+@router.delete("/{id}/file", response_model=schemas.HealthRecord)
+async def delete_health_record_file(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
+):
+    """
+    Detach the uploaded file. The content is deleted unless another record
+    uploaded the same bytes.
+    """
+    record = await lock_own_record(db, id, current_user)
+    previous_file_id = record.file_id
+    if previous_file_id is None:
+        raise HTTPException(status_code=404, detail="No file attached to this record")
+    record.file_id = record.file_name = record.file_content_type = record.file_size = None
+    record.file_url = None
+    await db.commit()
+    await db.refresh(record, attribute_names=["updated_at"])
+    await file_storage.release(previous_file_id)
     return record
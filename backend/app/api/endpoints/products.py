@@ -1,30 +1,145 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import re
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import String, cast, func, literal, select, text, true
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
-from app.api import deps
+from app.api import deps, pagination, responses
+from app.core.config import settings
+from app.db.readonly import column_select
 
 router = APIRouter()
 
+FACETS = ("category", "brand", "prescription_required", "in_stock")
+
+def build_tsquery(q: str) -> Optional[str]:
+    """'para 500' -> 'para:* & 500:*': every word is a prefix, so results follow typing."""
+    words = re.findall(r"\w+", q.lower())
+    return " & ".join(f"{word}:*" for word in words) or None
+
+def _facet_counts(matched, name: str):
+    """{value: count} over the matched rows as a JSON object ('{}' when nothing matched)."""
+    column = matched.c[name]
+    counts = (
+        select(cast(column, String).label("value"), func.count().label("n"))
+        .where(column.isnot(None))
+        .group_by(column)
+        .subquery()
+    )
+    return select(
+        func.coalesce(func.json_object_agg(counts.c.value, counts.c.n), text("'{}'::json"))
+    ).scalar_subquery()
+
 @router.get("/", response_model=List[schemas.Product])
-def read_products(
-    db: Session = Depends(deps.get_db),
+async def read_products(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = pagination.CursorParam,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
-    products = db.query(models.Product).offset(skip).limit(limit).all()
-    return products
+    # Read-only: plain rows with just the response columns, no ORM instances
+    query = column_select(models.Product, schemas.Product)
+    # Accept: application/x-ndjson streams every matching row (skip/limit/cursor ignored)
+    if responses.wants_ndjson(request):
+        return responses.ndjson_response(schemas.Product, pagination.ordered(query, [models.Product.id]))
+    products, next_cursor = await pagination.fetch_page(
+        db, query, [models.Product.id], limit=limit, skip=skip, cursor=cursor
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return responses.list_response(schemas.Product, products, response)
+
+@router.get("/search", response_model=schemas.ProductSearchResult)
+async def search_products(
+    db: AsyncSession = Depends(deps.get_async_db),
+    q: Optional[str] = Query(None, description="Search text; each word matches as a prefix"),
+    category: Optional[str] = None,
+    brand: Optional[str] = None,
+    prescription_required: Optional[bool] = None,
+    in_stock: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=0, le=100),
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
+):
+    """
+    Ranked full-text search with facet counts. The page, the total and the
+    facets come from one statement: the matches are filtered once through the
+    search_vector GIN index into a CTE that the counts and the page both read.
+    """
+    Product = models.Product
+    conditions = []
+    tsquery = build_tsquery(q) if q else None
+    if q and tsquery is None:
+        # Only punctuation ("!!"): nothing to search for, so nothing matches
+        return {"total": 0, "facets": {name: {} for name in FACETS}, "items": []}
+    if tsquery:
+        ts = func.to_tsquery(literal("simple").cast(REGCONFIG), tsquery)
+        conditions.append(Product.search_vector.op("@@")(ts))
+        # Name/generic-name hits (weight A) outrank brand (B) and uses (C)
+        rank = func.ts_rank_cd(Product.search_vector, ts)
+    else:
+        rank = literal(0.0)
+    for column, value in (
+        (Product.category, category),
+        (Product.brand, brand),
+        (Product.prescription_required, prescription_required),
+        (Product.in_stock, in_stock),
+    ):
+        if value is not None:
+            conditions.append(column == value)
+    if min_price is not None:
+        conditions.append(Product.price >= min_price)
+    if max_price is not None:
+        conditions.append(Product.price <= max_price)
+
+    matched = (
+        column_select(Product, schemas.Product)
+        .add_columns(rank.label("rank"))
+        .where(*conditions)
+        .cte("matched")
+    )
+    summary = select(
+        select(func.count()).select_from(matched).scalar_subquery().label("total"),
+        func.json_build_object(
+            *(part for name in FACETS for part in (name, _facet_counts(matched, name)))
+        ).label("facets"),
+    ).subquery("summary")
+    page = (
+        select(matched)
+        .order_by(matched.c.rank.desc(), matched.c.id)
+        .offset(skip)
+        .limit(limit)
+        .lateral("page")
+    )
+    query = (
+        select(summary, page)
+        .select_from(summary.outerjoin(page, true()))
+        .order_by(page.c.rank.desc(), page.c.id)
+    )
+    rows = (await db.execute(query)).all()
+
+    # Without a page row the LEFT JOIN still yields the summary, with NULL items
+    items = [row for row in rows if row.id is not None]
+    result = {"total": rows[0].total, "facets": rows[0].facets, "items": items}
+    if not settings.FAST_JSON_RESPONSES:
+        return result
+    encode = responses.row_encoder(schemas.Product)
+    return responses.FastJSONResponse({**result, "items": [encode(row) for row in items]})
 
 @router.post("/", response_model=schemas.Product)
-def create_product(
+async def create_product(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     product_in: schemas.ProductBase,
-    current_user: models.User = Depends(deps.get_current_doctor),
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
 ):
     product = models.Product(**product_in.dict())
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    await db.commit()
+    await db.refresh(product)
     return product
@@ -1,17 +1,40 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
-from app.api import deps
+from app.api import deps, pagination, responses
+from app.db.readonly import column_select
+from app.core.config import settings
+from app.services.symptom_index import symptom_index
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Remedy])
-def read_remedies(
-    db: Session = Depends(deps.get_db),
+async def read_remedies(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_user),
+    cursor: Optional[str] = pagination.CursorParam,
+    symptom: Optional[str] = None,
+    current_user: schemas.TokenData = Depends(deps.get_current_active_user),
 ):
-    remedies = db.query(models.Remedy).offset(skip).limit(limit).all()
-    return remedies
\ No newline at end of file
+    if symptom:
+        # Served from the in-memory symptom index, best match first (skip/limit only)
+        index = await symptom_index.ensure_fresh(db)
+        matches = [m for m in index.search(symptom, limit=skip + limit) if m.confidence >= settings.SYMPTOM_MATCH_MIN_CONFIDENCE][skip:]
+        symptom_index.record(matches[0] if matches else None)
+        response.headers["X-Remedy-Source"] = "curated"
+        return responses.list_response(schemas.Remedy, [m.remedy for m in matches], response)
+
+    # Read-only: plain rows with just the response columns, no ORM instances
+    query = column_select(models.Remedy, schemas.Remedy)
+    # Accept: application/x-ndjson streams every matching row (skip/limit/cursor ignored)
+    if responses.wants_ndjson(request):
+        return responses.ndjson_response(schemas.Remedy, pagination.ordered(query, [models.Remedy.id]))
+    remedies, next_cursor = await pagination.fetch_page(
+        db, query, [models.Remedy.id], limit=limit, skip=skip, cursor=cursor
+    )
+    pagination.set_next_cursor(response, next_cursor)
+    return responses.list_response(schemas.Remedy, remedies, response)
@@ -0,0 +1,148 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.api import deps
+from app.services.slot_generator import generate_slots
+
+router = APIRouter()
+
+async def resolve_doctor(
+    db: AsyncSession, current_user: schemas.TokenData, doctor_id: Optional[int]
+) -> Optional[int]:
+    """
+    The doctor whose schedule is being read or changed: a doctor's own profile,
+    or for admins the requested one (None meaning every doctor).
+    """
+    if current_user.is_superuser:
+        if doctor_id is not None and await db.get(models.Doctor, doctor_id) is None:
+            raise HTTPException(status_code=404, detail="Doctor not found")
+        return doctor_id
+    own_id = await deps.get_doctor_profile_id(db, current_user.id)
+    if not own_id:
+        raise HTTPException(status_code=404, detail="Doctor profile not found")
+    if doctor_id is not None and doctor_id != own_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return own_id
+
+@router.get("/rules", response_model=List[schemas.ScheduleRule])
+async def read_rules(
+    db: AsyncSession = Depends(deps.get_async_db),
+    doctor_id: Optional[int] = None,
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
+):
+    doctor_id = await resolve_doctor(db, current_user, doctor_id)
+    query = select(models.ScheduleRule).order_by(models.ScheduleRule.doctor_id, models.ScheduleRule.id)
+    if doctor_id is not None:
+        query = query.filter(models.ScheduleRule.doctor_id == doctor_id)
+    return (await db.execute(query)).scalars().all()
+
+@router.post("/rules", response_model=schemas.ScheduleRule)
+async def create_rule(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    rule_in: schemas.ScheduleRuleCreate,
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
+):
+    """
+    Publish recurring availability. Slots for the horizon are generated in the
+    same transaction.
+    """
+    doctor_id = await resolve_doctor(db, current_user, rule_in.doctor_id)
+    if doctor_id is None:
+        raise HTTPException(status_code=422, detail="doctor_id is required")
+    # dict(), not model_dump(): SlotTime would serialize the times to "9:00 AM"
+    rule = models.ScheduleRule(**{
+        **dict(rule_in),
+        "doctor_id": doctor_id,
+        "valid_from": rule_in.valid_from or date.today(),
+    })
+    db.add(rule)
+    await db.flush()
+    await generate_slots(db, doctor_ids=[doctor_id])
+    return rule
+
+@router.delete("/rules/{id}", response_model=schemas.ScheduleRule)
+async def delete_rule(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
+):
+    """
+    Remove a rule. Its open slots are retired; booked ones stay.
+    """
+    rule = await db.get(models.ScheduleRule, id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Schedule rule not found")
+    await resolve_doctor(db, current_user, rule.doctor_id)
+    await db.delete(rule)
+    await db.flush()
+    await generate_slots(db, doctor_ids=[rule.doctor_id])
+    return rule
+
+@router.get("/exceptions", response_model=List[schemas.ScheduleException])
+async def read_exceptions(
+    db: AsyncSession = Depends(deps.get_async_db),
+    doctor_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
+):
+    """
+    Leave and holidays, including the ones that apply to every doctor.
+    """
+    doctor_id = await resolve_doctor(db, current_user, doctor_id)
+    Exception_ = models.ScheduleException
+    query = select(Exception_).order_by(Exception_.date_from, Exception_.id)
+    if doctor_id is not None:
+        query = query.filter(or_(Exception_.doctor_id == doctor_id, Exception_.doctor_id.is_(None)))
+    if date_from:
+        query = query.filter(Exception_.date_to >= date_from)
+    return (await db.execute(query)).scalars().all()
+
+@router.post("/exceptions", response_model=schemas.ScheduleException)
+async def create_exception(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    exception_in: schemas.ScheduleExceptionCreate,
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
+):
+    """
+    Take time off. Open slots in the range are retired; booked ones stay and
+    have to be cancelled separately. Admins may omit doctor_id for a holiday.
+    """
+    doctor_id = await resolve_doctor(db, current_user, exception_in.doctor_id)
+    exception = models.ScheduleException(**{
+        **dict(exception_in),
+        "doctor_id": doctor_id,
+        "date_to": exception_in.date_to or exception_in.date_from,
+    })
+    db.add(exception)
+    await db.flush()
+    await generate_slots(db, doctor_ids=[doctor_id] if doctor_id is not None else None)
+    return exception
+
+@router.delete("/exceptions/{id}", response_model=schemas.ScheduleException)
+async def delete_exception(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    id: int,
+    current_user: schemas.TokenData = Depends(deps.get_current_doctor),
+):
+    """
+    Cancel leave or a holiday; the rules fill the freed days again.
+    """
+    exception = await db.get(models.ScheduleException, id)
+    if not exception:
+        raise HTTPException(status_code=404, detail="Schedule exception not found")
+    if exception.doctor_id is None and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    await resolve_doctor(db, current_user, exception.doctor_id)
+    await db.delete(exception)
+    await db.flush()
+    await generate_slots(
+        db, doctor_ids=[exception.doctor_id] if exception.doctor_id is not None else None
+    )
+    return exception
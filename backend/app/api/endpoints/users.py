@@ -1,31 +1,53 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models, schemas
 from app.api import deps
 from app.core import security
+from app.core.config import settings
+from app.core.hashing import PasswordHasherBusy, password_hasher
 
 router = APIRouter()
 
-@router.post("/login/access-token", response_model=schemas.Token)
-def login_access_token(
-    db: Session = Depends(deps.get_db), form_data: OAuth2PasswordRequestForm = Depends()
+@router.post(
+    "/login/access-token",
+    response_model=schemas.Token,
+    dependencies=[
+        Depends(deps.rate_limit("login-ip", settings.RATE_LIMIT_LOGIN_PER_IP)),
+        Depends(deps.rate_limit("login-account", settings.RATE_LIMIT_LOGIN_PER_ACCOUNT, per="account")),
+    ],
+)
+async def login_access_token(
+    db: AsyncSession = Depends(deps.get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = (await db.execute(select(models.User).filter(models.User.email == form_data.username))).scalars().first()
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-    
-    access_token = security.create_access_token(data={"sub": user.email})
+
+    # Transparently move the stored hash to the configured cost factor
+    if security.needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await password_hasher.hash(form_data.password)
+            await db.commit()
+        except PasswordHasherBusy:
+            pass  # try again on a later login
+
+    access_token = security.create_access_token(data=security.user_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/signup", response_model=schemas.User)
-def create_user(
+@router.post(
+    "/signup",
+    response_model=schemas.User,
+    dependencies=[Depends(deps.rate_limit("signup-ip", settings.RATE_LIMIT_SIGNUP_PER_IP))],
+)
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: schemas.UserCreate,
 ):
-    user = db.query(models.User).filter(models.User.email == user_in.email).first()
+    user = (await db.execute(select(models.User).filter(models.User.email == user_in.email))).scalars().first()
     if user:
         raise HTTPException(
             status_code=400,
@@ -35,14 +57,14 @@ def create_user(
     # Create the user with the specified role
     user = models.User(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=await password_hasher.hash(user_in.password),
         full_name=user_in.full_name,
         is_active=True,
         role=user_in.role or "patient"
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     # If role is doctor, create an empty doctor profile
     if user.role == "doctor":
@@ -63,12 +85,12 @@ def create_user(
             bio={"en": dp.get("bio", ""), "hi": "", "pa": ""}
         )
         db.add(doctor_profile)
-        db.commit()
+        await db.commit()
 
     return user
 
 @router.get("/me", response_model=schemas.User)
-def read_user_me(
+async def read_user_me(
     current_user: models.User = Depends(deps.get_current_user),
 ):
     return current_user
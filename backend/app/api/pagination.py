@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A cursor is the ordering key of the last row on a page, base64-encoded. The
+next page seeks past it with a row-value comparison, e.g.
+WHERE (date, time, id) > (:date, :time, :id), which is an index range scan
+no matter how deep the page is. skip/limit keeps working; the next cursor is
+returned in the X-Next-Cursor header either way.
+"""
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.readonly import is_entity_select
+
+CURSOR_HEADER = "X-Next-Cursor"
+
+CursorParam = Query(None, description=f"Opaque cursor from the {CURSOR_HEADER} header of the previous page")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, time)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_from_json(v, column) for v, column in zip(values, columns)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _from_json(value, column):
+    python_type = column.type.python_type
+    if python_type in (date, time, datetime):
+        return python_type.fromisoformat(value)
+    if not isinstance(value, python_type):
+        raise TypeError
+    return value
+
+
+def ordered(query: Select, columns: Sequence, descending: bool = False) -> Select:
+    return query.order_by(*(c.desc() if descending else c for c in columns))
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    columns: Sequence,
+    *,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Order `query` by `columns` (which must end in a unique column), apply the
+    cursor or skip, and return (rows, next_cursor). Rows are ORM instances for
+    select(Model) and Core Rows for column selects. next_cursor is None on the
+    last page.
+    """
+    key = tuple_(*columns)
+    query = ordered(query, columns, descending)
+    if cursor:
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < values if descending else key > values)
+    elif skip:
+        query = query.offset(skip)
+
+    # One extra row tells us whether there is a next page
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.scalars().all() if is_entity_select(query) else result.all()
+    if len(rows) <= limit or limit <= 0:
+        return rows[:max(limit, 0)], None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], c.key) for c in columns])
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
@@ -0,0 +1,115 @@
+"""
+Fast serialization for list endpoints.
+
+Rows loaded through the ORM are already typed by the database, so validating
+them again against the response_model only costs CPU. list_response() turns
+them into dicts with a per-schema encoder built once from the schema's fields
+and renders the result with orjson. The response_model stays on the route for
+the OpenAPI docs; FAST_JSON_RESPONSES=false falls back to FastAPI's own path.
+
+Clients sending `Accept: application/x-ndjson` get one JSON object per line,
+streamed from a server-side cursor, for exports too large to hold in memory.
+"""
+import typing
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, List, Optional, Type
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, PlainSerializer
+from sqlalchemy import Row, Select
+
+from app.core.config import settings
+from app.db.readonly import is_entity_select
+from app.db.session import AsyncSessionLocal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def _nested_model(annotation) -> Optional[Type[BaseModel]]:
+    """The BaseModel in `Model` or `Optional[Model]`, if any."""
+    candidates = typing.get_args(annotation) or (annotation,)
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=None)
+def row_encoder(schema: Type[BaseModel]) -> Callable[[Any], dict]:
+    """
+    Function turning an ORM row into the dict `schema` would serialize to,
+    without validation. Handles nested models and PlainSerializer fields.
+    Attributes are read from the instance __dict__, so they must be loaded
+    (true for query results with expire_on_commit=False).
+    """
+    fields = []
+    for name, field in schema.model_fields.items():
+        nested = _nested_model(field.annotation)
+        convert = row_encoder(nested) if nested is not None else None
+        for meta in field.metadata:
+            if isinstance(meta, PlainSerializer):
+                convert = meta.func
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        fields.append((name, convert, default))
+
+    def encode(row) -> dict:
+        # ORM objects, Core rows, or plain dicts such as the symptom index entries
+        if isinstance(row, Row):
+            get = dict(zip(row._fields, row)).get
+        else:
+            get = row.get if isinstance(row, dict) else row.__dict__.get
+        out = {}
+        for name, convert, default in fields:
+            value = get(name, default)
+            if value is not None and convert is not None:
+                value = convert(value)
+            out[name] = value
+        return out
+
+    return encode
+
+
+def list_response(schema: Type[BaseModel], rows: List[Any], response: Optional[Response] = None):
+    """
+    Serialize trusted ORM rows. Headers already set on the injected `response`
+    (e.g. X-Next-Cursor) are carried over.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return rows
+    encode = row_encoder(schema)
+    headers = dict(response.headers) if response is not None else None
+    if headers:
+        headers.pop("content-length", None)
+    return FastJSONResponse([encode(row) for row in rows], headers=headers)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(schema: Type[BaseModel], query: Select, batch_size: int = 500) -> StreamingResponse:
+    """
+    Stream every row of `query` as NDJSON. Uses its own session so the
+    connection lives exactly as long as the stream.
+    """
+    encode = row_encoder(schema)
+
+    async def lines() -> AsyncIterator[bytes]:
+        async with AsyncSessionLocal() as db:
+            streamed = query.execution_options(yield_per=batch_size)
+            if is_entity_select(query):
+                result = await db.stream_scalars(streamed)
+            else:
+                result = await db.stream(streamed)
+            async for partition in result.partitions():
+                yield b"".join(orjson.dumps(encode(row), option=ORJSON_OPTIONS) + b"\n" for row in partition)
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
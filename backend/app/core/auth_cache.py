@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.security import ACCESS_TOKEN_MAX_LIFETIME_SECONDS
+from app.db.session import AsyncSessionLocal
+from app.models.data_version import DataVersion
+from app.models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+# Bumped by a trigger on every write to token_revocations (alembic revision 0008)
+REVOCATIONS_VERSION = select(DataVersion.version).where(DataVersion.name == "token_revocations")
+
+
+def _as_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+class RevocationList:
+    """Per-user "tokens issued before this instant are invalid" markers.
+
+    Checked on every authenticated request, so it is a plain dict lookup. The
+    markers live in the token_revocations table; a revocation applies at once
+    in the worker that made it, and other workers reload the table when its
+    data version changes, polled every TOKEN_REVOCATION_CHECK_SECONDS. Entries
+    are dropped once every token they could apply to has expired anyway.
+    """
+
+    def __init__(self):
+        self._revoked_before: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None  # token_revocations data version last loaded
+        self.checked_at = 0.0
+
+    async def revoke_user(self, db: AsyncSession, user_id: int) -> None:
+        """Record the revocation in the caller's transaction; other workers see it once committed."""
+        now = time.time()
+        stmt = insert(TokenRevocation).values(user_id=user_id, revoked_before=_as_datetime(now))
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[TokenRevocation.user_id], set_={"revoked_before": stmt.excluded.revoked_before},
+        ))
+        horizon = _as_datetime(now - ACCESS_TOKEN_MAX_LIFETIME_SECONDS)
+        await db.execute(delete(TokenRevocation).where(TokenRevocation.revoked_before < horizon))
+        self._merge({user_id: now}, now)
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Load the table if its data version changed since the last load."""
+        version = (await db.execute(REVOCATIONS_VERSION)).scalar()
+        if version == self.version:
+            return
+        now = time.time()
+        rows = await db.execute(
+            select(TokenRevocation.user_id, TokenRevocation.revoked_before)
+            .where(TokenRevocation.revoked_before >= _as_datetime(now - ACCESS_TOKEN_MAX_LIFETIME_SECONDS))
+        )
+        self._merge({user_id: revoked_before.timestamp() for user_id, revoked_before in rows}, now)
+        self.version = version
+
+    async def ensure_fresh(self) -> None:
+        now = time.monotonic()
+        if now - self.checked_at < settings.TOKEN_REVOCATION_CHECK_SECONDS:
+            return
+        self.checked_at = now
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.refresh(db)
+        except (SQLAlchemyError, OSError):
+            # Keep the revocations already known; tried again after the interval
+            logger.warning("Reloading token revocations failed", exc_info=True)
+
+    def is_revoked(self, user_id: int, issued_at: Optional[float]) -> bool:
+        revoked_before = self._revoked_before.get(user_id)
+        if revoked_before is None:
+            return False
+        return issued_at is None or issued_at <= revoked_before
+
+    def _merge(self, revoked_before: Dict[int, float], now: float) -> None:
+        with self._lock:
+            for user_id, timestamp in revoked_before.items():
+                self._revoked_before[user_id] = max(timestamp, self._revoked_before.get(user_id, 0.0))
+            self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        horizon = now - ACCESS_TOKEN_MAX_LIFETIME_SECONDS
+        for user_id in [u for u, t in self._revoked_before.items() if t < horizon]:
+            del self._revoked_before[user_id]
+
+
+revocations = RevocationList()
+# token -> schemas.TokenData, kept until the token expires
+verified_tokens = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    await revocations.revoke_user(db, user_id)
@@ -28,11 +28,109 @@ class Settings(BaseSettings):
         "DATABASE_URL", 
         f"postgresql://{os.getenv('POSTGRES_USER', 'postgres')}:{os.getenv('POSTGRES_PASSWORD', 'changeme')}@{os.getenv('POSTGRES_SERVER', 'db')}/{os.getenv('POSTGRES_DB', 'telemedicine')}"
     )
+    # Optional override; by default derived from DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL_OVERRIDE: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        if self.ASYNC_DATABASE_URL_OVERRIDE:
+            return self.ASYNC_DATABASE_URL_OVERRIDE
+        url = self.DATABASE_URL
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if url.startswith(prefix):
+                return "postgresql+asyncpg://" + url[len(prefix):]
+        return url
+
+    # Connection pool (applies to both the sync and the async engine)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables
+    # PgBouncer transaction pooling: no app-side pool, no server-side prepared statements
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Startup: migrations always run; demo data is loaded when missing or changed
+    SEED_DEMO_DATA: bool = True
+    DB_STARTUP_RETRIES: int = 10
+    DB_STARTUP_BACKOFF_SECONDS: float = 0.5  # doubled after each failed attempt
+    DB_STARTUP_BACKOFF_MAX_SECONDS: float = 10.0
+
+    # Slots generated from schedule rules this many days ahead (startup, rule edits, cron)
+    SLOT_HORIZON_DAYS: int = 60
+
+    # Health record files: "local" (FILE_STORAGE_PATH) or "s3" (needs boto3; credentials
+    # from the usual AWS_* variables, FILE_STORAGE_S3_ENDPOINT_URL for MinIO and the like)
+    FILE_STORAGE_BACKEND: str = "local"
+    FILE_STORAGE_PATH: str = "storage"
+    FILE_UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    # Behind nginx: answer downloads with X-Accel-Redirect to this internal location so
+    # nginx serves the file with sendfile, e.g. "/protected-files/" aliased to FILE_STORAGE_PATH
+    FILE_STORAGE_ACCEL_REDIRECT: str = ""
+    FILE_STORAGE_S3_BUCKET: str = ""
+    FILE_STORAGE_S3_PREFIX: str = "health-records/"
+    FILE_STORAGE_S3_ENDPOINT_URL: str = ""
+    FILE_STORAGE_S3_REGION: str = ""
+    FILE_STORAGE_S3_PART_SIZE: int = 8 * 1024 * 1024  # multipart upload part, at least 5 MiB
+    # Redirect downloads to a presigned URL instead of proxying them through the API
+    FILE_STORAGE_S3_PRESIGN_DOWNLOADS: bool = False
+    FILE_STORAGE_S3_PRESIGN_SECONDS: int = 300
+
+    # Auth: number of verified JWTs kept decoded in memory
+    TOKEN_CACHE_SIZE: int = 10000
+    # How often a worker checks for tokens revoked by another worker
+    TOKEN_REVOCATION_CHECK_SECONDS: float = 5.0
+
+    # Password hashing: bcrypt runs in a separate process pool with a bounded queue
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # pending jobs beyond the busy workers before 429
+
+    # Rate limits (token buckets, see app/core/rate_limit.py): "<count>/<second|minute|hour|day>",
+    # empty to disable one. "memory" buckets are per worker; "redis" shares them (needs redis)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    RATE_LIMIT_REDIS_PREFIX: str = "ratelimit:"
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.25  # seconds; on errors the worker's memory buckets are used
+    RATE_LIMIT_MEMORY_KEYS: int = 100000
+    RATE_LIMIT_LOGIN_PER_IP: str = "30/minute"
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = "10/minute"
+    RATE_LIMIT_SIGNUP_PER_IP: str = "10/hour"
+    RATE_LIMIT_AI_PER_USER: str = "20/minute"
+    RATE_LIMIT_AI_PER_IP: str = "60/minute"
 
     # AI (Ollama)
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434/v1")
     OLLAMA_API_KEY: str = "ollama"
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3:8b")
+    OLLAMA_CONNECT_TIMEOUT: float = 5.0
+    OLLAMA_TIMEOUT: float = 60.0  # whole generation, non-streaming
+    OLLAMA_STREAM_IDLE_TIMEOUT: float = 30.0  # max gap between streamed chunks
+    OLLAMA_MAX_RETRIES: int = 1
+    # Inference scheduler in front of the single Ollama instance
+    AI_MAX_INFLIGHT: int = 2
+    AI_MAX_QUEUE: int = 32
+    AI_MAX_QUEUE_WAIT_SECONDS: float = 30.0  # reject when the estimated wait is longer
+    AI_EXPECTED_LATENCY_SECONDS: float = 10.0  # initial estimate, refined from observed latency
+    # Curated remedies answer /ai/remedy directly when the symptom match is this confident
+    # (0.85 allows one typo in a word of 7 letters or more)
+    SYMPTOM_MATCH_MIN_CONFIDENCE: float = 0.85
+    SYMPTOM_INDEX_REFRESH_SECONDS: int = 300
+    # How often a worker checks whether remedies were changed by another process
+    SYMPTOM_INDEX_VERSION_CHECK_SECONDS: float = 5.0
+    AI_CACHE_SIZE: int = 1024  # in-memory entries
+    AI_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+
+    # List endpoints serialize ORM rows directly with orjson instead of re-validating them
+    FAST_JSON_RESPONSES: bool = True
+
+    # Metrics (/metrics): request latency is always recorded, SQL timing for a sample
+    METRICS_ENABLED: bool = True
+    METRICS_SQL_SAMPLE_RATE: float = 1.0  # e.g. 0.05 in production
+    METRICS_SLOW_QUERY_MS: float = 100.0
+    METRICS_SLOW_QUERY_SAMPLES: int = 100  # distinct normalized statements kept
 
     class Config:
         case_sensitive = True
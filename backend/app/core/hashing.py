@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.core import security
+from app.core.config import settings
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or the pool keeps crashing; callers should answer 429."""
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool.
+
+    bcrypt holds a CPU for ~250ms per call, so running it on the request threads
+    lets a login spike starve every other endpoint. Jobs beyond `max_pending`
+    (busy workers + queue) are rejected immediately instead of piling up.
+    A worker that dies (OOM kill, segfault) breaks the whole pool; it is
+    replaced and the job retried once.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.pending = 0
+        self.rejected = 0
+        self.restarts = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        if self._executor is None:
+            # spawn: don't fork the running server (threads, sockets, event loop)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # Concurrent jobs all see the same broken pool; only the first replaces it
+        if self._executor is executor:
+            self._executor = None
+            self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, fn, *args):
+        self.start()
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    async def _run(self, fn, *args):
+        # Only touched from the event loop thread, so a plain counter is enough
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.pending += 1
+        try:
+            try:
+                return await self._submit(fn, *args)
+            except BrokenProcessPool:
+                # Once more on the new pool; a job that crashes it again is not retried
+                try:
+                    return await self._submit(fn, *args)
+                except BrokenProcessPool:
+                    raise PasswordHasherBusy()
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password, settings.BCRYPT_ROUNDS)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
@@ -0,0 +1,283 @@
+"""
+Request and SQL metrics, exposed in Prometheus text format on /metrics.
+
+MetricsMiddleware times every request per route template. SQL statements are
+counted and timed by cursor-execute hooks, attributed to the request that ran
+them through a context variable. Statement-level recording only happens for a
+METRICS_SQL_SAMPLE_RATE fraction of requests, so production can keep request
+latency for everything and pay for SQL timing on a sample.
+"""
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, running = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            out.append((_format_number(bound), running))
+        out.append(("+Inf", self.count))
+        return out
+
+
+class RequestStats:
+    """SQL activity of one sampled request."""
+    __slots__ = ("statements", "sql_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("metrics_request", default=None)
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"::\w+(?:\[\])?"), ""),
+    (re.compile(r"\$\d+|%\(\w+\)s|%s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL text with literals and parameters replaced, for grouping samples."""
+    for pattern, replacement in _LITERALS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+class MetricsRegistry:
+    def __init__(self, slow_query_ms: float, slow_query_samples: int):
+        self._lock = threading.Lock()
+        self.slow_query_seconds = slow_query_ms / 1000.0
+        self.requests: Dict[Tuple[str, str, str], Histogram] = {}
+        self.sql_statements: Dict[Tuple[str, str], Histogram] = {}
+        self.sql_seconds: Dict[Tuple[str, str], Histogram] = {}
+        self.slow_queries = LRUCache(maxsize=slow_query_samples)
+        self.slow_query_total = 0
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float,
+                        stats: Optional[RequestStats]) -> None:
+        status_class = f"{status // 100}xx"
+        with self._lock:
+            key = (method, route, status_class)
+            hist = self.requests.get(key)
+            if hist is None:
+                hist = self.requests[key] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            if stats is not None:
+                key = (method, route)
+                if key not in self.sql_statements:
+                    self.sql_statements[key] = Histogram(STATEMENT_BUCKETS)
+                    self.sql_seconds[key] = Histogram(LATENCY_BUCKETS)
+                self.sql_statements[key].observe(stats.statements)
+                self.sql_seconds[key].observe(stats.sql_seconds)
+
+    def observe_statement(self, stats: RequestStats, statement: str, seconds: float) -> None:
+        stats.statements += 1
+        stats.sql_seconds += seconds
+        if seconds < self.slow_query_seconds:
+            return
+        normalized = normalize_sql(statement)
+        with self._lock:
+            self.slow_query_total += 1
+            sample = self.slow_queries.get(normalized)
+            if sample is None:
+                sample = {"query": normalized, "count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+            sample["count"] += 1
+            sample["total_seconds"] += seconds
+            sample["max_seconds"] = max(sample["max_seconds"], seconds)
+            self.slow_queries.set(normalized, sample)
+
+    def slow_query_samples(self) -> List[dict]:
+        with self._lock:
+            samples = [dict(v) for v in self.slow_queries.values()]
+        return sorted(samples, key=lambda s: s["max_seconds"], reverse=True)
+
+    def render(self, extra: Optional[List[str]] = None) -> str:
+        lines: List[str] = []
+        with self._lock:
+            _render_histograms(
+                lines, "http_request_duration_seconds", "Request latency by route",
+                ("method", "route", "status"), self.requests,
+            )
+            _render_histograms(
+                lines, "http_request_sql_statements", "SQL statements per sampled request",
+                ("method", "route"), self.sql_statements,
+            )
+            _render_histograms(
+                lines, "http_request_sql_duration_seconds", "Time in SQL per sampled request",
+                ("method", "route"), self.sql_seconds,
+            )
+            lines.append("# HELP sql_slow_queries_total Statements slower than METRICS_SLOW_QUERY_MS")
+            lines.append("# TYPE sql_slow_queries_total counter")
+            lines.append(f"sql_slow_queries_total {self.slow_query_total}")
+        samples = self.slow_query_samples()
+        if samples:
+            lines.append("# HELP sql_slow_query_max_seconds Slowest run of each sampled slow statement")
+            lines.append("# TYPE sql_slow_query_max_seconds gauge")
+            for sample in samples:
+                label = _labels(("query",), (sample["query"][:300],))
+                lines.append(f"sql_slow_query_max_seconds{label} {_format_number(sample['max_seconds'])}")
+        lines.extend(extra or [])
+        return "\n".join(lines) + "\n"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+def _render_histograms(lines, name, help_text, label_names, histograms) -> None:
+    if not histograms:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, hist in sorted(histograms.items()):
+        for bound, count in hist.cumulative():
+            lines.append(f"{name}_bucket{_labels(label_names + ('le',), key + (bound,))} {count}")
+        labels = _labels(label_names, key)
+        lines.append(f"{name}_sum{labels} {_format_number(hist.sum)}")
+        lines.append(f"{name}_count{labels} {hist.count}")
+
+
+def render_pool_snapshots(snapshots: Dict[str, dict]) -> List[str]:
+    """Gauges/counters for PoolMetrics.snapshot() results, keyed by engine name."""
+    fields = [
+        ("db_pool_checked_out", "gauge", "Connections in use", lambda s: s["checked_out"]),
+        ("db_pool_idle", "gauge", "Idle pooled connections", lambda s: s["idle"]),
+        ("db_pool_overflow", "gauge", "Connections above pool size", lambda s: s["overflow"]),
+        ("db_pool_checkouts_total", "counter", "Connection checkouts", lambda s: s["checkouts"]),
+        ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection",
+         lambda s: s["wait"]["total_ms"] / 1000.0),
+        ("db_pool_timeouts_total", "counter", "Checkouts that timed out", lambda s: s["wait"]["timeouts"]),
+    ]
+    lines = []
+    for name, kind, help_text, value in fields:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for engine_name, snapshot in sorted(snapshots.items()):
+            lines.append(f"{name}{_labels(('engine',), (engine_name,))} {_format_number(value(snapshot))}")
+    return lines
+
+
+metrics = MetricsRegistry(
+    slow_query_ms=settings.METRICS_SLOW_QUERY_MS,
+    slow_query_samples=settings.METRICS_SLOW_QUERY_SAMPLES,
+)
+
+
+def attach_sql_metrics(engine: Engine) -> None:
+    """
+    Time statements on `engine` (a sync Engine or AsyncEngine.sync_engine) run
+    by sampled requests; everything else costs one context variable lookup.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current_request.get() is not None:
+            conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_request.get()
+        if stats is not None and conn.info.get("metrics_start"):
+            started = conn.info["metrics_start"].pop()
+            metrics.observe_statement(stats, statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_start"):
+            conn.info["metrics_start"].pop()
+
+
+def route_template(scope) -> str:
+    """
+    Full path template of the matched route, e.g. /api/v1/appointments/{id}.
+    Depending on the FastAPI version the route only knows its path relative to
+    the router it was included in, so the prefix is recovered from the request
+    path. Unmatched paths share one label so scanners cannot blow up cardinality.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    path = scope.get("path", "")
+    try:
+        concrete = getattr(route, "path_format", template).format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if concrete != path and path.endswith(concrete):
+        return path[: len(path) - len(concrete)] + template
+    return template
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency (and sampled SQL usage) per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats() if random.random() < settings.METRICS_SQL_SAMPLE_RATE else None
+        token = _current_request.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            metrics.observe_request(
+                scope["method"], route_template(scope), status, time.perf_counter() - started, stats
+            )
@@ -0,0 +1,191 @@
+"""
+Token-bucket rate limits for the expensive endpoints (bcrypt on login and
+signup, the LLM behind /ai/remedy).
+
+A limit such as "10/minute" is a bucket of 10 tokens refilled at 10 per
+minute; each request takes one, and an empty bucket answers 429 with
+Retry-After set to the time until the next token. Buckets are keyed by
+limit name and client (IP, user id or account), so every route and client
+has its own.
+
+Backends (RATE_LIMIT_BACKEND):
+
+- "memory": buckets in a dict in the worker process, a lookup and a little
+  arithmetic per request. With N workers a client effectively gets N buckets.
+- "redis": buckets shared by every worker, updated atomically by a Lua script
+  (one round trip) using the Redis clock. Needs the redis package
+  (pip install redis). When Redis cannot be reached the worker falls back to
+  its memory buckets rather than failing the request. Tests can pass any
+  redis.asyncio compatible client, e.g. fakeredis.aioredis.FakeRedis().
+
+Per-IP limits use request.client.host, the address of the TCP peer. Behind
+nginx or any other reverse proxy that is the proxy, so all clients would share
+one bucket and the whole site would be throttled together. Have the proxy set
+X-Forwarded-For (proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for)
+and run uvicorn with --proxy-headers --forwarded-allow-ips=<proxy address>, so
+that request.client is the real client. Only trust the proxy's address: with
+"*" any client can pick its own bucket by sending the header.
+"""
+import math
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Limit(NamedTuple):
+    rate: float  # tokens per second
+    burst: int  # bucket size
+
+
+def parse_limit(spec: str) -> Optional[Limit]:
+    """ "20/minute" -> Limit(rate=20/60, burst=20). An empty spec means no limit."""
+    if not spec:
+        return None
+    count, _, period = spec.partition("/")
+    try:
+        count, seconds = int(count), PERIODS[period.strip().rstrip("s")]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {spec!r}, expected e.g. '20/minute'")
+    if count <= 0:
+        raise ValueError(f"Invalid rate limit {spec!r}, count must be positive")
+    return Limit(rate=count / seconds, burst=count)
+
+
+class RateLimited(Exception):
+    """The client's bucket is empty; answer 429."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Rate limit {name} exceeded, retry after {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class MemoryBuckets:
+    """
+    Per-process buckets: key -> (tokens, last update). Only touched from the
+    event loop thread, so no lock. Above `max_keys`, buckets that have refilled
+    completely are dropped, since a missing bucket is a full one.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+
+    def take(self, key: str, limit: Limit, cost: int = 1) -> float:
+        """Take `cost` tokens; returns 0, or the seconds until they are available."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = limit.burst
+        else:
+            tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+        if tokens < cost:
+            return (cost - tokens) / limit.rate
+        tokens -= cost
+        # Also store when the bucket will be full again, for pruning
+        self._buckets[key] = (tokens, now, now + (limit.burst - tokens) / limit.rate)
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return 0.0
+
+    def _prune(self, now: float) -> None:
+        self._buckets = {k: b for k, b in self._buckets.items() if b[2] > now}
+        # Still full of active clients: forget the oldest half (insertion order)
+        if len(self._buckets) > self.max_keys:
+            keep = list(self._buckets.items())[len(self._buckets) // 2:]
+            self._buckets = dict(keep)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS[1] bucket; ARGV rate (tokens/s), burst, cost. Returns the wait in seconds
+# as a string (Lua numbers would come back truncated to integers).
+TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(bucket[1])
+if tokens == nil then
+  tokens = burst
+else
+  tokens = math.min(burst, tokens + math.max(0, now - tonumber(bucket[2])) * rate)
+end
+if tokens < cost then
+  return tostring((cost - tokens) / rate)
+end
+tokens = tokens - cost
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) / rate * 1000) + 1000)
+return '0'
+"""
+
+
+class RedisBuckets:
+    def __init__(self, client=None):
+        try:
+            import redis.asyncio
+            from redis.exceptions import RedisError
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs redis (pip install redis)")
+        if client is None:
+            client = redis.asyncio.from_url(
+                settings.RATE_LIMIT_REDIS_URL,
+                socket_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.RATE_LIMIT_REDIS_TIMEOUT,
+            )
+        self.client = client
+        self.errors = (RedisError, OSError)
+        # EVALSHA, loading the script again after a Redis restart
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: Limit, cost: int = 1) -> float:
+        wait = await self._take(keys=[settings.RATE_LIMIT_REDIS_PREFIX + key], args=[limit.rate, limit.burst, cost])
+        return float(wait)
+
+
+class RateLimiter:
+    def __init__(self):
+        self.memory = MemoryBuckets(settings.RATE_LIMIT_MEMORY_KEYS)
+        self.shared: Optional[RedisBuckets] = None
+        self.rejected: Dict[str, int] = {}
+        self.backend_errors = 0
+
+    def use_redis(self, client=None) -> None:
+        self.shared = RedisBuckets(client)
+
+    async def hit(self, name: str, identity: str, limit: Limit, cost: int = 1) -> None:
+        """Charge `identity` for one request to `name`; raises RateLimited when over."""
+        key = f"{name}:{identity}"
+        if self.shared is None:
+            wait = self.memory.take(key, limit, cost)
+        else:
+            try:
+                wait = await self.shared.take(key, limit, cost)
+            except self.shared.errors:
+                self.backend_errors += 1
+                wait = self.memory.take(key, limit, cost)
+        if wait:
+            self.rejected[name] = self.rejected.get(name, 0) + 1
+            raise RateLimited(name, wait)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis" if self.shared is not None else "memory",
+            "memory_buckets": len(self.memory),
+            "rejected": dict(self.rejected),
+            "backend_errors": self.backend_errors,
+        }
+
+
+rate_limiter = RateLimiter()
+if settings.RATE_LIMIT_BACKEND == "redis":
+    rate_limiter.use_redis()
+elif settings.RATE_LIMIT_BACKEND != "memory":
+    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND {settings.RATE_LIMIT_BACKEND!r}")
@@ -4,4 +4,11 @@ from app.models.doctor import Doctor
 from app.models.appointment import Appointment
 from app.models.product import Product
 from app.models.remedy import Remedy
+from app.models.stored_file import StoredFile
 from app.models.health_record import HealthRecord
+from app.models.ai_cache import AIRemedyCache
+from app.models.slot_count import DoctorSlotCount
+from app.models.seed_version import SeedVersion
+from app.models.data_version import DataVersion
+from app.models.token_revocation import TokenRevocation
+from app.models.schedule import ScheduleRule, ScheduleException
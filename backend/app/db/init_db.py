@@ -1,175 +1,237 @@
+"""
+Database setup run at startup: apply pending migrations (app/db/migrate.py),
+then load the demo seed data when it is missing or backend/data changed since
+it was loaded, as recorded in seed_versions. Loading is idempotent (bulk
+INSERT ... ON CONFLICT DO NOTHING on the natural keys), so rows edited or
+added since are left alone and existing users are never re-hashed.
+
+    python -m app.db.init_db           # migrate, seed if needed
+    python -m app.db.init_db --reset   # dev only: drop everything and start over
+"""
+import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as Date
+from typing import Dict, Iterable
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from app.models.doctor import Doctor
 from app.models.product import Product
 from app.models.remedy import Remedy
 from app.models.appointment import Appointment
+from app.models.seed_version import SeedVersion
 from app.models.user import User
+from app.db import migrate
 from app.db.base_models import Base
-from app.db.session import engine
+from app.db.session import SessionLocal, engine
 from app.core.security import get_password_hash
+from app.schemas.common import parse_slot_time
+from app.services.slot_counters import rebuild_statements
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "../../data")
+SEED_NAME = "demo"
+SEED_FILES = ("doctors.json", "shop.json", "remedies.json", "slots.json")
+# Bump when the loading code below changes in a way that needs a re-run
+SEED_REVISION = "1"
+
+SEED_PATIENTS = [
+    {"email": "patient1@example.com", "name": "Rahul Kumar", "password": "password"},
+    {"email": "patient2@example.com", "name": "Sita Devi", "password": "password"},
+    {"email": "patient3@example.com", "name": "Amit Singh", "password": "password"},
+    {"email": "test@example.com", "name": "Test User", "password": "testpassword"},
+]
 
 # Load JSON data
 def load_json(filename):
-    file_path = os.path.join(os.path.dirname(__file__), "../../data", filename)
+    file_path = os.path.join(DATA_DIR, filename)
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
         return None
     with open(file_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def init_db(db: Session):
-    # WARNING: This drops all data. Use only for initial setup or dev.
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
-
-    # 1. Seed Admin User
-    admin_user = User(
-        email="admin@example.com",
-        hashed_password=get_password_hash("adminpassword"),
-        full_name="System Admin",
-        role="admin",
-        is_active=True,
-        is_superuser=True
-    )
-    db.add(admin_user)
-    
-    # 2. Seed Patient Users
-    patients = [
-        {"email": "patient1@example.com", "name": "Rahul Kumar"},
-        {"email": "patient2@example.com", "name": "Sita Devi"},
-        {"email": "patient3@example.com", "name": "Amit Singh"},
-        {"email": "test@example.com", "name": "Test User"},
-    ]
-    db_patients = []
-    for p in patients:
-        user = User(
-            email=p["email"],
-            hashed_password=get_password_hash("password" if p["email"] != "test@example.com" else "testpassword"),
-            full_name=p["name"],
-            role="patient",
-            is_active=True
-        )
-        db.add(user)
-        db_patients.append(user)
-    
-    db.flush()
-    print(f"Seeded {len(db_patients)} patients.")
-
-    # 3. Seed Doctors
-    doctors_data = load_json("doctors.json")
-    doctors_map = {}
-    if doctors_data:
-        for item in doctors_data.get("doctors", []):
-            email = f"{item['id']}@example.com"
-            user = User(
-                email=email,
-                hashed_password=get_password_hash("password"),
-                full_name=item["name"]["en"],
-                role="doctor",
-                is_active=True
-            )
-            db.add(user)
-            db.flush()
-
-            doc = Doctor(
-                user_id=user.id,
-                doctor_id=item["id"],
-                name=item["name"],
-                qualification=item["qualification"],
-                specialization=item["specialization"],
-                experience=item["experience"],
-                image=item["image"],
-                rating=item["rating"],
-                reviews=item["reviews"],
-                availability=item.get("available", True),
-                fees=item.get("consultationFee"),
-                languages=item["languages"],
-                bio=item.get("description")
-            )
-            db.add(doc)
-            db.flush()
-            doctors_map[item["id"]] = doc.id
-        print(f"Seeded {len(doctors_map)} doctors.")
-
-    # 4. Seed Products
+def seed_version() -> str:
+    """Hash of the seed files and SEED_REVISION; a new value triggers a re-run."""
+    digest = hashlib.sha256(SEED_REVISION.encode())
+    for filename in SEED_FILES:
+        path = os.path.join(DATA_DIR, filename)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(filename.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:16]
+
+def hash_passwords(passwords: Iterable[str]) -> Dict[str, str]:
+    """
+    One bcrypt hash per distinct password, computed in parallel threads (bcrypt
+    releases the GIL). Seed accounts share a handful of passwords, so this is
+    two or three hashes instead of one per user.
+    """
+    distinct = sorted(set(passwords))
+    if not distinct:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(distinct)) as pool:
+        return dict(zip(distinct, pool.map(get_password_hash, distinct)))
+
+def insert_missing(db: Session, model, rows: list) -> None:
+    """Bulk insert, skipping rows whose unique keys already exist."""
+    if rows:
+        db.execute(insert(model).on_conflict_do_nothing(), rows)
+
+def seed_demo_data(db: Session) -> None:
+    doctors_data = (load_json("doctors.json") or {}).get("doctors", [])
+
+    # 1. Users: admin, patients and one login per doctor
+    accounts = [{"email": "admin@example.com", "full_name": "System Admin", "role": "admin",
+                 "is_superuser": True, "password": "adminpassword"}]
+    accounts += [{"email": p["email"], "full_name": p["name"], "role": "patient",
+                  "is_superuser": False, "password": p["password"]} for p in SEED_PATIENTS]
+    accounts += [{"email": f"{item['id']}@example.com", "full_name": item["name"]["en"], "role": "doctor",
+                  "is_superuser": False, "password": "password"} for item in doctors_data]
+    emails = [a["email"] for a in accounts]
+    existing = set(db.execute(select(User.email).where(User.email.in_(emails))).scalars())
+    new_accounts = [a for a in accounts if a["email"] not in existing]
+    hashes = hash_passwords(a["password"] for a in new_accounts)
+    insert_missing(db, User, [
+        {"email": a["email"], "hashed_password": hashes[a["password"]], "full_name": a["full_name"],
+         "role": a["role"], "is_active": True, "is_superuser": a["is_superuser"]}
+        for a in new_accounts
+    ])
+    user_ids = dict(db.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+    print(f"Seeded {len(new_accounts)} users.")
+
+    # 2. Doctors
+    insert_missing(db, Doctor, [
+        {
+            "user_id": user_ids[f"{item['id']}@example.com"],
+            "doctor_id": item["id"],
+            "name": item["name"],
+            "qualification": item["qualification"],
+            "specialization": item["specialization"],
+            "experience": item["experience"],
+            "image": item["image"],
+            "rating": item["rating"],
+            "reviews": item["reviews"],
+            "availability": item.get("available", True),
+            "fees": item.get("consultationFee"),
+            "languages": item["languages"],
+            "bio": item.get("description"),
+        }
+        for item in doctors_data
+    ])
+    doctors_map = dict(db.execute(
+        select(Doctor.doctor_id, Doctor.id).where(Doctor.doctor_id.in_([item["id"] for item in doctors_data]))
+    ).all())
+    print(f"Seeded {len(doctors_map)} doctors.")
+
+    # 3. Products
     shop_data = load_json("shop.json")
     if shop_data:
-        for item in shop_data.get("medicines", []):
-            prod = Product(
-                product_id=item["id"],
-                name=item["name"],
-                generic_name=item["genericName"],
-                brand=item["brand"],
-                category=item["category"],
-                price=item["price"],
-                original_price=item["originalPrice"],
-                image=item["image"],
-                description=item["description"],
-                prescription_required=item["prescriptionRequired"],
-                in_stock=item["inStock"],
-                pack_size=item["packSize"],
-                dosage=item["dosage"],
-                manufacturer=item["manufacturer"],
-                uses=item["uses"],
-                rating=item["rating"],
-                reviews=item["reviews"]
-            )
-            db.add(prod)
+        insert_missing(db, Product, [
+            {
+                "product_id": item["id"],
+                "name": item["name"],
+                "generic_name": item["genericName"],
+                "brand": item["brand"],
+                "category": item["category"],
+                "price": item["price"],
+                "original_price": item["originalPrice"],
+                "image": item["image"],
+                "description": item["description"],
+                "prescription_required": item["prescriptionRequired"],
+                "in_stock": item["inStock"],
+                "pack_size": item["packSize"],
+                "dosage": item["dosage"],
+                "manufacturer": item["manufacturer"],
+                "uses": item["uses"],
+                "rating": item["rating"],
+                "reviews": item["reviews"],
+            }
+            for item in shop_data.get("medicines", [])
+        ])
         print("Products seeded.")
-    
-    # 5. Seed Remedies
+
+    # 4. Remedies
     remedies_data = load_json("remedies.json")
     if remedies_data:
-        for item in remedies_data.get("remedies", []):
-            rem = Remedy(
-                remedy_id=item["id"],
-                symptoms=item["symptoms"],
-                title=item["title"],
-                description=item["description"],
-                remedies_list=item["remedies"],
-                warning=item["warning"],
-                audio_text=item["audioText"]
-            )
-            db.add(rem)
+        insert_missing(db, Remedy, [
+            {
+                "remedy_id": item["id"],
+                "symptoms": item["symptoms"],
+                "title": item["title"],
+                "description": item["description"],
+                "remedies_list": item["remedies"],
+                "warning": item["warning"],
+                "audio_text": item["audioText"],
+            }
+            for item in remedies_data.get("remedies", [])
+        ])
         print("Remedies seeded.")
 
-    # 6. Seed Appointments (Slots)
+    # 5. Appointments (slots); booked demo slots belong to the first patient
     slots_data = load_json("slots.json")
     if slots_data:
+        demo_patient_id = user_ids[SEED_PATIENTS[0]["email"]]
+        rows = []
         for group in slots_data.get("timeSlots", []):
-            date = group["date"]
+            date = Date.fromisoformat(group["date"])
             for slot in group["slots"]:
                 doc_db_id = doctors_map.get(slot["doctorId"])
                 if doc_db_id:
-                    # Some slots are already booked for demo purposes
-                    patient_id = None
-                    status = "pending"
-                    available = slot["available"]
-                    
-                    if not available:
-                        # Book it for the first patient as an example
-                        patient_id = db_patients[0].id
-                        status = "confirmed"
-
-                    appt = Appointment(
-                        slot_id=slot["id"],
-                        time=slot["time"],
-                        date=date,
-                        available=available,
-                        doctor_id=doc_db_id,
-                        patient_id=patient_id,
-                        status=status,
-                        symptoms="General checkup" if patient_id else None
-                    )
-                    db.add(appt)
+                    booked = not slot["available"]
+                    rows.append({
+                        "slot_id": slot["id"],
+                        "time": parse_slot_time(slot["time"]),
+                        "date": date,
+                        "available": slot["available"],
+                        "doctor_id": doc_db_id,
+                        "patient_id": demo_patient_id if booked else None,
+                        "status": "confirmed" if booked else "pending",
+                        "symptoms": "General checkup" if booked else None,
+                    })
+        insert_missing(db, Appointment, rows)
+        for stmt in rebuild_statements():
+            db.execute(stmt)
         print("Appointments seeded.")
 
+def init_db(db: Session, force: bool = False) -> bool:
+    """Seed unless seed_versions says this data is already loaded. Returns True if it ran."""
+    version = seed_version()
+    current = db.execute(select(SeedVersion.version).where(SeedVersion.name == SEED_NAME)).scalar()
+    if current == version and not force:
+        return False
+    seed_demo_data(db)
+    db.execute(
+        insert(SeedVersion)
+        .values(name=SEED_NAME, version=version)
+        .on_conflict_do_update(
+            index_elements=[SeedVersion.name], set_={"version": version, "seeded_at": func.now()}
+        )
+    )
     db.commit()
+    return True
+
+def prepare_database(seed: bool = True) -> None:
+    """Migrate and seed, holding the migration lock so replicas take turns."""
+    with engine.connect() as conn, migrate.migration_lock(conn):
+        migrate.upgrade(conn)
+        if seed:
+            with SessionLocal() as db:
+                if not init_db(db):
+                    print("Seed data is up to date.")
+
+def reset_database() -> None:
+    """Dev only: drop every table (except the AI response cache) and the migration history."""
+    with engine.begin() as conn:
+        Base.metadata.drop_all(
+            bind=conn,
+            tables=[t for t in Base.metadata.sorted_tables if t.name not in migrate.LEGACY_KEPT_TABLES],
+        )
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
 
 if __name__ == "__main__":
-    from app.db.session import SessionLocal
-    db = SessionLocal()
-    init_db(db)
-    db.close()
\ No newline at end of file
+    import sys
+    if "--reset" in sys.argv:
+        reset_database()
+    prepare_database()
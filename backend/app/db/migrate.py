@@ -0,0 +1,82 @@
+"""
+Schema migrations. The revisions live in backend/alembic/versions and run at
+startup (see app/db/init_db.py) or by hand:
+
+    alembic upgrade head
+    alembic revision --autogenerate -m "add something"
+
+Replicas starting at the same time serialize on a Postgres advisory lock, so
+exactly one of them applies pending revisions and the others find nothing to do.
+"""
+import os
+from contextlib import contextmanager
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from app.db.base_models import Base
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+# Arbitrary, but fixed: every replica must use the same key
+MIGRATION_LOCK_KEY = 7_210_012
+
+# Survived restarts before migrations existed, see drop_legacy_schema()
+LEGACY_KEPT_TABLES = {"ai_remedy_cache"}
+
+
+def alembic_config(connection: Connection = None) -> Config:
+    config = Config(os.path.abspath(ALEMBIC_INI))
+    # Keep the application's logging setup
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+@contextmanager
+def migration_lock(conn: Connection):
+    """Session-level advisory lock held for the duration of the block."""
+    conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.rollback()
+        conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+
+
+def drop_legacy_schema(conn: Connection) -> bool:
+    """
+    Databases from before migrations were rebuilt by create_all() on every
+    startup, so they only hold seed data (plus the AI cache, which is kept).
+    Drop them once, the way each startup used to, so revision 0001 can create
+    the current schema. Returns True if anything was dropped.
+    """
+    inspector = inspect(conn)
+    if inspector.has_table("alembic_version") or not inspector.has_table("users"):
+        return False
+    Base.metadata.drop_all(
+        bind=conn,
+        tables=[t for t in Base.metadata.sorted_tables if t.name not in LEGACY_KEPT_TABLES],
+        checkfirst=True,
+    )
+    conn.commit()
+    return True
+
+
+def upgrade(conn: Connection, revision: str = "head") -> None:
+    if drop_legacy_schema(conn):
+        print("Dropped the pre-migration schema (seed data only); recreating it.")
+    command.upgrade(alembic_config(conn), revision)
+    conn.commit()
+
+
+if __name__ == "__main__":
+    from app.db.session import engine
+
+    with engine.connect() as conn, migration_lock(conn):
+        upgrade(conn)
+    print("Database schema is up to date.")
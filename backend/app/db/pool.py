@@ -0,0 +1,177 @@
+import threading
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """Connection pool counters fed by SQLAlchemy pool events.
+
+    `checked_out` and the connection counters come from the pool event hooks; the
+    time spent waiting for a connection is recorded by the timed pool classes below
+    since there is no "checkout requested" event.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.engine: Optional[Engine] = None
+        self.checked_out = 0
+        self.checkouts = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def attach(self, engine: Engine) -> None:
+        # Listening on the engine keeps the hooks across pool.recreate()/dispose().
+        self.engine = engine
+        engine.pool.metrics = self
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_opened += 1
+
+    def _on_close(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connections_closed += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool if self.engine is not None else None
+        queue_pool = isinstance(pool, QueuePool)
+        with self._lock:
+            return {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "size": pool.size() if queue_pool else None,
+                "max_overflow": pool._max_overflow if queue_pool else None,
+                "checked_out": self.checked_out,
+                "idle": pool.checkedin() if queue_pool else 0,
+                "overflow": max(pool.overflow(), 0) if queue_pool else 0,
+                "checkouts": self.checkouts,
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "invalidations": self.invalidations,
+                "wait": {
+                    "count": self.wait_count,
+                    "avg_ms": (self.wait_total / self.wait_count * 1000) if self.wait_count else 0.0,
+                    "max_ms": self.wait_max * 1000,
+                    "total_ms": self.wait_total * 1000,
+                    "timeouts": self.timeouts,
+                },
+            }
+
+
+class _TimedPoolMixin:
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class TimedNullPool(_TimedPoolMixin, NullPool):
+    pass
+
+
+def engine_options(async_driver: bool) -> dict:
+    """Keyword arguments for create_engine/create_async_engine built from Settings."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    connect_args = {}
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer does the pooling; holding idle connections here just pins
+        # server connections.
+        options["poolclass"] = TimedNullPool
+        if async_driver:
+            # Prepared statements are per server connection, which transaction
+            # pooling does not give us.
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    else:
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool if async_driver else TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+        # PgBouncer rejects the startup options, so this is only set on direct connections
+        if timeout_ms:
+            if async_driver:
+                connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def apply_transaction_statement_timeout(engine: Engine) -> None:
+    """Behind PgBouncer the timeout has to be set per transaction."""
+    timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+    if not (settings.DB_PGBOUNCER_MODE and timeout_ms):
+        return
+
+    @event.listens_for(engine, "begin")
+    def _set_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
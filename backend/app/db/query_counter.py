@@ -0,0 +1,62 @@
+"""
+Counting the SQL statements a block of code issues, to catch N+1 queries.
+
+    with QueryCounter(async_engine) as counter:
+        client.get("/api/v1/appointments/")
+    assert counter.count <= 3, counter.statements
+"""
+from typing import Callable, Dict, Iterable, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    def __init__(self, *engines):
+        self.engines = [e.sync_engine if isinstance(e, AsyncEngine) else e for e in engines]
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._record)
+        return False
+
+
+def assert_constant_query_count(
+    engines: Iterable[Engine], run: Callable[[int], int], sizes: Iterable[int] = (1, 20)
+) -> Dict[int, int]:
+    """
+    Call run(limit) for every size; run performs the request and returns how
+    many rows came back. Fails if returning more rows took more statements.
+    Returns {rows: statements}.
+    """
+    counts = {}
+    statements = {}
+    for size in sizes:
+        with QueryCounter(*engines) as counter:
+            rows = run(size)
+        counts[rows] = counter.count
+        statements[rows] = counter.statements
+    if len(counts) < 2:
+        raise AssertionError(f"need results of different sizes to compare, got {counts}")
+    if len(set(counts.values())) > 1:
+        most = max(counts, key=counts.get)
+        raise AssertionError(
+            f"statement count grows with rows returned {counts}; statements for {most} rows:\n"
+            + "\n".join(statements[most])
+        )
+    return counts
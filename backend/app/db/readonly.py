@@ -0,0 +1,52 @@
+"""
+Read-only Core selects for the hot catalog endpoints.
+
+column_select(Model, Schema) selects exactly the table columns the response
+schema needs. Results come back as plain Rows: no ORM instances, identity map
+or attribute instrumentation. The base statement is built once per pair and
+extended with .where()/.order_by() per request, so its structure, and with it
+SQLAlchemy's compiled-statement cache key and asyncpg's prepared statement, is
+reused across requests.
+
+localized_select(Model, Schema, lang) does the same for ?lang= responses:
+multilingual JSON columns that the schema declares as plain strings are
+projected to one language by Postgres, falling back to English, so neither
+the database nor the client moves the other translations.
+"""
+from functools import lru_cache
+from typing import Type
+
+from pydantic import BaseModel
+from sqlalchemy import JSON, Select, func, select
+
+from app.schemas.common import FALLBACK_LANGUAGE
+
+
+@lru_cache(maxsize=None)
+def column_select(model, schema: Type[BaseModel]) -> Select:
+    table = model.__table__
+    return select(*[table.c[name] for name in schema.model_fields if name in table.c])
+
+
+
+@lru_cache(maxsize=None)
+def localized_select(model, schema: Type[BaseModel], lang: str) -> Select:
+    table = model.__table__
+    columns = []
+    for name, field in schema.model_fields.items():
+        if name not in table.c:
+            continue
+        column = table.c[name]
+        if field.annotation is str and isinstance(column.type, JSON):
+            # Missing or empty translations fall back to English
+            column = func.coalesce(
+                func.nullif(column[lang].as_string(), ""), column[FALLBACK_LANGUAGE].as_string()
+            ).label(name)
+        columns.append(column)
+    return select(*columns)
+
+
+def is_entity_select(query: Select) -> bool:
+    """True for select(Model) (ORM instances), False for column selects (Rows)."""
+    descriptions = query.column_descriptions
+    return len(descriptions) == 1 and isinstance(descriptions[0]["expr"], type)
@@ -1,10 +1,29 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import attach_sql_metrics
+from app.db.pool import PoolMetrics, apply_transaction_statement_timeout, engine_options
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
-
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, **engine_options(async_driver=False))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine used by the API endpoints. The sync engine above is still used for
+# startup seeding and scripts.
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **engine_options(async_driver=True))
+# expire_on_commit=False so objects can still be serialized after commit without
+# triggering an implicit (and in asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+sync_pool_metrics = PoolMetrics("sync")
+sync_pool_metrics.attach(engine)
+async_pool_metrics = PoolMetrics("async")
+async_pool_metrics.attach(async_engine.sync_engine)
+
+apply_transaction_statement_timeout(engine)
+apply_transaction_statement_timeout(async_engine.sync_engine)
+
+attach_sql_metrics(engine)
+attach_sql_metrics(async_engine.sync_engine)
@@ -4,3 +4,10 @@ from .product import Product
 from .remedy import Remedy
 from .appointment import Appointment
 from .health_record import HealthRecord
+from .ai_cache import AIRemedyCache
+from .slot_count import DoctorSlotCount
+from .seed_version import SeedVersion
+from .data_version import DataVersion
+from .token_revocation import TokenRevocation
+from .schedule import ScheduleRule, ScheduleException
+from .stored_file import StoredFile
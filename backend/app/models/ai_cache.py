@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class AIRemedyCache(Base):
+    __tablename__ = "ai_remedy_cache"
+    __table_args__ = (UniqueConstraint("symptom_key", "lang", "model", name="uq_ai_remedy_cache_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    symptom_key = Column(String, nullable=False) # normalized symptom text
+    lang = Column(String, nullable=False)
+    model = Column(String, nullable=False, index=True)
+    response = Column(JSON, nullable=False) # HomeRemedies payload
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,24 +1,43 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index, Date, Time, DateTime
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.sql import func, text
 from app.db.base import Base
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    # One row per slot: booking claims the row instead of adding another. A cancelled
+    # booking stays as the patient's history and a new open row takes over the slot.
+    __table_args__ = (
+        Index(
+            "uq_appointments_doctor_slot", "doctor_id", "date", "time", unique=True,
+            postgresql_where=text("status IS DISTINCT FROM 'cancelled'"),
+        ),
+        # The doctor's calendar: WHERE doctor_id = ? AND date BETWEEN ? AND ? ORDER BY date, time
+        Index("ix_appointments_doctor_date", "doctor_id", "date", "time"),
+        Index("ix_appointments_patient_date", "patient_id", "date"),
+        # Is this patient one of the doctor's? (health record access); open slots
+        # and cancelled bookings left out
+        Index(
+            "ix_appointments_doctor_patient", "doctor_id", "patient_id",
+            postgresql_where=text("patient_id IS NOT NULL AND status IS DISTINCT FROM 'cancelled'"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     slot_id = Column(String, unique=True, index=True) # e.g. "slot_1" or "booking_123"
-    time = Column(String)
-    date = Column(String) # YYYY-MM-DD
+    time = Column(Time)
+    date = Column(Date)
     available = Column(Boolean, default=True) # If false and no patient_id, it's blocked. If false and patient_id, it's booked.
     
+    # Relationships are never lazy-loaded: queries name them with joinedload(), and a
+    # forgotten one raises instead of issuing a SELECT per row.
     doctor_id = Column(Integer, ForeignKey("doctors.id"))
-    doctor = relationship("Doctor", back_populates="appointments")
+    doctor = relationship("Doctor", back_populates="appointments", lazy="raise_on_sql")
 
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    patient = relationship("User", back_populates="appointments")
+    patient = relationship("User", back_populates="appointments", lazy="raise_on_sql")
 
     status = Column(String, default="pending") # pending, confirmed, completed, cancelled
     symptoms = Column(String, nullable=True)
     notes = Column(String, nullable=True)
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger, Column, DateTime, String
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class DataVersion(Base):
+    """
+    A counter bumped whenever a data set changes, so every worker can notice
+    writes made by other processes. Bumped by triggers on the tables: "remedies"
+    (alembic revision 0006, see app/services/symptom_index.py) and
+    "token_revocations" (revision 0008, see app/core/auth_cache.py).
+    """
+    __tablename__ = "data_versions"
+
+    name = Column(String, primary_key=True) # e.g. "remedies"
+    version = Column(BigInteger, nullable=False, server_default="0")
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,24 +1,54 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, JSON, ForeignKey, Computed, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class Doctor(Base):
     __tablename__ = "doctors"
+    __table_args__ = (
+        # ILIKE '%term%' on the specialization in any language
+        Index(
+            "ix_doctors_specialization_search_trgm", "specialization_search",
+            postgresql_using="gin", postgresql_ops={"specialization_search": "gin_trgm_ops"},
+        ),
+        # languages @> '["Hindi"]'
+        Index(
+            "ix_doctors_languages_gin", "languages",
+            postgresql_using="gin", postgresql_ops={"languages": "jsonb_path_ops"},
+        ),
+        Index("ix_doctors_fees", "fees"),
+        Index("ix_doctors_rating", "rating"),
+        Index("ix_doctors_available", "id", postgresql_where="availability"),
+        # /doctors/available top-N
+        Index("ix_doctors_available_slots", "available_slots", "id", postgresql_where="available_slots > 0"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
     doctor_id = Column(String, unique=True, index=True) # e.g. "dr_sharma"
     name = Column(JSON) # {"en": "...", "hi": "...", "pa": "..."}
     qualification = Column(JSON)
-    specialization = Column(JSON)
+    specialization = Column(JSONB)
     experience = Column(JSON)
     image = Column(String)
     rating = Column(Float)
     reviews = Column(Integer)
     availability = Column(Boolean, default=True)
     fees = Column(Integer)
-    languages = Column(JSON) # ["English", "Hindi"]
+    languages = Column(JSONB) # ["English", "Hindi"]
     bio = Column(JSON)
+    # Total unbooked slots, see app/services/slot_counters.py
+    available_slots = Column(Integer, nullable=False, default=0, server_default="0")
+    # Lower-cased specialization in all languages, maintained by Postgres
+    specialization_search = Column(
+        String,
+        Computed(
+            "lower(coalesce(specialization->>'en', '') || ' ' || "
+            "coalesce(specialization->>'hi', '') || ' ' || "
+            "coalesce(specialization->>'pa', ''))",
+            persisted=True,
+        ),
+    )
 
-    user = relationship("User", back_populates="doctor_profile")
-    appointments = relationship("Appointment", back_populates="doctor")
+    user = relationship("User", back_populates="doctor_profile", lazy="raise_on_sql")
+    appointments = relationship("Appointment", back_populates="doctor", lazy="raise_on_sql")
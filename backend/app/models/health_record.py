@@ -1,18 +1,30 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.db.base import Base
 
 class HealthRecord(Base):
     __tablename__ = "health_records"
+    __table_args__ = (
+        # A patient's records newest first, matching the (created_at, id) keyset pagination
+        Index("ix_health_records_patient_created", "patient_id", text("created_at DESC"), text("id DESC")),
+        # record_type filter and the per-type timeline, answered from the index alone
+        Index("ix_health_records_patient_type_created", "patient_id", "record_type", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("users.id"))
     record_type = Column(String) # prescription, lab_report, vaccination, etc.
     title = Column(String)
     description = Column(String, nullable=True)
-    file_url = Column(String, nullable=True)
+    file_url = Column(String, nullable=True) # external link, or the download path of an uploaded file
+    # Uploaded file: content lives in stored_files, name and type are per record
+    file_id = Column(Integer, ForeignKey("stored_files.id"), nullable=True, index=True)
+    file_name = Column(String, nullable=True)
+    file_content_type = Column(String, nullable=True)
+    file_size = Column(BigInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    patient = relationship("User")
+    patient = relationship("User", lazy="raise_on_sql")
+    file = relationship("StoredFile", lazy="raise_on_sql")
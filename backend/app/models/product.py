@@ -1,8 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, JSON, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from app.db.base import Base
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_price", "price"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(String, unique=True, index=True)
@@ -22,3 +28,15 @@ class Product(Base):
     uses = Column(JSON)
     rating = Column(Float)
     reviews = Column(Integer)
+    # Weighted full-text document for /shop/search, maintained by Postgres. The
+    # 'simple' configuration does no stemming, which suits drug and brand names
+    # and keeps prefix queries predictable. Deferred: only the search query reads it.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple'::regconfig, coalesce(name, '') || ' ' || coalesce(generic_name, '')), 'A') || "
+            "setweight(to_tsvector('simple'::regconfig, coalesce(brand, '') || ' ' || coalesce(category, '')), 'B') || "
+            "setweight(to_tsvector('simple'::regconfig, coalesce(manufacturer, '') || ' ' || coalesce(uses::text, '')), 'C')",
+            persisted=True,
+        ),
+    ))
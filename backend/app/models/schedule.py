@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, SmallInteger, String, Date, Time, ForeignKey, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.db.base import Base
+
+class ScheduleRule(Base):
+    """Recurring availability, e.g. Mon-Fri 10:00-13:00 in 15-minute slots. See app/services/slot_generator.py."""
+    __tablename__ = "schedule_rules"
+    __table_args__ = (
+        CheckConstraint("end_time > start_time", name="ck_schedule_rules_time_range"),
+        CheckConstraint("slot_minutes > 0", name="ck_schedule_rules_slot_minutes"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=False, index=True)
+    weekdays = Column(ARRAY(SmallInteger), nullable=False) # ISO weekdays, 1 = Monday ... 7 = Sunday
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False) # the last slot ends at or before this time
+    slot_minutes = Column(Integer, nullable=False)
+    valid_from = Column(Date, nullable=False)
+    valid_until = Column(Date, nullable=True) # inclusive; open-ended when null
+
+class ScheduleException(Base):
+    """Holiday or leave: no generated slots overlap it. A null doctor_id applies to every doctor."""
+    __tablename__ = "schedule_exceptions"
+    __table_args__ = (
+        CheckConstraint("date_to >= date_from", name="ck_schedule_exceptions_date_range"),
+        Index("ix_schedule_exceptions_doctor_dates", "doctor_id", "date_from", "date_to"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), nullable=True)
+    date_from = Column(Date, nullable=False)
+    date_to = Column(Date, nullable=False) # inclusive
+    # Both null: the whole day. Otherwise only slots overlapping start_time-end_time.
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
+    reason = Column(String, nullable=True) # e.g. "Diwali", "Leave"
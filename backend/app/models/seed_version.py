@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class SeedVersion(Base):
+    """Which version of a seed data set was last loaded, see app/db/init_db.py."""
+    __tablename__ = "seed_versions"
+
+    name = Column(String, primary_key=True) # e.g. "demo"
+    version = Column(String, nullable=False) # hash of the seed files
+    seeded_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Index
+from app.db.base import Base
+
+class DoctorSlotCount(Base):
+    """Available (unbooked) slots per doctor and day, kept in step with appointments."""
+    __tablename__ = "doctor_slot_counts"
+    __table_args__ = (
+        # top-N doctors for a given day
+        Index("ix_doctor_slot_counts_date_available", "date", "available_slots", "doctor_id"),
+    )
+
+    doctor_id = Column(Integer, ForeignKey("doctors.id", ondelete="CASCADE"), primary_key=True)
+    date = Column(Date, primary_key=True)
+    available_slots = Column(Integer, nullable=False, default=0)
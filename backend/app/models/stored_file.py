@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class StoredFile(Base):
+    """
+    One uploaded blob, stored once per content hash and shared by every record
+    that uploaded the same bytes. See app/services/file_storage.py.
+    """
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True)
+    sha256 = Column(String(64), nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    storage_key = Column(String, nullable=False) # path under the backend's root or bucket prefix
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from app.db.base import Base
+
+class TokenRevocation(Base):
+    """
+    Tokens of this user issued before `revoked_before` are invalid. Rows are
+    dropped once no such token can still be unexpired, see app/core/auth_cache.py.
+    """
+    __tablename__ = "token_revocations"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    revoked_before = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -13,6 +13,6 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     role = Column(String, default="patient") # patient, doctor, admin
 
-    doctor_profile = relationship("Doctor", back_populates="user", uselist=False)
-    appointments = relationship("Appointment", back_populates="patient")
+    doctor_profile = relationship("Doctor", back_populates="user", uselist=False, lazy="raise_on_sql")
+    appointments = relationship("Appointment", back_populates="patient", lazy="raise_on_sql")
     
\ No newline at end of file
@@ -1,6 +1,9 @@
 from .user import User, UserCreate, UserUpdate, UserInDB
 from .token import Token, TokenData
-from .doctor import Doctor, DoctorCreate
-from .product import Product, ProductBase
-from .remedy import Remedy
-from .health_record import HealthRecord, HealthRecordCreate, HealthRecordUpdate
+from .doctor import Doctor, DoctorCreate, DoctorLocalized
+from .product import Product, ProductBase, ProductSearchResult
+from .remedy import Remedy, RemedyBase
+from .health_record import (
+    HealthRecord, HealthRecordCreate, HealthRecordUpdate, HealthRecordTimeline, HealthRecordTimelineMonth,
+)
+from .schedule import ScheduleRule, ScheduleRuleCreate, ScheduleException, ScheduleExceptionCreate
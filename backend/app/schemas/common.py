@@ -1,5 +1,34 @@
-from typing import Dict, Optional, Union
+from typing import Dict, Literal, Optional, Union
 from pydantic import BaseModel
 
 # A simple type alias doesn't work well with Pydantic models directly as a field type without a wrapper
 # But we can use Dict[str, str] for now.
+
+from datetime import datetime, time
+from typing_extensions import Annotated
+from pydantic import BeforeValidator, PlainSerializer
+
+SLOT_TIME_FORMATS = ("%I:%M %p", "%I:%M%p", "%H:%M", "%H:%M:%S")
+
+def parse_slot_time(value) -> time:
+    """Accepts "10:00 AM", "10:00am", "14:30" or a time object."""
+    if isinstance(value, time):
+        return value
+    text = str(value).strip().upper()
+    for fmt in SLOT_TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time {value!r}, expected e.g. '10:00 AM' or '14:30'")
+
+def format_slot_time(value: time) -> str:
+    """Clock format used by the frontends, e.g. "9:00 AM"."""
+    return f"{value.hour % 12 or 12}:{value.minute:02d} {'AM' if value.hour < 12 else 'PM'}"
+
+# Appointment time: parsed leniently, always returned as "9:00 AM"
+SlotTime = Annotated[time, BeforeValidator(parse_slot_time), PlainSerializer(format_slot_time, return_type=str)]
+
+# Languages of the multilingual {"en": ..., "hi": ..., "pa": ...} text fields
+Language = Literal["en", "hi", "pa"]
+FALLBACK_LANGUAGE = "en"
@@ -24,3 +24,23 @@ class Doctor(DoctorBase):
 
     class Config:
         from_attributes = True
+
+class DoctorLocalized(BaseModel):
+    """A doctor with the multilingual fields flattened to one language (?lang=)."""
+    id: int
+    doctor_id: str
+    user_id: Optional[int] = None
+    name: str
+    qualification: str
+    specialization: str
+    experience: str
+    image: str
+    rating: float
+    reviews: int
+    availability: bool
+    fees: int
+    languages: List[str]
+    bio: str
+
+    class Config:
+        from_attributes = True
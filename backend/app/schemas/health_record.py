@@ -1,6 +1,6 @@
-from typing import Optional, Any
+from typing import Dict, List, Optional, Any
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from app.schemas.user import User
 
 class HealthRecordBase(BaseModel):
@@ -19,9 +19,26 @@ class HealthRecordUpdate(HealthRecordBase):
 class HealthRecord(HealthRecordBase):
     id: int
     patient_id: int
+    # Set by PUT /health-records/{id}/file
+    file_name: Optional[str] = None
+    file_content_type: Optional[str] = None
+    file_size: Optional[int] = None
     patient: Optional[User] = None
     created_at: datetime
     updated_at: Optional[datetime]
 
     class Config:
         from_attributes = True
+
+class HealthRecordTimelineMonth(BaseModel):
+    month: date
+    total: int
+    by_type: Dict[str, int]
+
+class HealthRecordTimeline(BaseModel):
+    patient_id: int
+    total: int
+    first_at: Optional[datetime] = None
+    last_at: Optional[datetime] = None
+    by_type: Dict[str, int]
+    months: List[HealthRecordTimelineMonth]
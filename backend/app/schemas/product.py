@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class ProductBase(BaseModel):
@@ -25,3 +25,9 @@ class Product(ProductBase):
 
     class Config:
         from_attributes = True
+
+class ProductSearchResult(BaseModel):
+    total: int
+    items: List[Product]
+    # facet -> value -> number of matching products, e.g. {"category": {"pain-relief": 3}}
+    facets: Dict[str, Dict[str, int]]
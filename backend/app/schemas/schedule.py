@@ -0,0 +1,68 @@
+from typing import List, Optional
+from datetime import date
+from pydantic import BaseModel, Field, field_validator, model_validator
+from app.schemas.common import SlotTime
+
+class ScheduleRuleBase(BaseModel):
+    weekdays: List[int] = Field(..., min_length=1) # ISO, 1 = Monday ... 7 = Sunday
+    start_time: SlotTime
+    end_time: SlotTime
+    slot_minutes: int = Field(15, ge=5, le=240)
+    valid_from: Optional[date] = None # default: today
+    valid_until: Optional[date] = None
+
+    @field_validator("weekdays")
+    @classmethod
+    def check_weekdays(cls, value: List[int]) -> List[int]:
+        if any(day < 1 or day > 7 for day in value):
+            raise ValueError("weekdays are 1 (Monday) to 7 (Sunday)")
+        return sorted(set(value))
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        if self.valid_from and self.valid_until and self.valid_until < self.valid_from:
+            raise ValueError("valid_until must not be before valid_from")
+        return self
+
+class ScheduleRuleCreate(ScheduleRuleBase):
+    doctor_id: Optional[int] = None # admins only; doctors manage their own
+
+class ScheduleRule(ScheduleRuleBase):
+    id: int
+    doctor_id: int
+    valid_from: date
+
+    class Config:
+        from_attributes = True
+
+class ScheduleExceptionBase(BaseModel):
+    date_from: date
+    date_to: Optional[date] = None # default: date_from
+    # Both empty: the whole day
+    start_time: Optional[SlotTime] = None
+    end_time: Optional[SlotTime] = None
+    reason: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.date_to and self.date_to < self.date_from:
+            raise ValueError("date_to must not be before date_from")
+        if (self.start_time is None) != (self.end_time is None):
+            raise ValueError("give both start_time and end_time, or neither for the whole day")
+        if self.start_time is not None and self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
+class ScheduleExceptionCreate(ScheduleExceptionBase):
+    # Admins only: a doctor's id, or none for a holiday that applies to everyone
+    doctor_id: Optional[int] = None
+
+class ScheduleException(ScheduleExceptionBase):
+    id: int
+    doctor_id: Optional[int] = None
+    date_to: date
+
+    class Config:
+        from_attributes = True
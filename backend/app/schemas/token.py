@@ -6,4 +6,11 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
+    """The authenticated principal, built from the access token claims."""
     email: Optional[str] = None
+    id: Optional[int] = None
+    role: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+    issued_at: Optional[float] = None
+    expires_at: Optional[float] = None
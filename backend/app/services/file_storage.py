@@ -0,0 +1,329 @@
+"""
+Storage for uploaded health record files.
+
+Uploads are streamed from the request body to the storage backend in chunks
+and hashed on the way, so memory use is one buffer whatever the file size.
+stored_files keeps one row per SHA-256: records that upload the same bytes
+share the blob, and the duplicate copy is deleted as soon as the hash is known.
+A blob is removed once no record points at it any more.
+
+Backends (FILE_STORAGE_BACKEND):
+
+- "local": files under FILE_STORAGE_PATH. Downloads use FileResponse, which
+  answers Range/If-Range requests and hands the file to the server with the
+  ASGI pathsend extension (zero-copy) where the server supports it. Behind
+  nginx, FILE_STORAGE_ACCEL_REDIRECT makes nginx send the file with sendfile:
+
+      location /protected-files/ { internal; alias /app/storage/; }
+
+- "s3": any S3-compatible store through boto3, which is only needed for this
+  backend (pip install boto3). Large files go up as multipart uploads;
+  downloads are proxied with the client's Range header, or redirected to a
+  presigned URL with FILE_STORAGE_S3_PRESIGN_DOWNLOADS.
+"""
+import hashlib
+import os
+import uuid
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy import Row, delete, exists, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.health_record import HealthRecord
+from app.models.stored_file import StoredFile
+
+# Bytes collected from the request before each backend write
+CHUNK_SIZE = 1024 * 1024
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class FileTooLarge(Exception):
+    pass
+
+
+def content_disposition(filename: str, disposition: str = "inline") -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+class LocalUpload:
+    """Written to `<key>.part` and renamed into place when complete."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.partial = path + ".part"
+        self.file = None
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.partial, "wb")
+
+    def _complete(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.partial, self.path)
+
+    def _abort(self) -> None:
+        if self.file is not None:
+            self.file.close()
+        try:
+            os.unlink(self.partial)
+        except FileNotFoundError:
+            pass
+
+    async def write(self, data: bytes) -> None:
+        await run_in_threadpool(self.file.write, data)
+
+    async def complete(self) -> None:
+        await run_in_threadpool(self._complete)
+
+    async def abort(self) -> None:
+        await run_in_threadpool(self._abort)
+
+
+class LocalStorage:
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    async def start_upload(self, key: str) -> LocalUpload:
+        upload = LocalUpload(self.path(key))
+        await run_in_threadpool(upload._open)
+        return upload
+
+    async def delete(self, key: str) -> None:
+        try:
+            await run_in_threadpool(os.unlink, self.path(key))
+        except FileNotFoundError:
+            pass
+
+    async def download(self, key: str, request: Request, filename: str, media_type: str, etag: str) -> Response:
+        headers = {"ETag": etag, "Cache-Control": "private"}
+        if settings.FILE_STORAGE_ACCEL_REDIRECT:
+            headers["X-Accel-Redirect"] = settings.FILE_STORAGE_ACCEL_REDIRECT + key
+            headers["Content-Disposition"] = content_disposition(filename)
+            return Response(media_type=media_type, headers=headers)
+        return FileResponse(
+            self.path(key), media_type=media_type, filename=filename,
+            headers=headers, content_disposition_type="inline",
+        )
+
+
+class S3Upload:
+    """Single PUT for small files, multipart upload once a full part is buffered."""
+
+    def __init__(self, storage: "S3Storage", key: str):
+        self.storage = storage
+        self.key = key
+        self.buffer = bytearray()
+        self.upload_id: Optional[str] = None
+        self.parts = []
+
+    def _upload_part(self, data: bytes) -> None:
+        client, bucket = self.storage.client, self.storage.bucket
+        if self.upload_id is None:
+            self.upload_id = client.create_multipart_upload(Bucket=bucket, Key=self.key)["UploadId"]
+        number = len(self.parts) + 1
+        response = client.upload_part(
+            Bucket=bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=data,
+        )
+        self.parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def _complete(self, data: bytes) -> None:
+        client, bucket = self.storage.client, self.storage.bucket
+        if self.upload_id is None:
+            client.put_object(Bucket=bucket, Key=self.key, Body=data)
+            return
+        if data:
+            self._upload_part(data)
+        client.complete_multipart_upload(
+            Bucket=bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={"Parts": self.parts},
+        )
+
+    async def write(self, data: bytes) -> None:
+        self.buffer += data
+        if len(self.buffer) >= self.storage.part_size:
+            part = bytes(self.buffer)
+            self.buffer.clear()
+            await run_in_threadpool(self._upload_part, part)
+
+    async def complete(self) -> None:
+        await run_in_threadpool(self._complete, bytes(self.buffer))
+        self.buffer.clear()
+
+    async def abort(self) -> None:
+        self.buffer.clear()
+        if self.upload_id is not None:
+            await run_in_threadpool(
+                self.storage.client.abort_multipart_upload,
+                Bucket=self.storage.bucket, Key=self.key, UploadId=self.upload_id,
+            )
+
+
+class S3Storage:
+    def __init__(self):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("FILE_STORAGE_BACKEND=s3 needs boto3 (pip install boto3)")
+        if not settings.FILE_STORAGE_S3_BUCKET:
+            raise RuntimeError("FILE_STORAGE_BACKEND=s3 needs FILE_STORAGE_S3_BUCKET")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.FILE_STORAGE_S3_ENDPOINT_URL or None,
+            region_name=settings.FILE_STORAGE_S3_REGION or None,
+        )
+        self.bucket = settings.FILE_STORAGE_S3_BUCKET
+        self.prefix = settings.FILE_STORAGE_S3_PREFIX
+        self.part_size = max(settings.FILE_STORAGE_S3_PART_SIZE, S3_MIN_PART_SIZE)
+
+    async def start_upload(self, key: str) -> S3Upload:
+        return S3Upload(self, self.prefix + key)
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=self.prefix + key)
+
+    async def download(self, key: str, request: Request, filename: str, media_type: str, etag: str) -> Response:
+        params = {"Bucket": self.bucket, "Key": self.prefix + key}
+        if settings.FILE_STORAGE_S3_PRESIGN_DOWNLOADS:
+            url = await run_in_threadpool(
+                self.client.generate_presigned_url,
+                "get_object",
+                Params={
+                    **params,
+                    "ResponseContentType": media_type,
+                    "ResponseContentDisposition": content_disposition(filename),
+                },
+                ExpiresIn=settings.FILE_STORAGE_S3_PRESIGN_SECONDS,
+            )
+            return RedirectResponse(url, status_code=307)
+
+        http_range = request.headers.get("range")
+        if http_range:
+            params["Range"] = http_range
+        try:
+            obj = await run_in_threadpool(self.client.get_object, **params)
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                return Response(status_code=416, headers={"Content-Range": "bytes */*"})
+            raise
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "private",
+            "Accept-Ranges": "bytes",
+            "Content-Length": str(obj["ContentLength"]),
+            "Content-Disposition": content_disposition(filename),
+        }
+        if obj.get("ContentRange"):
+            headers["Content-Range"] = obj["ContentRange"]
+        return StreamingResponse(
+            iterate_in_threadpool(obj["Body"].iter_chunks(CHUNK_SIZE)),
+            status_code=206 if obj.get("ContentRange") else 200,
+            media_type=media_type,
+            headers=headers,
+        )
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    if settings.FILE_STORAGE_BACKEND == "s3":
+        return S3Storage()
+    if settings.FILE_STORAGE_BACKEND == "local":
+        return LocalStorage(settings.FILE_STORAGE_PATH)
+    raise RuntimeError(f"Unknown FILE_STORAGE_BACKEND {settings.FILE_STORAGE_BACKEND!r}")
+
+
+async def store_stream(chunks: AsyncIterator[bytes], max_bytes: int) -> Tuple[str, str, int]:
+    """
+    Write `chunks` to a new object. Returns (storage key, sha256, size); the
+    object is removed again if the stream fails or exceeds max_bytes.
+    """
+    storage = get_storage()
+    key = uuid.uuid4().hex
+    key = f"{key[:2]}/{key}"
+    upload = await storage.start_upload(key)
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray()
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise FileTooLarge()
+            digest.update(chunk)
+            buffer += chunk
+            if len(buffer) >= CHUNK_SIZE:
+                await upload.write(bytes(buffer))
+                buffer.clear()
+        if buffer:
+            await upload.write(bytes(buffer))
+        await upload.complete()
+    except BaseException:
+        await upload.abort()
+        raise
+    return key, digest.hexdigest(), size
+
+
+async def save_upload(db: AsyncSession, chunks: AsyncIterator[bytes], max_bytes: int) -> Row:
+    """
+    Store an upload and return its stored_files row (id, storage_key, sha256,
+    size, inserted). When the content is already stored, the existing row is
+    returned and the new copy deleted. Does not commit; the row stays locked
+    until the caller's transaction ends, so release() cannot remove it in
+    between. Call discard() if the transaction is rolled back instead.
+    """
+    key, sha256, size = await store_stream(chunks, max_bytes)
+    stmt = insert(StoredFile).values(sha256=sha256, size=size, storage_key=key)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StoredFile.sha256], set_={"sha256": stmt.excluded.sha256},
+    ).returning(
+        StoredFile.id, StoredFile.storage_key, StoredFile.sha256, StoredFile.size,
+        (literal_column("xmax") == 0).label("inserted"),
+    )
+    try:
+        stored = (await db.execute(stmt)).one()
+    except BaseException:
+        await get_storage().delete(key)
+        raise
+    if stored.storage_key != key:
+        await get_storage().delete(key)
+    return stored
+
+
+async def discard(stored: Row) -> None:
+    """Delete the object of a save_upload() whose transaction was rolled back."""
+    if stored.inserted:
+        await get_storage().delete(stored.storage_key)
+
+
+async def release(file_id: int) -> bool:
+    """Delete a blob no record refers to any more. Returns True if it was deleted."""
+    async with AsyncSessionLocal() as db:
+        try:
+            key = (await db.execute(
+                delete(StoredFile)
+                .where(StoredFile.id == file_id, ~exists().where(HealthRecord.file_id == file_id))
+                .returning(StoredFile.storage_key)
+            )).scalar()
+            await db.commit()
+        except IntegrityError:
+            # Referenced again by an upload that committed meanwhile
+            return False
+    if key is None:
+        return False
+    await get_storage().delete(key)
+    return True
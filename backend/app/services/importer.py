@@ -0,0 +1,505 @@
+"""
+Streaming bulk import of doctors, products, remedies and slots.
+
+Records are read one at a time from JSON (the backend/data layout, e.g.
+{"medicines": [...]}, or a bare array), CSV or NDJSON, so memory stays flat
+however large the file is. Each record is validated against the API schema;
+invalid records are reported as rejects and skipped. Valid rows are upserted in
+batches, one multi-row INSERT ... ON CONFLICT per batch, and each batch commits
+on its own, so an interrupted import keeps its progress and can be re-run.
+
+Doctors, products and remedies are upserted on doctor_id / product_id /
+remedy_id. Slots are only inserted: an existing slot_id may already be booked,
+so it is left alone and counted as skipped.
+
+Remedy imports reach the running API through the remedies data version, which a
+trigger bumps on every write: each worker reloads its symptom index within
+SYMPTOM_INDEX_VERSION_CHECK_SECONDS. Cached LLM answers are unaffected, as the
+curated remedies are consulted before that cache.
+
+    python -m app.services.importer products catalog.csv --rejects rejects.ndjson
+    python -m app.services.importer doctors registry.ndjson --batch-size 5000
+
+CSV columns use the schema field names (or the backend/data ones). Nested
+fields use dotted columns (name.en, name.hi), and list fields are JSON arrays
+or "|"-separated values.
+"""
+import csv
+import io
+import json
+import time
+import typing
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date as Date
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, TextIO, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Boolean, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.schemas.common import SlotTime
+from app.services.slot_counters import bulk_adjust_statements
+from app.services.symptom_index import symptom_index
+
+FORMATS = ("json", "csv", "ndjson")
+DEFAULT_BATCH_SIZE = 1000
+# Rejects kept in the report; all of them go to the on_reject callback
+MAX_REPORTED_REJECTS = 100
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be read at all (unknown format, broken JSON structure)."""
+
+
+class SlotRecord(BaseModel):
+    slot_id: str
+    doctor_id: str  # the doctor's code, e.g. "dr_sharma"
+    date: Date
+    time: SlotTime
+    available: bool = True
+
+
+@dataclass
+class ImportKind:
+    model: Any
+    schema: Type[BaseModel]
+    key: str  # unique column the upsert conflicts on
+    collection: str  # top-level array in the backend/data JSON layout
+    aliases: Dict[str, str]  # backend/data field name -> schema field name
+    upsert: bool = True  # False: existing keys are skipped, not updated
+    exclude: Tuple[str, ...] = ()  # schema fields that are not imported
+
+
+KINDS: Dict[str, ImportKind] = {
+    "doctors": ImportKind(
+        model=models.Doctor,
+        schema=schemas.DoctorCreate,
+        key="doctor_id",
+        collection="doctors",
+        aliases={"id": "doctor_id", "consultationFee": "fees", "description": "bio", "available": "availability"},
+        # Accounts are linked through /users, never by an import
+        exclude=("user_id",),
+    ),
+    "products": ImportKind(
+        model=models.Product,
+        schema=schemas.ProductBase,
+        key="product_id",
+        collection="medicines",
+        aliases={
+            "id": "product_id", "genericName": "generic_name", "originalPrice": "original_price",
+            "prescriptionRequired": "prescription_required", "inStock": "in_stock", "packSize": "pack_size",
+        },
+    ),
+    "remedies": ImportKind(
+        model=models.Remedy,
+        schema=schemas.RemedyBase,
+        key="remedy_id",
+        collection="remedies",
+        aliases={"id": "remedy_id", "remedies": "remedies_list", "audioText": "audio_text"},
+    ),
+    "slots": ImportKind(
+        model=models.Appointment,
+        schema=SlotRecord,
+        key="slot_id",
+        collection="timeSlots",
+        aliases={"id": "slot_id", "doctorId": "doctor_id"},
+        upsert=False,
+    ),
+}
+
+
+@dataclass
+class ImportReport:
+    kind: str
+    read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0  # existing slots, and earlier duplicates of a key within a batch
+    rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    rejects: List[dict] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "read": self.read,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "rejects": self.rejects,
+        }
+
+
+# Readers -------------------------------------------------------------------
+
+class _JSONStream:
+    """Decodes one array element at a time from a text stream."""
+
+    def __init__(self, stream: TextIO, chunk_size: int = JSON_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer holds about one element
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ImportFormatError(f"Invalid JSON: expected {char!r} near offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ImportFormatError(f"Invalid JSON: {e}")
+            self._fill()
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ImportFormatError(f"Invalid JSON: expected ',' or ']' near offset {self.pos}")
+
+
+def iter_json(stream: TextIO, collection: str) -> Iterator[Any]:
+    """Elements of a top-level array, or of the `collection` array of a top-level object."""
+    parser = _JSONStream(stream)
+    if parser.peek() == "[":
+        yield from parser.array()
+        return
+    parser.expect("{")
+    while parser.peek() != "}":
+        key = parser.value()
+        parser.expect(":")
+        if key == collection:
+            yield from parser.array()
+        else:
+            parser.value()
+        if parser.peek() == ",":
+            parser.pos += 1
+    parser.expect("}")
+
+
+def iter_ndjson(stream: TextIO) -> Iterator[Any]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            # Reported as a reject: one bad line should not stop the import
+            yield _Unreadable(f"Invalid JSON: {e}")
+
+
+def iter_csv(stream: TextIO) -> Iterator[dict]:
+    for row in csv.DictReader(stream):
+        record: dict = {}
+        for column_name, value in row.items():
+            if not column_name or value is None:
+                continue
+            value = value.strip()
+            if value[:1] in ("[", "{"):
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    pass
+            target = record
+            *parents, leaf = column_name.strip().split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = value
+        yield record
+
+
+class _Unreadable:
+    def __init__(self, error: str):
+        self.error = error
+
+
+# Validation ----------------------------------------------------------------
+
+def _fields_of_type(schema: Type[BaseModel], *types) -> set:
+    return {
+        name for name, info in schema.model_fields.items()
+        if (typing.get_origin(info.annotation) or info.annotation) in types
+    }
+
+
+def _explode_slot_groups(records: Iterator[Any]) -> Iterator[Any]:
+    """backend/data/slots.json groups slots by date: {"date": ..., "slots": [...]}."""
+    for record in records:
+        if isinstance(record, dict) and isinstance(record.get("slots"), list):
+            for slot in record["slots"]:
+                yield {**slot, "date": record.get("date")} if isinstance(slot, dict) else slot
+        else:
+            yield record
+
+
+def read_records(kind: ImportKind, stream: BinaryIO, fmt: str) -> Iterator[Any]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "json":
+        records = iter_json(text, kind.collection)
+    elif fmt == "ndjson":
+        records = iter_ndjson(text)
+    elif fmt == "csv":
+        records = iter_csv(text)
+    else:
+        raise ImportFormatError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    if kind.model is models.Appointment:
+        records = _explode_slot_groups(records)
+    return records
+
+
+def make_validator(kind: ImportKind) -> Callable[[Any], dict]:
+    """Function turning a raw record into a row for kind.model, raising ValueError."""
+    list_fields = _fields_of_type(kind.schema, list)
+    str_fields = _fields_of_type(kind.schema, str)
+
+    def validate(record: Any) -> dict:
+        if isinstance(record, _Unreadable):
+            raise ValueError(record.error)
+        if not isinstance(record, dict):
+            raise ValueError("Record is not an object")
+        renamed = {}
+        for name, value in record.items():
+            target = kind.aliases.get(name, name)
+            renamed[target if target not in record else name] = value
+        record = renamed
+        # Empty CSV cells are empty strings for text fields and missing otherwise
+        for name in [n for n, v in record.items() if v == "" and n not in str_fields]:
+            del record[name]
+        for name in list_fields:
+            if isinstance(record.get(name), str):
+                record[name] = [part.strip() for part in record[name].split("|") if part.strip()]
+        try:
+            validated = kind.schema.model_validate(record)
+        except ValidationError as e:
+            raise ValueError("; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()
+            ))
+        return validated.model_dump(exclude=set(kind.exclude))
+
+    return validate
+
+
+def detect_format(filename: str) -> str:
+    lower = filename.lower()
+    if lower.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lower.endswith(".csv"):
+        return "csv"
+    if lower.endswith(".json"):
+        return "json"
+    raise ImportFormatError(f"Cannot tell the format of {filename!r}, pass it explicitly")
+
+
+# Writing -------------------------------------------------------------------
+
+def _resolve_doctors(db: Session, rows: List[dict], doctor_ids: Dict[str, int]) -> Tuple[List[dict], List[dict]]:
+    """
+    Replace the doctor codes in slot rows with doctor row ids, looking up codes
+    not seen before. Returns (resolved rows, rows with an unknown doctor).
+    """
+    missing = {row["doctor_id"] for row in rows} - doctor_ids.keys()
+    if missing:
+        doctor_ids.update(db.execute(
+            select(models.Doctor.doctor_id, models.Doctor.id).where(models.Doctor.doctor_id.in_(missing))
+        ).all())
+    resolved, unknown = [], []
+    for row in rows:
+        if row["doctor_id"] in doctor_ids:
+            resolved.append({**row, "doctor_id": doctor_ids[row["doctor_id"]], "status": "pending"})
+        else:
+            unknown.append(row)
+    return resolved, unknown
+
+
+def write_batch(db: Session, kind: ImportKind, rows: List[dict]) -> Tuple[int, int]:
+    """Upsert one batch and commit. Returns (inserted, updated)."""
+    # Core execution on the session's connection: no ORM bulk-persistence layer
+    conn = db.connection()
+    stmt = insert(kind.model.__table__)
+    if kind.upsert:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[kind.key],
+            set_={name: stmt.excluded[name] for name in rows[0] if name != kind.key},
+        )
+        # xmax is 0 for freshly inserted tuples and set for updated ones
+        result = conn.execute(stmt.returning(literal_column("xmax = 0", Boolean)), rows)
+        flags = result.scalars().all()
+        inserted = sum(flags)
+        db.commit()
+        return inserted, len(flags) - inserted
+
+    # Slots: keep existing ones (they may be booked), count the new open ones
+    table = kind.model.__table__
+    stmt = stmt.on_conflict_do_nothing().returning(table.c.doctor_id, table.c.date, table.c.available)
+    created = conn.execute(stmt, rows).all()
+    deltas = Counter((doctor_id, date) for doctor_id, date, available in created if available)
+    for counter_stmt in bulk_adjust_statements(deltas):
+        conn.execute(counter_stmt)
+    db.commit()
+    return len(created), 0
+
+
+def run_import(
+    db: Session,
+    kind_name: str,
+    stream: BinaryIO,
+    fmt: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+    on_reject: Optional[Callable[[dict], None]] = None,
+) -> ImportReport:
+    kind = KINDS.get(kind_name)
+    if kind is None:
+        raise ImportFormatError(f"Unknown import {kind_name!r}, expected one of {', '.join(KINDS)}")
+    validate = make_validator(kind)
+    report = ImportReport(kind=kind_name)
+    doctor_ids: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    def reject(number: int, error: str, record: Any) -> None:
+        report.rejected += 1
+        entry = {"record": number, "error": error, "data": record if not isinstance(record, _Unreadable) else None}
+        if len(report.rejects) < MAX_REPORTED_REJECTS:
+            report.rejects.append(entry)
+        if on_reject is not None:
+            on_reject(entry)
+
+    def flush(batch: Dict[Any, Tuple[int, Any, dict]]) -> None:
+        rows = [row for _, _, row in batch.values()]
+        if kind.model is models.Appointment:
+            rows, unknown = _resolve_doctors(db, rows, doctor_ids)
+            for row in unknown:
+                number, record, _ = batch[row["slot_id"]]
+                reject(number, f"doctor_id: Unknown doctor {row['doctor_id']!r}", record)
+        if rows:
+            inserted, updated = write_batch(db, kind, rows)
+            report.inserted += inserted
+            report.updated += updated
+            report.skipped += len(rows) - inserted - updated
+        report.batches += 1
+        report.seconds = time.perf_counter() - started
+        if on_progress is not None:
+            on_progress(report)
+
+    # Keyed batch: a key repeated within one batch keeps its last version, as
+    # one INSERT ... ON CONFLICT DO UPDATE cannot touch a row twice
+    batch: Dict[Any, Tuple[int, Any, dict]] = {}
+    for number, record in enumerate(read_records(kind, stream, fmt), start=1):
+        report.read += 1
+        try:
+            row = validate(record)
+        except ValueError as e:
+            reject(number, str(e), record)
+            continue
+        if row[kind.key] in batch:
+            report.skipped += 1
+        batch[row[kind.key]] = (number, record, row)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = {}
+    if batch:
+        flush(batch)
+
+    if kind.model is models.Remedy and report.inserted + report.updated:
+        # This process only; the API workers see the data version change
+        symptom_index.mark_stale()
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Stream a JSON, CSV or NDJSON file into the database")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--rejects", help="write rejected records here as NDJSON")
+    args = parser.parse_args()
+
+    rejects_file = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+
+    def write_reject(entry: dict) -> None:
+        if rejects_file is not None:
+            rejects_file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def print_progress(report: ImportReport) -> None:
+        print(
+            f"\r{report.read} read, {report.inserted} inserted, {report.updated} updated, "
+            f"{report.skipped} skipped, {report.rejected} rejected ({report.rows_per_second:.0f} rows/s)",
+            end="", file=sys.stderr, flush=True,
+        )
+
+    try:
+        with open(args.path, "rb") as f, SessionLocal() as db:
+            result = run_import(
+                db, args.kind, f, args.format or detect_format(args.path), batch_size=args.batch_size,
+                on_progress=print_progress, on_reject=write_reject,
+            )
+    except ImportFormatError as e:
+        raise SystemExit(str(e))
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+    print(file=sys.stderr)
+    summary = result.as_dict()
+    summary.pop("rejects")
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,152 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+
+PRIORITY_INTERACTIVE = 0  # a patient is watching tokens stream in
+PRIORITY_DEFAULT = 1
+
+
+class SchedulerOverloaded(Exception):
+    """The queue is full or the wait would exceed the deadline; answer 503."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM queue is full, retry after {retry_after:.0f}s")
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class SlotLease:
+    def __init__(self, scheduler: "InferenceScheduler"):
+        self._scheduler = scheduler
+        self._released = False
+        self._started = time.monotonic()
+
+    def release(self, record_latency: bool = True) -> None:
+        # Idempotent: streaming responses release from both the generator and a background task
+        if not self._released:
+            self._released = True
+            elapsed = time.monotonic() - self._started if record_latency else None
+            self._scheduler._release(elapsed)
+
+
+class InferenceScheduler:
+    """
+    Limits concurrent generations against the single Ollama instance.
+
+    Up to `max_inflight` requests run at once; the rest wait in a bounded
+    priority queue (FIFO within a priority). Requests that would overflow the
+    queue or wait longer than `max_wait` are rejected straight away. Identical
+    requests that are already running share one generation (singleflight).
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, max_wait: float, expected_latency: float):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.avg_latency = expected_latency
+        self.inflight = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._running: Dict[Hashable, asyncio.Task] = {}
+
+    def estimated_wait(self) -> float:
+        if self.inflight < self.max_inflight and not self._queue:
+            return 0.0
+        return (len(self._queue) + 1) * self.avg_latency / self.max_inflight
+
+    async def acquire(self, priority: int = PRIORITY_DEFAULT) -> SlotLease:
+        if self.inflight < self.max_inflight and not self._queue:
+            self.inflight += 1
+            return SlotLease(self)
+
+        wait = self.estimated_wait()
+        if len(self._queue) >= self.max_queue or wait > self.max_wait:
+            self.rejected += 1
+            raise SchedulerOverloaded(wait)
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), waiter)
+        heapq.heappush(self._queue, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we gave up; pass it on
+                SlotLease(self).release(record_latency=False)
+            else:
+                waiter.cancel()
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise SchedulerOverloaded(self.estimated_wait())
+            raise
+        return SlotLease(self)
+
+    def _release(self, elapsed: Optional[float]) -> None:
+        if elapsed is not None:
+            self.completed += 1
+            self.avg_latency = 0.8 * self.avg_latency + 0.2 * elapsed
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; inflight stays the same
+                waiter.set_result(None)
+                return
+        self.inflight -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_DEFAULT):
+        lease = await self.acquire(priority)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]], priority: int = PRIORITY_DEFAULT) -> Any:
+        """
+        Run `factory()` under the concurrency limit, sharing the result with any
+        identical request (same `key`) that arrives while it is queued or running.
+        """
+        task = self._running.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._run_in_slot(factory, priority))
+            self._running[key] = task
+            task.add_done_callback(lambda _: self._running.pop(key, None))
+        # shield: a caller that disconnects must not cancel the work others wait on
+        return await asyncio.shield(task)
+
+    async def _run_in_slot(self, factory, priority):
+        async with self.slot(priority):
+            return await factory()
+
+    def stats(self) -> dict:
+        return {
+            "max_inflight": self.max_inflight,
+            "inflight": self.inflight,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "estimated_wait_seconds": round(self.estimated_wait(), 2),
+            "avg_latency_seconds": round(self.avg_latency, 2),
+            "completed": self.completed,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+        }
+
+
+llm_scheduler = InferenceScheduler(
+    settings.AI_MAX_INFLIGHT,
+    settings.AI_MAX_QUEUE,
+    settings.AI_MAX_QUEUE_WAIT_SECONDS,
+    settings.AI_EXPECTED_LATENCY_SECONDS,
+)
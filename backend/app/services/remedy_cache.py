@@ -0,0 +1,122 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.ai_cache import AIRemedyCache
+from app.services.text import normalize_symptom
+
+CacheKey = Tuple[str, str, str]
+
+logger = logging.getLogger(__name__)
+
+
+class RemedyCache:
+    """
+    LRU + TTL in front of the LLM, backed by the ai_remedy_cache table so entries
+    survive restarts and are shared between workers. The table is best effort:
+    when it cannot be read or written the request carries on without it.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+
+    @staticmethod
+    def key(symptom: str, lang: str, model: Optional[str] = None) -> CacheKey:
+        return (normalize_symptom(symptom), lang, model or settings.OLLAMA_MODEL)
+
+    async def get(self, key: CacheKey) -> Optional[dict]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        symptom_key, lang, model = key
+        oldest = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(AIRemedyCache.response).filter(
+                        AIRemedyCache.symptom_key == symptom_key,
+                        AIRemedyCache.lang == lang,
+                        AIRemedyCache.model == model,
+                        AIRemedyCache.created_at >= oldest,
+                    )
+                )
+                value = result.scalar()
+        except (SQLAlchemyError, OSError):
+            self.errors += 1
+            logger.warning("Reading the AI remedy cache failed", exc_info=True)
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    async def set(self, key: CacheKey, value: dict) -> None:
+        symptom_key, lang, model = key
+        self.memory.set(key, value)
+        stmt = insert(AIRemedyCache).values(
+            symptom_key=symptom_key, lang=lang, model=model, response=value
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_ai_remedy_cache_key",
+            set_={"response": stmt.excluded.response, "created_at": datetime.now(timezone.utc)},
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except (SQLAlchemyError, OSError):
+            # The answer is still served, and kept in memory
+            self.errors += 1
+            logger.warning("Writing the AI remedy cache failed", exc_info=True)
+            return
+        self.stores += 1
+
+    async def invalidate(self, model: Optional[str] = None, everything: bool = False) -> int:
+        """
+        Delete persisted entries. By default removes entries generated by models
+        other than the current OLLAMA_MODEL (run after switching models).
+        """
+        stmt = delete(AIRemedyCache)
+        if not everything:
+            if model:
+                stmt = stmt.where(AIRemedyCache.model == model)
+            else:
+                stmt = stmt.where(AIRemedyCache.model != settings.OLLAMA_MODEL)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(stmt)
+            await db.commit()
+        self.memory.clear()
+        return result.rowcount
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "model": settings.OLLAMA_MODEL,
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "errors": self.errors,
+            "hit_ratio": (self.memory_hits + self.db_hits) / lookups if lookups else 0.0,
+        }
+
+
+remedy_cache = RemedyCache(settings.AI_CACHE_SIZE, settings.AI_CACHE_TTL_SECONDS)
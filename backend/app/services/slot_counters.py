@@ -0,0 +1,185 @@
+"""
+Available-slot counters.
+
+doctors.available_slots and doctor_slot_counts hold the number of appointments
+with available == True per doctor and per (doctor, date). Every code path that
+flips Appointment.available calls adjust_available_slots() in the same
+transaction, so /doctors/available is an indexed read instead of an aggregate
+over the whole appointments table. reconcile() recounts from scratch and
+reports any drift.
+
+    python -m app.services.slot_counters [--dry-run]
+"""
+from collections import Counter
+from datetime import date as Date
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Integer, column, delete, func, insert, select, text, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor
+from app.models.slot_count import DoctorSlotCount
+
+
+async def adjust_available_slots(db: AsyncSession, doctor_id: int, date: Date, delta: int) -> None:
+    """
+    Add delta to the doctor's counters. Does not commit: call it inside the
+    transaction that changes the appointment.
+    """
+    if not delta or doctor_id is None:
+        return
+    stmt = pg_insert(DoctorSlotCount).values(doctor_id=doctor_id, date=date, available_slots=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DoctorSlotCount.doctor_id, DoctorSlotCount.date],
+        set_={"available_slots": DoctorSlotCount.available_slots + delta},
+    )
+    await db.execute(stmt)
+    await db.execute(
+        update(Doctor)
+        .where(Doctor.id == doctor_id)
+        .values(available_slots=Doctor.available_slots + delta)
+    )
+
+
+def bulk_adjust_statements(deltas: Dict[Tuple[int, Date], int]) -> List:
+    """
+    Statements applying many (doctor_id, date) -> delta changes at once, e.g.
+    after a bulk slot import. Like adjust_available_slots(), run them in the
+    transaction that changed the appointments.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return []
+    per_date = pg_insert(DoctorSlotCount).values([
+        {"doctor_id": doctor_id, "date": date, "available_slots": delta}
+        for (doctor_id, date), delta in deltas.items()
+    ])
+    per_date = per_date.on_conflict_do_update(
+        index_elements=[DoctorSlotCount.doctor_id, DoctorSlotCount.date],
+        set_={"available_slots": DoctorSlotCount.available_slots + per_date.excluded.available_slots},
+    )
+    per_doctor = Counter()
+    for (doctor_id, _), delta in deltas.items():
+        per_doctor[doctor_id] += delta
+    doctor_deltas = values(column("id", Integer), column("delta", Integer), name="deltas").data(
+        list(per_doctor.items())
+    )
+    return [
+        per_date,
+        update(Doctor)
+        .where(Doctor.id == doctor_deltas.c.id)
+        .values(available_slots=Doctor.available_slots + doctor_deltas.c.delta),
+    ]
+
+
+def _actual_counts():
+    return (
+        select(Appointment.doctor_id, Appointment.date, func.count().label("available_slots"))
+        .where(Appointment.available == True, Appointment.doctor_id.isnot(None))
+        .group_by(Appointment.doctor_id, Appointment.date)
+        .subquery()
+    )
+
+
+def rebuild_statements() -> List:
+    """Statements that recompute every counter from the appointments table."""
+    actual = _actual_counts()
+    per_doctor = (
+        select(func.count())
+        .where(
+            Appointment.doctor_id == Doctor.id,
+            Appointment.available == True,
+        )
+        .scalar_subquery()
+    )
+    return [
+        delete(DoctorSlotCount),
+        insert(DoctorSlotCount).from_select(
+            ["doctor_id", "date", "available_slots"],
+            select(actual.c.doctor_id, actual.c.date, actual.c.available_slots),
+        ),
+        update(Doctor).values(available_slots=per_doctor),
+    ]
+
+
+async def reconcile(db: AsyncSession, dry_run: bool = False) -> dict:
+    """
+    Compare the counters with a fresh count and, unless dry_run, rewrite them.
+    Appointment writes are blocked while this runs so the recount is exact.
+    """
+    await db.execute(text("LOCK TABLE appointments IN SHARE MODE"))
+
+    actual = _actual_counts()
+    stored = DoctorSlotCount.__table__
+    joined = stored.join(
+        actual,
+        (stored.c.doctor_id == actual.c.doctor_id) & (stored.c.date == actual.c.date),
+        full=True,
+    )
+    stored_n = func.coalesce(stored.c.available_slots, 0)
+    actual_n = func.coalesce(actual.c.available_slots, 0)
+    date_rows = (await db.execute(
+        select(
+            func.coalesce(stored.c.doctor_id, actual.c.doctor_id).label("doctor_id"),
+            func.coalesce(stored.c.date, actual.c.date).label("date"),
+            stored_n.label("stored"),
+            actual_n.label("actual"),
+        )
+        .select_from(joined)
+        .where(stored_n != actual_n)
+        .order_by("doctor_id", "date")
+    )).all()
+
+    per_doctor = (
+        select(Appointment.doctor_id, func.count().label("available_slots"))
+        .where(Appointment.available == True)
+        .group_by(Appointment.doctor_id)
+        .subquery()
+    )
+    doctor_actual = func.coalesce(per_doctor.c.available_slots, 0)
+    doctor_rows = (await db.execute(
+        select(Doctor.id, Doctor.available_slots, doctor_actual)
+        .outerjoin(per_doctor, per_doctor.c.doctor_id == Doctor.id)
+        .where(Doctor.available_slots != doctor_actual)
+        .order_by(Doctor.id)
+    )).all()
+
+    repaired = False
+    if not dry_run and (date_rows or doctor_rows):
+        for stmt in rebuild_statements():
+            await db.execute(stmt)
+        repaired = True
+    await db.commit()
+
+    return {
+        "date_drift": [
+            {"doctor_id": r.doctor_id, "date": r.date.isoformat(), "stored": r.stored, "actual": r.actual}
+            for r in date_rows
+        ],
+        "doctor_drift": [
+            {"doctor_id": id, "stored": stored_count, "actual": actual_count}
+            for id, stored_count, actual_count in doctor_rows
+        ],
+        "repaired": repaired,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+    import json
+
+    from app.db.session import AsyncSessionLocal
+
+    parser = argparse.ArgumentParser(description="Recount available-slot counters")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without fixing it")
+    args = parser.parse_args()
+
+    async def main():
+        async with AsyncSessionLocal() as db:
+            report = await reconcile(db, dry_run=args.dry_run)
+        print(json.dumps(report, indent=2))
+
+    asyncio.run(main())
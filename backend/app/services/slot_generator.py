@@ -0,0 +1,212 @@
+"""
+Slot generation from recurring availability.
+
+A doctor publishes ScheduleRules ("Mon-Fri, 10:00-13:00, 15-minute slots") and
+ScheduleExceptions (holidays, leave). generate_slots() expands them into open
+appointment rows for a rolling horizon of SLOT_HORIZON_DAYS with one SQL
+statement, so months of slots for thousands of doctors cost a single round trip:
+
+- missing slots are inserted; existing rows at the same time (imported,
+  blocked or booked) win, as ON CONFLICT DO NOTHING leaves them alone;
+- generated slots the rules no longer produce are deleted, unless a patient
+  has booked them;
+- the available-slot counters (see slot_counters.py) change in the same
+  statement.
+
+Running it again without rule changes does nothing, so it is safe from cron,
+at startup and after every rule edit:
+
+    python -m app.services.slot_generator [--days 90] [--doctor 3 --doctor 7]
+"""
+from datetime import date as Date, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import Date as DateType, Integer, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+# Generated rows are recognizable by their slot_id, e.g. "gen:12:20261019:0930"
+GENERATED_SLOT_PREFIX = "gen:"
+# Arbitrary, but fixed: concurrent runs for overlapping doctors would race on the same rows
+GENERATION_LOCK_KEY = 7_210_022
+
+GENERATE_SLOTS = text("""
+WITH days AS (
+    SELECT d::date AS day
+    FROM generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') AS d
+),
+rules AS (
+    SELECT * FROM schedule_rules
+    WHERE (CAST(:doctor_ids AS integer[]) IS NULL OR doctor_id = ANY(CAST(:doctor_ids AS integer[])))
+      AND valid_from <= CAST(:end AS date)
+      AND coalesce(valid_until, 'infinity'::date) >= CAST(:start AS date)
+),
+rule_days AS (
+    SELECT r.id AS rule_id, r.doctor_id, days.day, r.start_time, r.end_time,
+           make_interval(mins => r.slot_minutes) AS step
+    FROM rules r
+    JOIN days
+      ON days.day BETWEEN r.valid_from AND coalesce(r.valid_until, 'infinity'::date)
+     AND extract(isodow FROM days.day)::smallint = ANY(r.weekdays)
+),
+-- Holidays (no doctor_id) apply to every doctor with rules
+exceptions AS (
+    SELECT doctor_id, date_from, date_to, start_time, end_time
+    FROM schedule_exceptions
+    WHERE doctor_id IS NOT NULL AND date_to >= CAST(:start AS date) AND date_from <= CAST(:end AS date)
+    UNION ALL
+    SELECT doctors.doctor_id, e.date_from, e.date_to, e.start_time, e.end_time
+    FROM schedule_exceptions e CROSS JOIN (SELECT DISTINCT doctor_id FROM rules) AS doctors
+    WHERE e.doctor_id IS NULL AND e.date_to >= CAST(:start AS date) AND e.date_from <= CAST(:end AS date)
+),
+-- Blocked time per rule and day, as one multirange, so each slot is tested once
+blocked AS (
+    SELECT rd.rule_id, rd.day, range_agg(tsrange(
+        rd.day + coalesce(e.start_time, time '00:00'),
+        coalesce(rd.day + e.end_time, (rd.day + 1)::timestamp)
+    )) AS ranges
+    FROM rule_days rd
+    JOIN exceptions e ON e.doctor_id = rd.doctor_id AND rd.day BETWEEN e.date_from AND e.date_to
+    GROUP BY rd.rule_id, rd.day
+),
+desired AS (
+    SELECT rd.doctor_id, rd.day AS date, t::time AS time
+    FROM rule_days rd
+    LEFT JOIN blocked b ON b.rule_id = rd.rule_id AND b.day = rd.day
+    CROSS JOIN LATERAL generate_series(rd.day + rd.start_time, rd.day + rd.end_time - rd.step, rd.step) AS t
+    WHERE b.ranges IS NULL OR NOT b.ranges && tsrange(t, t + rd.step)
+),
+-- Cancelled bookings are history; the slot itself is the row that replaced them
+existing AS (
+    SELECT id, doctor_id, date, time FROM appointments
+    WHERE date BETWEEN CAST(:start AS date) AND CAST(:end AS date)
+      AND status IS DISTINCT FROM 'cancelled'
+      AND (CAST(:doctor_ids AS integer[]) IS NULL OR doctor_id = ANY(CAST(:doctor_ids AS integer[])))
+),
+-- A full join only runs as a hash or merge join, whatever the row estimates
+diff AS (
+    SELECT d.doctor_id, d.date, d.time, a.id AS existing_id
+    FROM desired d
+    FULL JOIN existing a ON a.doctor_id = d.doctor_id AND a.date = d.date AND a.time = d.time
+    WHERE a.id IS NULL OR d.doctor_id IS NULL
+),
+ins AS (
+    INSERT INTO appointments (slot_id, doctor_id, date, time, available, status, created_at)
+    SELECT CAST(:prefix AS text) || doctor_id || ':' || to_char(date, 'YYYYMMDD') || ':' || to_char(time, 'HH24MI'),
+           doctor_id, date, time, true, 'pending', now()
+    FROM diff
+    WHERE existing_id IS NULL
+    ON CONFLICT DO NOTHING
+    RETURNING doctor_id, date
+),
+-- Only generated, unbooked rows; re-checked against the current row version
+del AS (
+    DELETE FROM appointments a
+    USING diff
+    WHERE a.id = diff.existing_id
+      AND diff.doctor_id IS NULL
+      AND a.slot_id LIKE CAST(:prefix AS text) || '%'
+      AND a.patient_id IS NULL
+    RETURNING a.doctor_id, a.date, a.available
+),
+per_date AS (
+    SELECT doctor_id, date, sum(delta)::int AS delta
+    FROM (
+        SELECT doctor_id, date, 1 AS delta FROM ins
+        UNION ALL
+        SELECT doctor_id, date, -1 FROM del WHERE available
+    ) AS changes
+    GROUP BY doctor_id, date
+    HAVING sum(delta) <> 0
+),
+date_counts AS (
+    INSERT INTO doctor_slot_counts (doctor_id, date, available_slots)
+    SELECT doctor_id, date, delta FROM per_date
+    ON CONFLICT (doctor_id, date)
+    DO UPDATE SET available_slots = doctor_slot_counts.available_slots + EXCLUDED.available_slots
+),
+doctor_counts AS (
+    UPDATE doctors
+    SET available_slots = doctors.available_slots + per_doctor.delta
+    FROM (SELECT doctor_id, sum(delta)::int AS delta FROM per_date GROUP BY doctor_id) AS per_doctor
+    WHERE doctors.id = per_doctor.doctor_id
+)
+SELECT (SELECT count(*) FROM ins) AS added, (SELECT count(*) FROM del) AS retired
+""").bindparams(
+    bindparam("start", type_=DateType),
+    bindparam("end", type_=DateType),
+    bindparam("doctor_ids", type_=ARRAY(Integer)),
+)
+
+LOCK = text("SELECT pg_advisory_xact_lock(:key)")
+
+
+def _params(start: Optional[Date], days: Optional[int], doctor_ids: Optional[Iterable[int]]) -> dict:
+    start = start or Date.today()
+    days = days or settings.SLOT_HORIZON_DAYS
+    return {
+        "start": start,
+        "end": start + timedelta(days=days - 1),
+        "doctor_ids": sorted(set(doctor_ids)) if doctor_ids is not None else None,
+        "prefix": GENERATED_SLOT_PREFIX,
+    }
+
+
+def _report(params: dict, row) -> dict:
+    return {
+        "start": params["start"].isoformat(),
+        "end": params["end"].isoformat(),
+        "added": row.added,
+        "retired": row.retired,
+    }
+
+
+async def generate_slots(
+    db: AsyncSession,
+    start: Optional[Date] = None,
+    days: Optional[int] = None,
+    doctor_ids: Optional[Iterable[int]] = None,
+) -> dict:
+    """
+    Bring the slots from `start` (default today) for `days` days in line with
+    the rules of `doctor_ids` (default every doctor) and commit.
+    """
+    params = _params(start, days, doctor_ids)
+    await db.execute(LOCK, {"key": GENERATION_LOCK_KEY})
+    row = (await db.execute(GENERATE_SLOTS, params)).one()
+    await db.commit()
+    return _report(params, row)
+
+
+def generate_slots_sync(
+    db: Session,
+    start: Optional[Date] = None,
+    days: Optional[int] = None,
+    doctor_ids: Optional[Iterable[int]] = None,
+) -> dict:
+    """generate_slots() for the startup code and the CLI."""
+    params = _params(start, days, doctor_ids)
+    db.execute(LOCK, {"key": GENERATION_LOCK_KEY})
+    row = db.execute(GENERATE_SLOTS, params).one()
+    db.commit()
+    return _report(params, row)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Generate appointment slots from schedule rules")
+    parser.add_argument("--days", type=int, default=settings.SLOT_HORIZON_DAYS)
+    parser.add_argument("--start", type=Date.fromisoformat, help="first day, default today")
+    parser.add_argument("--doctor", type=int, action="append", help="doctor id; repeat for several")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        report = generate_slots_sync(db, start=args.start, days=args.days, doctor_ids=args.doctor)
+    print(json.dumps(report, indent=2))
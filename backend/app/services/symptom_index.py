@@ -0,0 +1,293 @@
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.data_version import DataVersion
+from app.models.remedy import Remedy
+from app.services.text import is_negated, normalize_symptom, tokenize
+
+# Common Hindi/Punjabi names (romanized and native script) for symptoms in the
+# curated data. They are indexed as extra phrases of every remedy listing the
+# English symptom.
+TRANSLITERATIONS = {
+    "headache": ["sir dard", "sar dard", "sirdard", "sar mein dard", "सिर दर्द", "सिरदर्द", "सर दर्द", "ਸਿਰ ਦਰਦ", "ਸਿਰਦਰਦ"],
+    "fever": ["bukhar", "bukhaar", "taap", "बुखार", "ज्वर", "ਬੁਖਾਰ", "ਬੁਖ਼ਾਰ", "ਤਾਪ"],
+    "high temperature": ["tez bukhar", "तेज बुखार", "ਤੇਜ਼ ਬੁਖਾਰ"],
+    "cold": ["zukam", "jukam", "sardi", "जुकाम", "ज़ुकाम", "सर्दी", "ਜ਼ੁਕਾਮ", "ਜੁਕਾਮ", "ਸਰਦੀ"],
+    "cough": ["khansi", "khaansi", "khang", "खांसी", "खाँसी", "ਖੰਘ", "ਖਾਂਸੀ"],
+    "sore throat": ["gala kharab", "gale mein dard", "gale me kharash", "गले में खराश", "गला खराब", "ਗਲਾ ਖਰਾਬ"],
+    "stomach ache": ["pet dard", "pet mein dard", "पेट दर्द", "पेट में दर्द", "ਪੇਟ ਦਰਦ", "ਢਿੱਡ ਦਰਦ"],
+    "acidity": ["seene mein jalan", "एसिडिटी", "सीने में जलन", "ਛਾਤੀ ਵਿੱਚ ਜਲਣ"],
+    "diarrhea": ["dast", "loose motion", "दस्त", "ਦਸਤ"],
+    "vomiting": ["ulti", "उल्टी", "ਉਲਟੀ"],
+    "toothache": ["daant dard", "dant dard", "दांत दर्द", "ਦੰਦ ਦਰਦ"],
+    "back pain": ["kamar dard", "कमर दर्द", "ਕਮਰ ਦਰਦ", "ਲੱਕ ਦਰਦ"],
+    "body pain": ["badan dard", "sharir dard", "बदन दर्द", "शरीर दर्द", "ਸਰੀਰ ਦਰਦ"],
+    "dizziness": ["chakkar", "चक्कर", "ਚੱਕਰ"],
+}
+
+# Keyed by normalized English symptom so "Headache" and "headaches" both find the aliases
+_ALIASES = {normalize_symptom(k): v for k, v in TRANSLITERATIONS.items()}
+
+# Only the phrases sharing the most trigrams with the query are scored exactly
+MAX_CANDIDATES = 32
+# Words this short are one edit away from unrelated ones ("sever"/"fever",
+# "cold"/"colt"), so they only count when spelled exactly
+EXACT_TOKEN_LENGTH = 5
+
+
+@dataclass
+class SymptomMatch:
+    remedy: dict
+    symptom: str  # the curated symptom that matched
+    confidence: float
+
+
+@dataclass
+class _Phrase:
+    remedy_index: int
+    symptom: str
+    tokens: Tuple[str, ...]
+    text: str
+
+
+def _trigrams(tokens: Iterable[str]) -> Set[str]:
+    grams = set()
+    for token in tokens:
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _similarity(a: str, b: str) -> float:
+    """1 - normalized Levenshtein distance."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return 1.0 - previous[-1] / len(a)
+
+
+class SymptomIndex:
+    """
+    Immutable inverted index over curated remedy symptoms.
+
+    Phrases whose words all appear in the query are found through a word index.
+    Otherwise a character-trigram index picks candidate phrases, which are scored
+    by edit distance against same-length windows of the query so typos
+    ("hedache") and extra words ("since morning") still match. Short words of
+    the phrase have to appear exactly in the window.
+    """
+
+    def __init__(self, remedies: List[dict]):
+        self.remedies = remedies
+        self.phrases: List[_Phrase] = []
+        self.words: Dict[str, List[int]] = {}
+        self.grams: Dict[str, List[int]] = {}
+        # Patients ask about the same few symptoms; repeat queries skip scoring
+        self.results = LRUCache(maxsize=4096)
+        self.built_at = time.monotonic()
+
+        for remedy_index, remedy in enumerate(remedies):
+            for symptom in remedy.get("symptoms") or []:
+                self._add(remedy_index, symptom, symptom)
+                for alias in _ALIASES.get(normalize_symptom(symptom), ()):
+                    self._add(remedy_index, symptom, alias)
+            self._add(remedy_index, remedy.get("title") or "", remedy.get("title") or "")
+
+    def _add(self, remedy_index: int, symptom: str, phrase: str) -> None:
+        tokens = tuple(tokenize(phrase))
+        if not tokens:
+            return
+        phrase_id = len(self.phrases)
+        self.phrases.append(_Phrase(remedy_index, symptom, tokens, " ".join(tokens)))
+        for token in set(tokens):
+            self.words.setdefault(token, []).append(phrase_id)
+        for gram in _trigrams(tokens):
+            self.grams.setdefault(gram, []).append(phrase_id)
+
+    @staticmethod
+    def _fuzzy_score(phrase: _Phrase, tokens: List[str], floor: float) -> float:
+        best = 0.0
+        n = len(phrase.tokens)
+        exact = [token for token in phrase.tokens if len(token) <= EXACT_TOKEN_LENGTH]
+        if len(exact) == n:
+            return 0.0  # nothing left to misspell; exact matches are found by the word index
+        for size in {max(1, n - 1), n, n + 1}:
+            for start in range(0, max(1, len(tokens) - size + 1)):
+                words = tokens[start:start + size]
+                if exact and not set(exact).issubset(words):
+                    continue
+                window = " ".join(words)
+                longest = max(len(window), len(phrase.text))
+                # the length difference alone bounds the similarity; skip hopeless windows
+                if 1.0 - abs(len(window) - len(phrase.text)) / longest <= max(best, floor):
+                    continue
+                best = max(best, _similarity(window, phrase.text))
+        return best
+
+    def search(self, query: str, limit: int = 5) -> List[SymptomMatch]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        cache_key = (" ".join(tokens), limit)
+        cached = self.results.get(cache_key)
+        if cached is not None:
+            return cached
+
+        token_set = set(tokens)
+        best: Dict[int, Tuple[float, str]] = {}
+
+        def offer(phrase: _Phrase, score: float) -> None:
+            if score > best.get(phrase.remedy_index, (0.0,))[0]:
+                best[phrase.remedy_index] = (score, phrase.symptom)
+
+        # 1. whole phrase present in the query, in any order
+        for token in token_set:
+            for phrase_id in self.words.get(token, ()):
+                phrase = self.phrases[phrase_id]
+                if token_set.issuperset(phrase.tokens):
+                    offer(phrase, 1.0)
+
+        # 2. typos and partial matches, only needed while we lack enough exact hits
+        if sum(1 for score, _ in best.values() if score >= 1.0) < limit:
+            shared = Counter()
+            for gram in _trigrams(tokens):
+                for phrase_id in self.grams.get(gram, ()):
+                    shared[phrase_id] += 1
+            for phrase_id, _ in shared.most_common(MAX_CANDIDATES):
+                phrase = self.phrases[phrase_id]
+                current = best.get(phrase.remedy_index, (0.0,))[0]
+                if current < 1.0:
+                    offer(phrase, self._fuzzy_score(phrase, tokens, current))
+
+        ranked = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+        results = [
+            SymptomMatch(remedy=self.remedies[index], symptom=symptom, confidence=round(score, 3))
+            for index, (score, symptom) in ranked
+        ]
+        self.results.set(cache_key, results)
+        return results
+
+    def match(self, query: str, min_confidence: Optional[float] = None) -> Optional[SymptomMatch]:
+        """
+        The best curated remedy if it clears the confidence threshold. Negated
+        queries ("no fever") never match; they are left to the LLM.
+        """
+        if is_negated(query):
+            return None
+        threshold = settings.SYMPTOM_MATCH_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        results = self.search(query, limit=1)
+        if results and results[0].confidence >= threshold:
+            return results[0]
+        return None
+
+
+def _remedy_row(remedy: Remedy) -> dict:
+    return {
+        "id": remedy.id,
+        "remedy_id": remedy.remedy_id,
+        "symptoms": remedy.symptoms,
+        "title": remedy.title,
+        "description": remedy.description,
+        "remedies_list": remedy.remedies_list,
+        "warning": remedy.warning,
+        "audio_text": remedy.audio_text,
+    }
+
+
+# Bumped by a trigger on every write to the remedies table (alembic revision 0006)
+REMEDIES_VERSION = select(DataVersion.version).where(DataVersion.name == "remedies")
+
+
+class SymptomIndexHolder:
+    """
+    Holds the current index and swaps in a rebuilt one when remedies change.
+    Remedy writes through the ORM in this process mark it stale at once; writes
+    from anywhere else (the import CLI, another worker) bump the remedies data
+    version, which is checked every SYMPTOM_INDEX_VERSION_CHECK_SECONDS.
+    """
+
+    def __init__(self):
+        self.index = SymptomIndex([])
+        self.version: Optional[int] = None  # remedies data version the index was built from
+        self.checked_at = 0.0
+        self.stale = True
+        self.refreshing = False
+        self.lookups = 0
+        self.hits = 0
+
+    def rebuild(self, db: Session) -> None:
+        version = db.execute(REMEDIES_VERSION).scalar()
+        remedies = db.execute(select(Remedy).order_by(Remedy.id)).scalars().all()
+        self.index = SymptomIndex([_remedy_row(r) for r in remedies])
+        self.version, self.checked_at = version, time.monotonic()
+        self.stale = False
+
+    async def ensure_fresh(self, db: AsyncSession) -> SymptomIndex:
+        if self.refreshing:
+            # Concurrent requests keep using the current index during a reload
+            return self.index
+        now = time.monotonic()
+        if not self.stale and now - self.checked_at >= settings.SYMPTOM_INDEX_VERSION_CHECK_SECONDS:
+            self.checked_at = now
+            if (await db.execute(REMEDIES_VERSION)).scalar() != self.version:
+                self.stale = True
+        if not (self.stale or now - self.index.built_at > settings.SYMPTOM_INDEX_REFRESH_SECONDS):
+            return self.index
+        self.refreshing = True
+        stale = self.stale
+        # Cleared up front so a remedy write during the reload marks it stale again
+        self.stale = False
+        try:
+            # Read before the remedies: a write in between only causes one more reload
+            version = (await db.execute(REMEDIES_VERSION)).scalar()
+            remedies = (await db.execute(select(Remedy).order_by(Remedy.id))).scalars().all()
+            self.index = SymptomIndex([_remedy_row(r) for r in remedies])
+            self.version, self.checked_at = version, time.monotonic()
+        except BaseException:
+            # Not reloaded: the next request tries again
+            self.stale = self.stale or stale
+            raise
+        finally:
+            self.refreshing = False
+        return self.index
+
+    def mark_stale(self, *args) -> None:
+        self.stale = True
+
+    def record(self, match: Optional[SymptomMatch]) -> None:
+        self.lookups += 1
+        if match is not None:
+            self.hits += 1
+
+    def stats(self) -> dict:
+        return {
+            "remedies": len(self.index.remedies),
+            "phrases": len(self.index.phrases),
+            "age_seconds": round(time.monotonic() - self.index.built_at, 1),
+            "version": self.version,
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
+
+
+symptom_index = SymptomIndexHolder()
+
+for _event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Remedy, _event, symptom_index.mark_stale)
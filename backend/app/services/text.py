@@ -0,0 +1,66 @@
+import re
+import unicodedata
+from typing import List
+
+# Words that don't change which remedy is asked for ("I have a bad cold")
+FILLER_WORDS = {
+    "i", "im", "ive", "me", "my", "a", "an", "the", "am", "is", "are", "have", "has",
+    "having", "got", "get", "feel", "feeling", "some", "little", "bit", "slight", "mild",
+    "bad", "very", "common", "and", "with", "from", "of",
+}
+# Words that turn a symptom into its absence ("no fever", "bukhar nahi hai")
+NEGATION_WORDS = {
+    "no", "not", "never", "without", "none", "nor", "neither", "cannot",
+    "nahi", "nahin", "nahii", "nhi", "na", "bina",
+    "नहीं", "नही", "ना", "बिना", "ਨਹੀਂ", "ਨਹੀ", "ਨਾ", "ਬਿਨਾ",
+}
+_SPACES = re.compile(r"\s+")
+
+
+def _strip_punctuation(text: str) -> str:
+    # Drop punctuation/symbols but keep combining marks (Devanagari/Gurmukhi vowel signs)
+    return "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in text)
+
+
+def stem(word: str) -> str:
+    # Crude English suffix stripping: headaches/headache, coughing/cough, sneezes/sneeze
+    if not word.isascii():
+        return word
+    if word.endswith("ing") and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        word = word[:-1]
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def clean_text(text: str) -> str:
+    """NFKC, casefold, punctuation to spaces, collapsed whitespace."""
+    text = _strip_punctuation(unicodedata.normalize("NFKC", text).casefold())
+    return _SPACES.sub(" ", text).strip()
+
+
+def is_negated(text: str) -> bool:
+    """True if `text` negates something: "no fever", "I don't have a cough"."""
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    if "n't" in folded or "n\u2019t" in folded:
+        return True
+    return not NEGATION_WORDS.isdisjoint(clean_text(folded).split(" "))
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed content words of `text`, in order."""
+    return [stem(w) for w in clean_text(text).split(" ") if w and w not in FILLER_WORDS]
+
+
+def normalize_symptom(text: str) -> str:
+    """
+    "Cold ", "common cold" and "COLD!" all normalize to "cold". Token order is
+    ignored so "cough and cold" and "cold, cough" share an entry.
+    """
+    words = set(tokenize(text))
+    if not words:
+        # only filler words: fall back to the collapsed text itself
+        return clean_text(text)
+    return " ".join(sorted(words))
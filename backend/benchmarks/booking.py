@@ -0,0 +1,77 @@
+"""Concurrent booking stress test: many patients race for the same slots.
+
+Every slot is requested by `--contenders` clients at once. The run passes when
+each slot ends up with exactly one booking and every other attempt got 409:
+
+    python -m benchmarks.booking --slots 500 --contenders 4 --concurrency 64
+
+Slots are created on a date far in the future that is unique to the run, so the
+script can be repeated against the same database.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import BASE_URL, login, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--doctor-id", type=int, default=1)
+    parser.add_argument("--slots", type=int, default=500)
+    parser.add_argument("--contenders", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {login(args.base_url)}"}
+    date = f"{random.randint(2100, 9999)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}"
+    slots = [f"{i // 60:02d}:{i % 60:02d}" for i in range(args.slots)]
+    attempts = [t for t in slots for _ in range(args.contenders)]
+    random.shuffle(attempts)
+
+    local = threading.local()
+    lock = threading.Lock()
+    statuses = Counter()
+    booked = Counter()
+    latencies = []
+
+    def book(slot_time):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        resp = session.post(
+            f"{args.base_url}/appointments/",
+            json={"doctor_id": args.doctor_id, "date": date, "time": slot_time, "symptoms": "stress test"},
+            headers=headers,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            statuses[resp.status_code] += 1
+            if resp.status_code == 200:
+                booked[slot_time] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(book, attempts))
+    wall = time.perf_counter() - started
+
+    double_booked = {t: n for t, n in booked.items() if n > 1}
+    print(f"{len(attempts)} attempts on {len(slots)} slots ({date}), concurrency {args.concurrency}")
+    print(f"  {len(attempts) / wall:9.1f} attempts/s   {statuses[200] / wall:9.1f} bookings/s")
+    print(f"  p50 {percentile(latencies, 50):8.1f} ms   p99 {percentile(latencies, 99):8.1f} ms")
+    print(f"  status codes: {dict(statuses)}")
+    print(f"  slots booked: {len(booked)}/{len(slots)}   double bookings: {len(double_booked)}")
+    if double_booked or len(booked) != len(slots) or set(statuses) - {200, 409}:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""ORM entity reads versus the Core column-select path for the catalog endpoints.
+
+Runs in-process against DATABASE_URL. For each table, it fetches one page per
+simulated request in a fresh session and encodes it the way the list endpoints
+do. It reports rows/second and the peak Python memory allocated per request
+(tracemalloc). --seed inserts synthetic products so pages can be large:
+
+    python -m benchmarks.catalog_reads --seed 5000 --rows 1000 --repeat 50 --cleanup
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from app import models, schemas
+from app.api.responses import row_encoder
+from app.db.readonly import column_select
+from app.db.session import AsyncSessionLocal
+from benchmarks.pagination import cleanup, seed
+
+CASES = [
+    ("products", models.Product, schemas.Product),
+    ("remedies", models.Remedy, schemas.Remedy),
+    ("doctors", models.Doctor, schemas.Doctor),
+]
+
+
+async def one_request(query, entities, encode):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(query)
+        rows = result.scalars().all() if entities else result.all()
+        return [encode(row) for row in rows]
+
+
+async def measure(query, entities, encode, repeat):
+    await one_request(query, entities, encode)  # warm up caches and connections
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows += len(await one_request(query, entities, encode))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    await one_request(query, entities, encode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows / elapsed if elapsed else 0.0, peak, rows // repeat
+
+
+async def run(rows, repeat):
+    for name, model, schema in CASES:
+        encode = row_encoder(schema)
+        orm = select(model).order_by(model.id).limit(rows)
+        core = column_select(model, schema).order_by(model.id).limit(rows)
+        orm_rate, orm_peak, n = await measure(orm, True, encode, repeat)
+        core_rate, core_peak, _ = await measure(core, False, encode, repeat)
+        print(
+            f"{name:9} {n:6} rows/request   ORM {orm_rate:10.0f} rows/s {orm_peak / 1024:8.1f} KiB   "
+            f"Core {core_rate:10.0f} rows/s {core_peak / 1024:8.1f} KiB   "
+            f"x{core_rate / orm_rate if orm_rate else 0:4.1f} speed, "
+            f"{(1 - core_peak / orm_peak) * 100 if orm_peak else 0:4.0f}% less memory"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="rows per request (page size)")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many synthetic products first")
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic products afterwards")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    try:
+        asyncio.run(run(args.rows, args.repeat))
+    finally:
+        if args.cleanup:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
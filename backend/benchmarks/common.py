@@ -0,0 +1,78 @@
+"""Shared helpers for the benchmark scripts.
+
+The benchmarks talk to a running stack (e.g. `docker-compose up`) in the same way
+as `test_all_docker.py`, so numbers include the full HTTP + database path.
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+
+def login(base_url=BASE_URL, username="patient1@example.com", password="password"):
+    resp = requests.post(
+        f"{base_url}/users/login/access-token",
+        data={"username": username, "password": password},
+    )
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_load(method, url, total, concurrency, headers=None, **kwargs):
+    """Fire `total` requests at `url` from `concurrency` threads.
+
+    Returns a dict with requests/second and latency percentiles in milliseconds.
+    """
+    local = threading.local()
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def one(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            resp = session.request(method, url, headers=headers, **kwargs)
+            ok = resp.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors[0],
+        "rps": total / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.mean(latencies) if latencies else 0.0,
+    }
+
+
+def format_result(label, result):
+    return (
+        f"{label:40} {result['rps']:9.1f} req/s   p50 {result['p50_ms']:8.1f} ms   "
+        f"p99 {result['p99_ms']:8.1f} ms   errors {result['errors']}"
+    )
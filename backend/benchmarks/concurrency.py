@@ -0,0 +1,61 @@
+"""Requests/second and p99 latency of the list endpoints under concurrent load.
+
+Run it against two deployments to compare them, e.g. the previous sync build and
+the async build:
+
+    python -m benchmarks.concurrency --base-url http://localhost:8000/api/v1 \
+        --compare-url http://localhost:8001/api/v1 --concurrency 64 --requests 4000
+"""
+import argparse
+
+from benchmarks.common import BASE_URL, format_result, login, run_load
+
+PATHS = [
+    "/doctors/",
+    "/doctors/available",
+    "/shop/",
+    "/remedies/",
+    "/appointments/",
+    "/health-records/",
+    "/users/me",
+]
+
+
+def bench(base_url, paths, total, concurrency):
+    headers = {"Authorization": f"Bearer {login(base_url)}"}
+    results = {}
+    for path in paths:
+        # warm up connections and caches before measuring
+        run_load("GET", f"{base_url}{path}", concurrency, concurrency, headers=headers)
+        results[path] = run_load("GET", f"{base_url}{path}", total, concurrency, headers=headers)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--compare-url", help="second deployment to compare against")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("paths", nargs="*", default=PATHS)
+    args = parser.parse_args()
+
+    targets = [args.base_url] + ([args.compare_url] if args.compare_url else [])
+    all_results = {url: bench(url, args.paths, args.requests, args.concurrency) for url in targets}
+
+    for url, results in all_results.items():
+        print(f"\n{url}  (concurrency={args.concurrency}, requests={args.requests})")
+        for path, result in results.items():
+            print(format_result(path, result))
+
+    if args.compare_url:
+        print("\nchange (compare -> base)")
+        base, other = all_results[args.base_url], all_results[args.compare_url]
+        for path in args.paths:
+            rps = (base[path]["rps"] / other[path]["rps"] - 1) * 100 if other[path]["rps"] else 0.0
+            p99 = (base[path]["p99_ms"] / other[path]["p99_ms"] - 1) * 100 if other[path]["p99_ms"] else 0.0
+            print(f"{path:40} rps {rps:+7.1f}%   p99 {p99:+7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
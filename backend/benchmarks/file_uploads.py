@@ -0,0 +1,78 @@
+"""Upload streaming versus reading the whole body: throughput and peak memory.
+
+Feeds --size-mb of random data in 64 KiB chunks (what the ASGI server hands
+the endpoint) to app.services.file_storage.store_stream, writing to a
+temporary local storage directory, and compares it with reading the full body
+into memory before hashing and writing it. Peak Python memory comes from a
+separate tracemalloc run, as tracemalloc would skew the timing.
+
+    python -m benchmarks.file_uploads --size-mb 200
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+import tracemalloc
+
+from app.core.config import settings
+from app.services import file_storage
+
+CHUNK = 64 * 1024
+
+
+async def chunks(total: int, block: bytes):
+    sent = 0
+    while sent < total:
+        piece = block[: min(CHUNK, total - sent)]
+        sent += len(piece)
+        yield piece
+
+
+async def streamed(total, block):
+    key, _, size = await file_storage.store_stream(chunks(total, block), max_bytes=total)
+    await file_storage.get_storage().delete(key)
+    return size
+
+
+async def buffered(total, block):
+    body = b"".join([piece async for piece in chunks(total, block)])
+    hashlib.sha256(body).hexdigest()
+    path = os.path.join(settings.FILE_STORAGE_PATH, "buffered")
+    with open(path, "wb") as f:
+        f.write(body)
+    os.unlink(path)
+    return len(body)
+
+
+def measure(fn, total, block):
+    started = time.perf_counter()
+    size = asyncio.run(fn(total, block))
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    asyncio.run(fn(total, block))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / elapsed / 1024 / 1024, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=100)
+    args = parser.parse_args()
+
+    total = args.size_mb * 1024 * 1024
+    block = os.urandom(CHUNK)
+    with tempfile.TemporaryDirectory() as directory:
+        settings.FILE_STORAGE_BACKEND = "local"
+        settings.FILE_STORAGE_PATH = directory
+        file_storage.get_storage.cache_clear()
+        for label, fn in (("buffered body", buffered), ("streamed (store_stream)", streamed)):
+            rate, peak = measure(fn, total, block)
+            print(f"{label:26} {rate:8.0f} MiB/s {peak:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Throughput and memory of the bulk importer, per input format and batch size.
+
+Writes --rows synthetic products to a temporary file in each format, imports
+them with app.services.importer into the database the stack uses (DATABASE_URL)
+and reports rows/s plus, from a second traced run (tracemalloc would skew the
+timing), the peak Python memory allocated. The baseline is the old seeding
+approach: json.load the whole file, then add one ORM object per row. The
+synthetic rows are deleted afterwards.
+
+    python -m benchmarks.imports --rows 100000 --batch-size 500 2000 5000
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import delete
+
+from app.db.session import SessionLocal, engine
+from app.models.product import Product
+from app.services.importer import run_import
+
+BENCH_PREFIX = "bench-import-"
+FIELDS = [
+    "product_id", "name", "generic_name", "brand", "category", "price", "original_price", "image",
+    "description", "prescription_required", "in_stock", "pack_size", "dosage", "manufacturer",
+    "uses", "rating", "reviews",
+]
+
+
+def product(i):
+    return {
+        "product_id": f"{BENCH_PREFIX}{i}",
+        "name": f"Import benchmark {i}",
+        "generic_name": "benchmark",
+        "brand": f"brand-{i % 50}",
+        "category": f"category-{i % 10}",
+        "price": 10.0 + i % 500,
+        "original_price": 20.0 + i % 500,
+        "image": "",
+        "description": "Synthetic row for the import benchmark",
+        "prescription_required": i % 3 == 0,
+        "in_stock": True,
+        "pack_size": "10",
+        "dosage": "-",
+        "manufacturer": "benchmark",
+        "uses": ["fever", "pain"],
+        "rating": 4.0,
+        "reviews": i % 100,
+    }
+
+
+def write_file(fmt, rows, directory):
+    path = os.path.join(directory, f"products.{fmt}")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "json":
+            f.write('{"medicines": [')
+            for i in range(rows):
+                f.write(("," if i else "") + json.dumps(product(i)))
+            f.write("]}")
+        elif fmt == "ndjson":
+            for i in range(rows):
+                f.write(json.dumps(product(i)) + "\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for i in range(rows):
+                row = product(i)
+                row["uses"] = "|".join(row["uses"])
+                writer.writerow(row)
+    return path
+
+
+def cleanup():
+    with engine.begin() as conn:
+        conn.execute(delete(Product).where(Product.product_id.startswith(BENCH_PREFIX)))
+
+
+def measure(fn):
+    cleanup()
+    start = time.perf_counter()
+    rows = fn()
+    elapsed = time.perf_counter() - start
+
+    cleanup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows / elapsed, peak
+
+
+def importer(path, fmt, batch_size):
+    def run():
+        with open(path, "rb") as f, SessionLocal() as db:
+            report = run_import(db, "products", f, fmt, batch_size=batch_size)
+        assert report.rejected == 0, report.rejects[:3]
+        return report.inserted + report.updated
+    return run
+
+
+def baseline(path):
+    def run():
+        with open(path, encoding="utf-8") as f:
+            items = json.load(f)["medicines"]
+        with SessionLocal() as db:
+            for item in items:
+                db.add(Product(**item))
+            db.commit()
+        return len(items)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1000])
+    parser.add_argument("--formats", nargs="+", default=["json", "ndjson", "csv"])
+    parser.add_argument("--no-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {fmt: write_file(fmt, args.rows, directory) for fmt in set(args.formats) | {"json"}}
+        try:
+            if not args.no_baseline:
+                rate, peak = measure(baseline(paths["json"]))
+                print(f"{'baseline (ORM, json.load)':28} {rate:10.0f} rows/s {peak / 1024 / 1024:8.1f} MiB peak")
+            for fmt in args.formats:
+                for batch_size in args.batch_size:
+                    rate, peak = measure(importer(paths[fmt], fmt, batch_size))
+                    label = f"importer {fmt}, batch {batch_size}"
+                    print(f"{label:28} {rate:10.0f} rows/s {peak / 1024 / 1024:8.1f} MiB peak")
+        finally:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Latency of a deep page with offset (skip/limit) versus keyset (cursor) pagination.
+
+Needs enough products for the requested page; --seed bulk-inserts synthetic ones
+directly into the database the stack uses (DATABASE_URL), --cleanup removes them:
+
+    python -m benchmarks.pagination --seed 20000 --page 1000 --limit 20
+"""
+import argparse
+
+from sqlalchemy import delete, select
+
+from app.api.pagination import encode_cursor
+from app.db.session import engine
+from app.models.product import Product
+from benchmarks.common import BASE_URL, format_result, login, run_load
+
+BENCH_PREFIX = "bench-page-"
+
+
+def seed(count):
+    rows = [
+        {
+            "product_id": f"{BENCH_PREFIX}{i}",
+            "name": f"Benchmark product {i}",
+            "generic_name": "benchmark",
+            "brand": "benchmark",
+            "category": "benchmark",
+            "price": 100.0,
+            "original_price": 120.0,
+            "image": "",
+            "description": "Synthetic row for the pagination benchmark",
+            "prescription_required": False,
+            "in_stock": True,
+            "pack_size": "1",
+            "dosage": "-",
+            "manufacturer": "benchmark",
+            "uses": [],
+            "rating": 0.0,
+            "reviews": 0,
+        }
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(Product.__table__.insert(), rows)
+
+
+def cleanup():
+    with engine.begin() as conn:
+        conn.execute(delete(Product).where(Product.product_id.startswith(BENCH_PREFIX)))
+
+
+def cursor_for_page(page, limit):
+    """Cursor that starts at `page` (1-based): the id of the last row before it."""
+    with engine.connect() as conn:
+        last_id = conn.execute(
+            select(Product.id).order_by(Product.id).offset((page - 1) * limit - 1).limit(1)
+        ).scalar()
+    if last_id is None:
+        raise SystemExit(f"not enough products for page {page}, use --seed")
+    return encode_cursor([last_id])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0, help="insert this many synthetic products first")
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic products afterwards")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    try:
+        headers = {"Authorization": f"Bearer {login(args.base_url)}"}
+        url = f"{args.base_url}/shop/"
+        offset = {"skip": (args.page - 1) * args.limit, "limit": args.limit}
+        keyset = {"cursor": cursor_for_page(args.page, args.limit), "limit": args.limit}
+
+        print(f"page {args.page} of /shop/ with limit {args.limit}, {args.requests} sequential requests")
+        for label, params in (("offset", offset), ("keyset", keyset)):
+            run_load("GET", url, 10, 1, headers=headers, params=params)  # warm up
+            print(format_result(label, run_load("GET", url, args.requests, 1, headers=headers, params=params)))
+    finally:
+        if args.cleanup:
+            cleanup()
+
+
+if __name__ == "__main__":
+    main()
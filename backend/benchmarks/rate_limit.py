@@ -0,0 +1,42 @@
+"""Per-request cost of the rate limit check, memory and Redis backends.
+
+Times app.core.rate_limit.rate_limiter.hit() for --calls requests spread over
+--clients keys, with a limit high enough that nothing is rejected, i.e. the
+price every allowed request pays. The Redis backend is measured when
+--redis-url is given (needs the redis package).
+
+    python -m benchmarks.rate_limit --calls 200000 --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.rate_limit import parse_limit, rate_limiter
+
+
+async def run(calls, clients):
+    limit = parse_limit(f"{calls * 10}/second")
+    started = time.perf_counter()
+    for i in range(calls):
+        await rate_limiter.hit("bench", str(i % clients), limit)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--redis-url", default="")
+    args = parser.parse_args()
+
+    print(f"{'memory':8} {asyncio.run(run(args.calls, args.clients)):8.2f} us/request")
+    if args.redis_url:
+        settings.RATE_LIMIT_REDIS_URL = args.redis_url
+        rate_limiter.use_redis()
+        calls = min(args.calls, 20000)
+        print(f"{'redis':8} {asyncio.run(run(calls, args.clients)):8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
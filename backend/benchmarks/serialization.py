@@ -0,0 +1,144 @@
+"""Serialization microbenchmark for the list endpoints, no server or database needed.
+
+For each list schema, times turning N ORM rows into a JSON body:
+
+  * pydantic: validate the rows against the response model, then dump JSON
+    (what FastAPI does with response_model);
+  * fast: app.api.responses.row_encoder + orjson (the default list path).
+
+    python -m benchmarks.serialization --rows 100 --repeat 200
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, time as clock, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import models, schemas
+from app.api.endpoints.appointments import AppointmentSchema
+from app.api.responses import FastJSONResponse, row_encoder
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def load(name):
+    with open(os.path.join(DATA_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def doctor_rows(n):
+    source = load("doctors.json")["doctors"]
+    return [
+        models.Doctor(
+            id=i, user_id=i, doctor_id=f"{d['id']}_{i}", name=d["name"], qualification=d["qualification"],
+            specialization=d["specialization"], experience=d["experience"], image=d["image"],
+            rating=d["rating"], reviews=d["reviews"], availability=True, fees=d["consultationFee"],
+            languages=d["languages"], bio=d["description"],
+        )
+        for i, d in ((i, source[i % len(source)]) for i in range(n))
+    ]
+
+
+def product_rows(n):
+    source = load("shop.json")["medicines"]
+    return [
+        models.Product(
+            id=i, product_id=f"{p['id']}_{i}", name=p["name"], generic_name=p["genericName"], brand=p["brand"],
+            category=p["category"], price=p["price"], original_price=p["originalPrice"], image=p["image"],
+            description=p["description"], prescription_required=p["prescriptionRequired"],
+            in_stock=p["inStock"], pack_size=p["packSize"], dosage=p["dosage"],
+            manufacturer=p["manufacturer"], uses=p["uses"], rating=p["rating"], reviews=p["reviews"],
+        )
+        for i, p in ((i, source[i % len(source)]) for i in range(n))
+    ]
+
+
+def remedy_rows(n):
+    source = load("remedies.json")["remedies"]
+    return [
+        models.Remedy(
+            id=i, remedy_id=f"{r['id']}_{i}", symptoms=r["symptoms"], title=r["title"],
+            description=r["description"], remedies_list=r["remedies"], warning=r["warning"],
+            audio_text=r["audioText"],
+        )
+        for i, r in ((i, source[i % len(source)]) for i in range(n))
+    ]
+
+
+def patient(i):
+    return models.User(id=i, email=f"patient{i}@example.com", full_name=f"Patient {i}",
+                       is_active=True, is_superuser=False, role="patient")
+
+
+def appointment_rows(n):
+    now = datetime.now(timezone.utc)
+    return [
+        models.Appointment(
+            id=i, doctor_id=1, patient_id=i, patient=patient(i), date=date(2030, 1, 1 + i % 28),
+            time=clock(9 + i % 8, 30), status="confirmed", symptoms="Fever and cough", notes=None, created_at=now,
+        )
+        for i in range(n)
+    ]
+
+
+def health_record_rows(n):
+    now = datetime.now(timezone.utc)
+    return [
+        models.HealthRecord(
+            id=i, patient_id=i, patient=patient(i), record_type="lab_report", title=f"Blood test {i}",
+            description="CBC within normal range", file_url=None, created_at=now, updated_at=None,
+        )
+        for i in range(n)
+    ]
+
+
+CASES = [
+    ("/doctors/", schemas.Doctor, doctor_rows),
+    ("/shop/", schemas.Product, product_rows),
+    ("/remedies/", schemas.Remedy, remedy_rows),
+    ("/appointments/", AppointmentSchema, appointment_rows),
+    ("/health-records/", schemas.HealthRecord, health_record_rows),
+]
+
+
+def timed(fn, repeat):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - start) / repeat, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.rows} rows per response, mean of {args.repeat} runs")
+    for path, schema, make_rows in CASES:
+        rows = make_rows(args.rows)
+        adapter = TypeAdapter(List[schema])
+        encode = row_encoder(schema)
+        response = FastJSONResponse([])
+
+        def pydantic_path():
+            return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+        def fast_path():
+            return response.render([encode(row) for row in rows])
+
+        slow, slow_body = timed(pydantic_path, args.repeat)
+        fast, fast_body = timed(fast_path, args.repeat)
+        same = json.loads(slow_body) == json.loads(fast_body)
+        print(
+            f"{path:18} pydantic {slow * 1000:7.3f} ms   fast {fast * 1000:7.3f} ms   "
+            f"x{slow / fast:5.1f}   {len(fast_body) / 1024:6.1f} KiB   identical={same}"
+        )
+
+
+if __name__ == "__main__":
+    main()
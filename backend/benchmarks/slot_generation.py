@@ -0,0 +1,137 @@
+"""Slot generation from schedule rules: full horizon, no-op re-run and incremental change.
+
+Inserts --doctors synthetic doctors with two rules each (weekday mornings in
+15-minute slots, Saturday evenings in 30-minute slots) into the database the
+stack uses (DATABASE_URL), then times app.services.slot_generator for --days
+days: the first run, an immediate re-run that should change nothing, the run
+after a one-week leave for a tenth of the doctors and the daily run that only
+adds the new last day. The baseline expands the same rules in Python and adds
+one ORM object per slot, for --baseline-doctors of them. Everything synthetic
+is deleted afterwards.
+
+    python -m benchmarks.slot_generation --doctors 5000 --days 90
+"""
+import argparse
+import time
+from datetime import date, datetime, time as Time, timedelta
+
+from sqlalchemy import delete, select
+
+from app.db.session import SessionLocal, engine
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor
+from app.models.schedule import ScheduleException, ScheduleRule
+from app.services.slot_generator import generate_slots_sync
+
+BENCH_PREFIX = "bench-schedule-"
+RULES = [
+    {"weekdays": [1, 2, 3, 4, 5], "start_time": Time(9, 0), "end_time": Time(13, 0), "slot_minutes": 15},
+    {"weekdays": [6], "start_time": Time(17, 0), "end_time": Time(20, 0), "slot_minutes": 30},
+]
+
+
+def seed(count, start):
+    with engine.begin() as conn:
+        ids = conn.execute(
+            Doctor.__table__.insert().returning(Doctor.id),
+            [
+                {
+                    "doctor_id": f"{BENCH_PREFIX}{i}",
+                    "name": {"en": f"Benchmark doctor {i}"},
+                    "qualification": {"en": "-"},
+                    "specialization": {"en": "benchmark"},
+                    "experience": {"en": "-"},
+                    "image": "",
+                    "rating": 0.0,
+                    "reviews": 0,
+                    "availability": True,
+                    "fees": 0,
+                    "languages": ["English"],
+                    "bio": {"en": "-"},
+                }
+                for i in range(count)
+            ],
+        ).scalars().all()
+        conn.execute(
+            ScheduleRule.__table__.insert(),
+            [{"doctor_id": id, "valid_from": start, **rule} for id in ids for rule in RULES],
+        )
+    return ids
+
+
+def cleanup():
+    ids = select(Doctor.id).where(Doctor.doctor_id.startswith(BENCH_PREFIX)).scalar_subquery()
+    with engine.begin() as conn:
+        # Rules, exceptions and slot counters cascade
+        conn.execute(delete(Appointment).where(Appointment.doctor_id.in_(ids)))
+        conn.execute(delete(Doctor).where(Doctor.id.in_(ids)))
+
+
+def timed(label, fn):
+    started = time.perf_counter()
+    report = fn()
+    elapsed = time.perf_counter() - started
+    changed = report["added"] + report["retired"]
+    print(
+        f"{label:34} {elapsed:8.2f} s   +{report['added']:<9} -{report['retired']:<9}"
+        f"{changed / elapsed if elapsed and changed else 0:12.0f} slots/s"
+    )
+
+
+def baseline(doctor_ids, start, days):
+    with SessionLocal() as db:
+        added = 0
+        for doctor_id in doctor_ids:
+            for offset in range(days):
+                day = start + timedelta(days=offset)
+                for rule in RULES:
+                    if day.isoweekday() not in rule["weekdays"]:
+                        continue
+                    slot = datetime.combine(day, rule["start_time"])
+                    end = datetime.combine(day, rule["end_time"])
+                    step = timedelta(minutes=rule["slot_minutes"])
+                    while slot + step <= end:
+                        db.add(Appointment(doctor_id=doctor_id, date=day, time=slot.time(), available=True))
+                        slot += step
+                        added += 1
+        db.commit()
+    return {"added": added, "retired": 0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--baseline-doctors", type=int, default=50, help="0 skips the baseline")
+    args = parser.parse_args()
+
+    start = date.today()
+    cleanup()
+    try:
+        ids = seed(args.doctors, start)
+        with SessionLocal() as db:
+            run = lambda: generate_slots_sync(db, start=start, days=args.days, doctor_ids=ids)
+            timed(f"generate {args.doctors} doctors x {args.days} days", run)
+            timed("re-run, nothing changed", run)
+
+            with engine.begin() as conn:
+                conn.execute(ScheduleException.__table__.insert(), [
+                    {"doctor_id": id, "date_from": start + timedelta(days=7), "date_to": start + timedelta(days=13)}
+                    for id in ids[::10]
+                ])
+            timed("after one week of leave (10%)", run)
+            timed(
+                "next day, horizon rolled forward",
+                lambda: generate_slots_sync(db, start=start + timedelta(days=1), days=args.days, doctor_ids=ids),
+            )
+
+        if args.baseline_doctors:
+            cleanup()
+            ids = seed(args.baseline_doctors, start)
+            timed(f"baseline: ORM, {args.baseline_doctors} doctors", lambda: baseline(ids, start, args.days))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,20 @@
-from fastapi import FastAPI
+import asyncio
+import random
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import OperationalError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
+from app.core.hashing import PasswordHasherBusy, password_hasher
+from app.core.metrics import MetricsMiddleware, metrics, render_pool_snapshots
+from app.core.rate_limit import RateLimited
+from app.services.llm_scheduler import SchedulerOverloaded
+from app.services.slot_generator import generate_slots_sync
+from app.services.symptom_index import symptom_index
 from app.api.api import api_router
-from app.db.init_db import init_db
-from app.db.base_models import Base
-from app.db.session import SessionLocal
+from app.db.init_db import prepare_database
+from app.db.session import SessionLocal, async_pool_metrics, sync_pool_metrics
 
 app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
 
@@ -16,31 +26,77 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
+# Outermost, so the recorded latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many login attempts in progress, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(SchedulerOverloaded)
+async def llm_overloaded_handler(request: Request, exc: SchedulerOverloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "AI assistant is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+def initialize_database():
+    prepare_database(seed=settings.SEED_DEMO_DATA)
+    with SessionLocal() as db:
+        symptom_index.rebuild(db)
+        # Roll the slot horizon forward; a no-op when nothing changed since the last run
+        generate_slots_sync(db)
+
 @app.on_event("startup")
-def startup_event():
-    import time
-    from sqlalchemy import text
-    
-    retries = 10
-    while retries > 0:
+async def startup_event():
+    # Blocking database work runs in a thread; waiting for the database to come
+    # up uses exponential backoff with jitter and never blocks the event loop.
+    delay = settings.DB_STARTUP_BACKOFF_SECONDS
+    for attempt in range(1, settings.DB_STARTUP_RETRIES + 1):
         try:
-            db = SessionLocal()
-            db.execute(text("SELECT 1"))
-            init_db(db)
+            await run_in_threadpool(initialize_database)
             print("Database initialized successfully.")
-            break
-        except Exception as e:
-            print(f"Database not ready yet... ({retries} retries left): {str(e)}")
-            retries -= 1
-            time.sleep(5)
-        finally:
-            if 'db' in locals() and db:
-                db.close()
+            return
+        except OperationalError as e:
+            if attempt == settings.DB_STARTUP_RETRIES:
+                raise
+            print(f"Database not ready yet... ({settings.DB_STARTUP_RETRIES - attempt} retries left): {str(e)}")
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, settings.DB_STARTUP_BACKOFF_MAX_SECONDS)
 
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    pools = {"sync": sync_pool_metrics.snapshot(), "async": async_pool_metrics.snapshot()}
+    return metrics.render(extra=render_pool_snapshots(pools))
+
+@app.on_event("startup")
+def start_password_hasher():
+    password_hasher.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.db.session import async_engine
+    password_hasher.shutdown()
+    await async_engine.dispose()
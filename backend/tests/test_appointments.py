@@ -0,0 +1,124 @@
+from datetime import time
+
+import anyio
+import httpx
+import pytest
+
+import main
+
+BOOK = "/api/v1/appointments/"
+
+
+def booking(doctor_id, day, at="10:00"):
+    return {"doctor_id": doctor_id, "date": day.isoformat(), "time": at, "symptoms": "cough"}
+
+
+def test_booking_claims_the_published_slot(client, login, calendar):
+    doctor_id, day = calendar.doctor_id(), calendar.day()
+    slot_id = calendar.open_slot(doctor_id, day, time(10, 0))
+
+    response = client.post(BOOK, json=booking(doctor_id, day), headers=login("patient1@example.com"))
+
+    assert response.status_code == 200, response.text
+    assert response.json()["id"] == slot_id
+    assert response.json()["status"] == "pending"
+    assert calendar.available(doctor_id, day) == 0
+
+
+def test_booked_slot_is_a_conflict(client, login, calendar):
+    doctor_id, day = calendar.doctor_id(), calendar.day()
+    calendar.open_slot(doctor_id, day)
+    assert client.post(BOOK, json=booking(doctor_id, day), headers=login("patient1@example.com")).status_code == 200
+
+    response = client.post(BOOK, json=booking(doctor_id, day), headers=login("patient2@example.com"))
+
+    assert response.status_code == 409
+    assert [row["patient_id"] for row in calendar.rows(doctor_id, day)] == [
+        client.get("/api/v1/users/me", headers=login("patient1@example.com")).json()["id"]
+    ]
+
+
+def test_unpublished_time_is_not_bookable(client, login, calendar):
+    doctor_id, day = calendar.doctor_id(), calendar.day()
+    calendar.open_slot(doctor_id, day, time(10, 0))
+
+    response = client.post(BOOK, json=booking(doctor_id, day, "03:00"), headers=login("patient1@example.com"))
+
+    assert response.status_code == 404
+    assert len(calendar.rows(doctor_id, day)) == 1
+    assert calendar.available(doctor_id, day) == 1
+
+
+def test_unknown_doctor(client, login, calendar):
+    response = client.post(BOOK, json=booking(999999, calendar.day()), headers=login("patient1@example.com"))
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_concurrent_bookings_claim_the_slot_once(client, login, calendar):
+    doctor_id, day = calendar.doctor_id(), calendar.day()
+    calendar.open_slot(doctor_id, day)
+    patients = [login("patient1@example.com"), login("patient2@example.com")] * 4
+    statuses = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as http:
+        async def book(headers):
+            response = await http.post(BOOK, json=booking(doctor_id, day), headers=headers)
+            statuses.append(response.status_code)
+
+        async with anyio.create_task_group() as tasks:
+            for headers in patients:
+                tasks.start_soon(book, headers)
+
+    assert sorted(statuses) == [200] + [409] * (len(patients) - 1)
+    assert calendar.available(doctor_id, day) == 0
+    assert sum(row["patient_id"] is not None for row in calendar.rows(doctor_id, day)) == 1
+
+
+def book(client, login, calendar, patient="patient1@example.com"):
+    doctor_id, day = calendar.doctor_id(), calendar.day()
+    calendar.open_slot(doctor_id, day)
+    response = client.post(BOOK, json=booking(doctor_id, day), headers=login(patient))
+    assert response.status_code == 200, response.text
+    return response.json(), doctor_id, day
+
+
+def test_cancelling_keeps_the_booking_and_reopens_the_slot(client, login, calendar):
+    appointment, doctor_id, day = book(client, login, calendar)
+    patient = login("patient1@example.com")
+
+    response = client.put(f"{BOOK}{appointment['id']}", json={"status": "cancelled"}, headers=patient)
+
+    assert response.status_code == 200, response.text
+    assert calendar.available(doctor_id, day) == 1
+    # Someone else books the reopened slot; the first booking stays in its patient's history
+    rebooked = client.post(BOOK, json=booking(doctor_id, day), headers=login("patient2@example.com"))
+    assert rebooked.status_code == 200, rebooked.text
+    assert rebooked.json()["id"] != appointment["id"]
+    history = client.get(BOOK, params={"date_from": day, "date_to": day}, headers=patient).json()
+    assert [(a["id"], a["status"], a["symptoms"]) for a in history] == [(appointment["id"], "cancelled", "cough")]
+    assert calendar.available(doctor_id, day) == 0
+
+
+def test_cancelled_appointment_cannot_be_revived(client, login, calendar):
+    appointment, _, _ = book(client, login, calendar)
+    url = f"{BOOK}{appointment['id']}"
+    assert client.put(url, json={"status": "cancelled"}, headers=login("patient1@example.com")).status_code == 200
+
+    response = client.put(url, json={"status": "confirmed"}, headers=login("dr_sharma@example.com"))
+
+    assert response.status_code == 409
+
+
+def test_only_the_appointments_doctor_or_patient_may_update_it(client, login, calendar):
+    appointment, _, _ = book(client, login, calendar)
+    url = f"{BOOK}{appointment['id']}"
+
+    assert client.put(url, json={"status": "confirmed"}, headers=login("dr_priya@example.com")).status_code == 403
+    assert client.put(url, json={"status": "cancelled"}, headers=login("patient2@example.com")).status_code == 403
+    # The patient may cancel, nothing else
+    assert client.put(url, json={"status": "confirmed"}, headers=login("patient1@example.com")).status_code == 403
+
+    response = client.put(url, json={"status": "confirmed", "notes": "bring reports"}, headers=login("dr_sharma@example.com"))
+    assert response.status_code == 200
+    assert (response.json()["status"], response.json()["notes"]) == ("confirmed", "bring reports")
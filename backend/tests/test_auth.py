@@ -0,0 +1,149 @@
+import time
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import deps
+from app.core import auth_cache, security
+from app.core.auth_cache import RevocationList
+from app.core.config import settings
+
+ADMIN = ("admin@example.com", "adminpassword")
+
+
+def token_for(user_id: int, minutes: int = 30) -> str:
+    user = SimpleNamespace(email=f"user{user_id}@example.com", id=user_id, role="patient", is_active=True, is_superuser=False)
+    return security.create_access_token(security.user_claims(user), expires_delta=timedelta(minutes=minutes))
+
+
+def rejected(token: str) -> bool:
+    try:
+        deps._verify_token(token)
+    except HTTPException as e:
+        assert e.status_code == 401
+        return True
+    return False
+
+
+@pytest.fixture(autouse=True)
+def fresh_auth_state(monkeypatch):
+    monkeypatch.setattr(deps, "revocations", RevocationList())
+    monkeypatch.setattr(auth_cache, "revocations", deps.revocations)
+    deps.verified_tokens.clear()
+
+
+@pytest.fixture
+def new_user(database):
+    """new_user() -> id of a fresh account, so revoking it affects no other test."""
+    from app.db.session import SessionLocal
+    from app.models import User
+
+    def new_user() -> int:
+        with SessionLocal() as db:
+            user = User(email=f"user-{uuid.uuid4().hex[:8]}@example.com", hashed_password="-", role="patient")
+            db.add(user)
+            db.commit()
+            return user.id
+
+    return new_user
+
+
+async def revoke(revocations: RevocationList, user_id: int) -> None:
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        await revocations.revoke_user(db, user_id)
+        await db.commit()
+
+
+@pytest.mark.anyio
+async def test_revocation_rejects_earlier_tokens_even_when_cached(new_user):
+    user_id, other_id = new_user(), new_user()
+    token = token_for(user_id)
+    assert deps._verify_token(token).id == user_id
+    assert deps.verified_tokens.get(token) is not None
+
+    await revoke(auth_cache.revocations, user_id)
+
+    assert rejected(token)
+    # Other users are unaffected, and logging in again works
+    assert not rejected(token_for(other_id))
+    assert not rejected(token_for(user_id))
+
+
+def test_expired_cached_token_is_rejected_and_dropped(monkeypatch):
+    token = token_for(103)
+    deps._verify_token(token)
+    later = time.time() + 31 * 60
+    monkeypatch.setattr(deps.time, "time", lambda: later)
+
+    assert rejected(token)
+    assert deps.verified_tokens.get(token) is None
+
+
+@pytest.mark.anyio
+async def test_revocation_reaches_other_workers(new_user, monkeypatch):
+    from app.db.session import AsyncSessionLocal
+
+    user_id = new_user()
+    issued_at = time.time()
+    # One RevocationList per worker process
+    worker, other_worker = RevocationList(), RevocationList()
+    await other_worker.ensure_fresh()
+
+    await revoke(worker, user_id)
+    assert worker.is_revoked(user_id, issued_at)
+
+    # Not polled again before the interval is up
+    await other_worker.ensure_fresh()
+    assert not other_worker.is_revoked(user_id, issued_at)
+    monkeypatch.setattr(settings, "TOKEN_REVOCATION_CHECK_SECONDS", 0)
+    await other_worker.ensure_fresh()
+    assert other_worker.is_revoked(user_id, issued_at)
+    assert not other_worker.is_revoked(user_id, time.time())
+
+    # A worker started later loads it as well
+    late_worker = RevocationList()
+    async with AsyncSessionLocal() as db:
+        await late_worker.refresh(db)
+    assert late_worker.is_revoked(user_id, issued_at)
+
+
+@pytest.mark.anyio
+async def test_revocations_are_pruned_once_no_token_can_be_older(new_user, monkeypatch):
+    from app.db.session import AsyncSessionLocal
+
+    first, second = new_user(), new_user()
+    revocations = RevocationList()
+    await revoke(revocations, first)
+    assert revocations.is_revoked(first, issued_at=time.time() - 1)
+
+    later = time.time() + security.ACCESS_TOKEN_MAX_LIFETIME_SECONDS + 1
+    monkeypatch.setattr(auth_cache.time, "time", lambda: later)
+    await revoke(revocations, second)  # pruning happens on writes
+    assert not revocations.is_revoked(first, issued_at=None)
+    assert revocations.is_revoked(second, issued_at=None)
+
+    fresh = RevocationList()
+    async with AsyncSessionLocal() as db:
+        await fresh.refresh(db)
+    assert not fresh.is_revoked(first, issued_at=None)
+
+
+def test_changing_a_users_role_revokes_their_tokens(client, login):
+    email = f"patient-{uuid.uuid4().hex[:8]}@example.com"
+    user = client.post("/api/v1/users/signup", json={"email": email, "password": "password"}).json()
+    response = client.post("/api/v1/users/login/access-token", data={"username": email, "password": "password"})
+    patient = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/v1/users/me", headers=patient).status_code == 200
+
+    # Only the name changed: no claim in the token is stale
+    admin = login(*ADMIN)
+    assert client.put(f"/api/v1/admin/users/{user['id']}", json={"full_name": "Renamed"}, headers=admin).status_code == 200
+    assert client.get("/api/v1/users/me", headers=patient).status_code == 200
+
+    assert client.put(f"/api/v1/admin/users/{user['id']}", json={"is_active": False}, headers=admin).status_code == 200
+    assert client.get("/api/v1/users/me", headers=patient).status_code == 401
@@ -0,0 +1,134 @@
+"""Health record file upload, dedup, download and delete on both storage backends."""
+import hashlib
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.services import file_storage
+
+RECORDS = "/api/v1/health-records/"
+PATIENT = "patient1@example.com"
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage(request, database, tmp_path, monkeypatch):
+    """The backend under test, empty; S3 is moto's in-process fake."""
+    monkeypatch.setattr(settings, "FILE_STORAGE_BACKEND", request.param)
+    monkeypatch.setattr(settings, "FILE_STORAGE_PATH", str(tmp_path))
+    file_storage.get_storage.cache_clear()
+    if request.param == "local":
+        yield request.param
+    else:
+        pytest.importorskip("boto3")
+        moto = pytest.importorskip("moto")
+        for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+            monkeypatch.setenv(name, "testing")
+        monkeypatch.setattr(settings, "FILE_STORAGE_S3_BUCKET", "telemedicine-test")
+        monkeypatch.setattr(settings, "FILE_STORAGE_S3_REGION", "us-east-1")
+        with moto.mock_aws():
+            s3 = file_storage.get_storage()
+            s3.client.create_bucket(Bucket=s3.bucket)
+            yield request.param
+    file_storage.get_storage.cache_clear()
+
+
+def stored_keys() -> list:
+    storage = file_storage.get_storage()
+    if isinstance(storage, file_storage.S3Storage):
+        listing = storage.client.list_objects_v2(Bucket=storage.bucket, Prefix=storage.prefix)
+        return sorted(o["Key"][len(storage.prefix):] for o in listing.get("Contents", []))
+    return sorted(
+        os.path.relpath(os.path.join(folder, name), storage.root)
+        for folder, _, names in os.walk(storage.root) for name in names
+    )
+
+
+def new_record(client, headers) -> int:
+    response = client.post(RECORDS, json={"record_type": "lab_report", "title": "Blood test"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def upload(client, headers, record_id: int, content):
+    return client.put(
+        f"{RECORDS}{record_id}/file", params={"filename": "report.pdf"}, content=content,
+        headers={**headers, "Content-Type": "application/pdf"},
+    )
+
+
+def test_upload_and_download(client, login, storage):
+    headers = login(PATIENT)
+    record_id = new_record(client, headers)
+    # Several request chunks, so the upload is written in pieces
+    content = os.urandom(2 * file_storage.CHUNK_SIZE + 100)
+
+    response = upload(client, headers, record_id, content)
+    assert response.status_code == 200, response.text
+    assert response.json()["file_size"] == len(content)
+    assert response.json()["file_content_type"] == "application/pdf"
+    assert len(stored_keys()) == 1
+
+    response = client.get(f"{RECORDS}{record_id}/file", headers=headers)
+    assert response.status_code == 200
+    assert response.content == content
+    etag = response.headers["etag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+
+    response = client.get(f"{RECORDS}{record_id}/file", headers={**headers, "Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == content[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+
+    response = client.get(f"{RECORDS}{record_id}/file", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_identical_uploads_share_one_blob(client, login, storage):
+    headers = login(PATIENT)
+    first, second = new_record(client, headers), new_record(client, headers)
+    content = os.urandom(1000)
+    assert upload(client, headers, first, content).status_code == 200
+    assert upload(client, headers, second, content).status_code == 200
+    assert len(stored_keys()) == 1
+
+    # Still referenced by the second record
+    assert client.delete(f"{RECORDS}{first}/file", headers=headers).status_code == 200
+    assert len(stored_keys()) == 1
+    assert client.get(f"{RECORDS}{first}/file", headers=headers).status_code == 404
+    assert client.get(f"{RECORDS}{second}/file", headers=headers).content == content
+
+    assert client.delete(f"{RECORDS}{second}/file", headers=headers).status_code == 200
+    assert stored_keys() == []
+    assert client.delete(f"{RECORDS}{second}/file", headers=headers).status_code == 404
+
+
+def test_replacing_a_file_deletes_the_old_blob(client, login, storage):
+    headers = login(PATIENT)
+    record_id = new_record(client, headers)
+    assert upload(client, headers, record_id, os.urandom(1000)).status_code == 200
+    replacement = os.urandom(2000)
+    assert upload(client, headers, record_id, replacement).status_code == 200
+
+    assert len(stored_keys()) == 1
+    assert client.get(f"{RECORDS}{record_id}/file", headers=headers).content == replacement
+
+
+def test_large_upload_round_trips(client, login, storage):
+    headers = login(PATIENT)
+    record_id = new_record(client, headers)
+    # More than one S3 part (FILE_STORAGE_S3_PART_SIZE), so a multipart upload
+    content = os.urandom(settings.FILE_STORAGE_S3_PART_SIZE + file_storage.CHUNK_SIZE)
+    assert upload(client, headers, record_id, content).status_code == 200
+    assert client.get(f"{RECORDS}{record_id}/file", headers=headers).content == content
+
+
+def test_oversized_upload_leaves_nothing_behind(client, login, storage, monkeypatch):
+    monkeypatch.setattr(settings, "FILE_UPLOAD_MAX_BYTES", 1000)
+    headers = login(PATIENT)
+    record_id = new_record(client, headers)
+    assert upload(client, headers, record_id, os.urandom(1001)).status_code == 413
+    # Without a Content-Length the limit is hit while streaming, and the partial object removed
+    chunked = iter([os.urandom(600), os.urandom(600)])
+    assert upload(client, headers, record_id, chunked).status_code == 413
+    assert stored_keys() == []
@@ -0,0 +1,100 @@
+import os
+import signal
+import time
+import uuid
+
+import anyio
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.hashing import PasswordHasher, PasswordHasherBusy, password_hasher
+
+
+def crash() -> None:
+    """Dies like an OOM-killed worker."""
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, queue_size=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_killed_worker_is_replaced(hasher):
+    hashed = await hasher.hash("secret")
+    for pid in list(hasher._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    assert await hasher.verify("secret", hashed)
+    assert hasher.restarts == 1
+    assert hasher.pending == 0
+
+
+@pytest.mark.anyio
+async def test_job_that_keeps_crashing_the_pool_is_not_retried_forever(hasher):
+    with pytest.raises(PasswordHasherBusy):
+        await hasher._run(crash)
+    assert hasher.restarts == 2
+    # The next job gets a working pool
+    assert await hasher.verify("secret", await hasher.hash("secret"))
+
+
+@pytest.mark.anyio
+async def test_jobs_beyond_the_queue_are_rejected(hasher):
+    results = []
+
+    async def job():
+        try:
+            results.append(await hasher._run(time.sleep, 0.3))
+        except PasswordHasherBusy:
+            results.append("busy")
+
+    async with anyio.create_task_group() as tasks:
+        for _ in range(3):
+            tasks.start_soon(job)
+    # One running, one queued, one turned away
+    assert sorted(map(str, results)) == ["None", "None", "busy"]
+    assert hasher.rejected == 1
+
+
+def new_account(client) -> str:
+    email = f"patient-{uuid.uuid4().hex[:8]}@example.com"
+    assert client.post("/api/v1/users/signup", json={"email": email, "password": "password"}).status_code == 200
+    return email
+
+
+def login(client, email):
+    return client.post("/api/v1/users/login/access-token", data={"username": email, "password": "password"})
+
+
+def test_full_queue_answers_429_with_retry_after(client, monkeypatch):
+    email = new_account(client)
+    monkeypatch.setattr(password_hasher, "pending", password_hasher.max_pending)
+
+    response = login(client, email)
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+
+def test_login_rehashes_when_the_cost_factor_changes(client, monkeypatch):
+    from app.db.session import SessionLocal
+    from app.models import User
+
+    def stored_hash():
+        with SessionLocal() as db:
+            return db.query(User.hashed_password).filter(User.email == email).scalar()
+
+    email = new_account(client)
+    assert stored_hash().startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", settings.BCRYPT_ROUNDS + 1)
+    assert security.needs_rehash(stored_hash())
+    assert login(client, email).status_code == 200
+    assert stored_hash().startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    # The new hash still checks out
+    assert login(client, email).status_code == 200
@@ -0,0 +1,38 @@
+import uuid
+
+RECORDS = "/api/v1/health-records/"
+BOOK = "/api/v1/appointments/"
+DOCTOR = "dr_priya@example.com"
+
+
+def new_patient(client, login) -> dict:
+    email = f"patient-{uuid.uuid4().hex[:8]}@example.com"
+    response = client.post("/api/v1/users/signup", json={"email": email, "password": "password", "full_name": "New Patient"})
+    assert response.status_code == 200, response.text
+    return login(email)
+
+
+def test_doctor_sees_records_only_while_booked(client, login, calendar):
+    patient, doctor = new_patient(client, login), login(DOCTOR)
+    record = client.post(RECORDS, json={"record_type": "lab_report", "title": "Blood test"}, headers=patient).json()
+
+    def doctor_can_read():
+        single = client.get(f"{RECORDS}{record['id']}", headers=doctor).status_code
+        listed = record["id"] in [r["id"] for r in client.get(RECORDS, headers=doctor).json()]
+        assert (single == 200) == listed, single
+        return listed
+
+    assert not doctor_can_read()
+
+    doctor_id, day = calendar.doctor_id("dr_priya"), calendar.day()
+    calendar.open_slot(doctor_id, day)
+    response = client.post(
+        BOOK, json={"doctor_id": doctor_id, "date": day.isoformat(), "time": "10:00", "symptoms": "cough"},
+        headers=patient,
+    )
+    assert response.status_code == 200, response.text
+    # Pending: booked, not yet confirmed by the doctor
+    assert doctor_can_read()
+
+    assert client.put(f"{BOOK}{response.json()['id']}", json={"status": "cancelled"}, headers=patient).status_code == 200
+    assert not doctor_can_read()
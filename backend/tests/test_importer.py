@@ -0,0 +1,231 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app.services.importer import ImportFormatError, _JSONStream, detect_format, iter_json, run_import
+
+TRICKY = [
+    {"name": "Bracket ] and [ inside", "note": "a \"quoted\" word, a \\ backslash", "n": 12345},
+    {"name": "Comma, colon: brace } नमस्ते", "nested": [[1, [2]], {"k": "]"}]},
+    [],
+    "\"]",
+    9876543210,
+]
+# A different year from the other tests' slots
+SLOT_DAY, NEXT_DAY = date(2034, 5, 1), date(2034, 5, 2)
+
+
+class Trickle(io.StringIO):
+    """A stream that returns at most `size` characters per read, like a slow pipe."""
+
+    def __init__(self, value: str, size: int):
+        super().__init__(value)
+        self.size = size
+
+    def read(self, n=-1):
+        return super().read(self.size if n < 0 else min(n, self.size))
+
+
+def as_bytes(text_value: str) -> io.BytesIO:
+    return io.BytesIO(text_value.encode())
+
+
+def as_csv(rows: list) -> io.BytesIO:
+    out = io.StringIO()
+    csv.writer(out).writerows(rows)
+    return as_bytes(out.getvalue())
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_json_stream_decodes_across_chunk_boundaries(size):
+    assert list(_JSONStream(Trickle(json.dumps(TRICKY), size), chunk_size=size).array()) == TRICKY
+
+    document = json.dumps({
+        "note": "ends with ] and \" quote", "other": {"medicines": ["not this one"]},
+        "medicines": TRICKY, "after": [1, 2],
+    }, indent=2)
+    assert list(iter_json(Trickle(document, size), "medicines")) == TRICKY
+    assert list(iter_json(Trickle(document, size), "missing")) == []
+
+
+def test_json_stream_keeps_about_one_element_buffered():
+    parser = _JSONStream(io.StringIO(json.dumps([{"i": i, "pad": "x" * 100} for i in range(1000)])), chunk_size=256)
+    largest = 0
+    for _ in parser.array():
+        largest = max(largest, len(parser.buf))
+    assert largest < 1024
+
+
+@pytest.mark.parametrize("document, error", [
+    ('{"medicines": [{"a": 1}, {"b": ', "Invalid JSON"),
+    ('[{"a": 1} {"b": 2}]', "expected ',' or ']'"),
+    ('{"medicines" [1]}', "expected ':'"),
+    ('"just a string"', "expected '{'"),
+    ('[1, 2', "expected ',' or ']'"),
+])
+def test_broken_json_raises_a_clear_error(document, error):
+    records = iter_json(Trickle(document, 3), "medicines")
+    with pytest.raises(ImportFormatError, match=error):
+        list(records)
+
+
+def test_unusable_input_is_refused_before_reading(database):
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        with pytest.raises(ImportFormatError, match="Unknown format"):
+            run_import(db, "products", as_bytes("<xml/>"), "xml")
+        with pytest.raises(ImportFormatError, match="Unknown import"):
+            run_import(db, "patients", as_bytes("[]"), "json")
+    with pytest.raises(ImportFormatError, match="Cannot tell the format"):
+        detect_format("catalog.txt")
+    assert detect_format("CATALOG.JSONL") == "ndjson"
+
+
+# Database imports ------------------------------------------------------------
+
+@pytest.fixture
+def db(database):
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+        session.rollback()
+        session.execute(text("DELETE FROM products WHERE product_id LIKE 'import-test-%'"))
+        session.execute(text("DELETE FROM doctors WHERE doctor_id LIKE 'import-test-%'"))
+        session.execute(text("DELETE FROM remedies WHERE remedy_id LIKE 'import-test-%'"))
+        session.commit()
+
+
+PRODUCT_COLUMNS = [
+    "id", "name", "genericName", "brand", "category", "price", "originalPrice", "image", "description",
+    "prescriptionRequired", "inStock", "packSize", "dosage", "manufacturer", "uses", "rating", "reviews",
+]
+
+
+def product_row(product_id: str, name: str = "Calmex", uses: str = "Fever | Headache") -> list:
+    return [
+        product_id, name, "paracetamol", "Acme", "pain-relief", "25.5", "30", "-", "Tablets", "false", "true",
+        "10 tablets", "500mg", "Acme Pharma", uses, "4.5", "12",
+    ]
+
+
+def stored(db, table: str, key: str, value: str) -> dict:
+    return db.execute(text(f"SELECT * FROM {table} WHERE {key} = :v"), {"v": value}).mappings().one()
+
+
+def test_csv_uses_the_data_file_names_and_list_columns(db):
+    report = run_import(db, "products", as_csv([
+        PRODUCT_COLUMNS,
+        product_row("import-test-1"),
+        product_row("import-test-2", uses='["Cold", "Cough"]'),
+    ]), "csv")
+
+    assert (report.inserted, report.rejected) == (2, 0)
+    first = stored(db, "products", "product_id", "import-test-1")
+    assert first["generic_name"] == "paracetamol" and first["pack_size"] == "10 tablets"
+    assert first["original_price"] == 30 and first["prescription_required"] is False
+    assert first["uses"] == ["Fever", "Headache"]
+    assert stored(db, "products", "product_id", "import-test-2")["uses"] == ["Cold", "Cough"]
+
+
+def test_csv_dotted_columns_build_nested_fields(db):
+    report = run_import(db, "doctors", as_csv([
+        ["id", "name.en", "name.hi", "qualification.en", "specialization.en", "experience.en",
+         "image", "rating", "reviews", "available", "consultationFee", "languages", "description.en"],
+        ["import-test-dr", "Dr. Import", "डॉ. इम्पोर्ट", "MBBS", "ENT", "3 years",
+         "-", "4.1", "7", "true", "450", "Hindi|English", "Imported"],
+    ]), "csv")
+
+    assert report.inserted == 1, report.rejects
+    doctor = stored(db, "doctors", "doctor_id", "import-test-dr")
+    assert doctor["name"] == {"en": "Dr. Import", "hi": "डॉ. इम्पोर्ट"}
+    assert doctor["languages"] == ["Hindi", "English"]
+    assert doctor["fees"] == 450 and doctor["bio"] == {"en": "Imported"}
+
+
+def test_a_key_repeated_in_one_batch_keeps_its_last_version(db):
+    def import_csv(batch_size):
+        return run_import(db, "products", as_csv([
+            PRODUCT_COLUMNS,
+            product_row("import-test-dup", name="First"),
+            product_row("import-test-other"),
+            product_row("import-test-dup", name="Second"),
+        ]), "csv", batch_size=batch_size)
+
+    report = import_csv(batch_size=10)
+    assert (report.read, report.inserted, report.updated, report.skipped, report.batches) == (3, 2, 0, 1, 1)
+    assert stored(db, "products", "product_id", "import-test-dup")["name"] == "Second"
+
+    # Across batches the second copy is an update
+    report = import_csv(batch_size=1)
+    assert (report.inserted, report.updated, report.skipped, report.batches) == (0, 3, 0, 3)
+    assert stored(db, "products", "product_id", "import-test-dup")["name"] == "Second"
+
+
+def test_rejects_carry_their_record_number(db):
+    good = {"id": "import-test-r", "symptoms": ["hiccups"], "title": "Hiccups", "description": "-",
+            "remedies": ["Hold your breath"], "warning": "-", "audioText": "-"}
+    lines = [
+        json.dumps(good),
+        "{not json",
+        json.dumps({**good, "id": "import-test-r2", "symptoms": 5}),
+        json.dumps(["an", "array"]),
+        json.dumps({key: value for key, value in good.items() if key != "title"}),
+    ]
+    forwarded = []
+
+    report = run_import(db, "remedies", as_bytes("\n".join(lines)), "ndjson", on_reject=forwarded.append)
+
+    assert (report.read, report.inserted, report.rejected) == (5, 1, 4)
+    assert forwarded == report.rejects
+    assert [(r["record"], r["error"].split(":")[0]) for r in report.rejects] == [
+        (2, "Invalid JSON"), (3, "symptoms"), (4, "Record is not an object"), (5, "title"),
+    ]
+    # Unreadable lines have no data to echo back
+    assert report.rejects[0]["data"] is None and report.rejects[1]["data"]["id"] == "import-test-r2"
+
+
+@pytest.mark.anyio
+async def test_slot_import_keeps_the_counters_exact(calendar):
+    from app.db.session import AsyncSessionLocal, SessionLocal
+    from app.services.slot_counters import reconcile
+
+    doctor_id = calendar.doctor_id("dr_sharma")
+
+    def slots(*entries) -> io.BytesIO:
+        return as_bytes(json.dumps({"timeSlots": [
+            {"date": day.isoformat(), "slots": [
+                {"id": f"import-test-{slot_id}", "time": at, "available": available, "doctorId": doctor}
+                for slot_id, day_, at, available, doctor in entries if day_ == day
+            ]}
+            for day in (SLOT_DAY, NEXT_DAY)
+        ]}))
+
+    with SessionLocal() as db:
+        first = run_import(db, "slots", slots(
+            ("a", SLOT_DAY, "9:00 AM", True, "dr_sharma"),
+            ("b", SLOT_DAY, "9:30 AM", True, "dr_sharma"),
+            ("c", SLOT_DAY, "10:00 AM", False, "dr_sharma"),
+            ("d", NEXT_DAY, "9:00 AM", True, "dr_sharma"),
+            ("e", NEXT_DAY, "9:30 AM", True, "dr_nobody"),
+        ), "json", batch_size=2)
+        # Re-running adds only the new slot; existing ones may be booked and are left alone
+        second = run_import(db, "slots", slots(
+            ("a", SLOT_DAY, "9:00 AM", True, "dr_sharma"),
+            ("f", NEXT_DAY, "11:00 AM", True, "dr_sharma"),
+        ), "json")
+
+    assert (first.inserted, first.rejected) == (4, 1)
+    assert first.rejects[0]["error"] == "doctor_id: Unknown doctor 'dr_nobody'"
+    assert (second.inserted, second.skipped) == (1, 1)
+    assert (calendar.available(doctor_id, SLOT_DAY), calendar.available(doctor_id, NEXT_DAY)) == (2, 2)
+
+    async with AsyncSessionLocal() as db:
+        drift = await reconcile(db, dry_run=True)
+    assert [d for d in drift["date_drift"] if d["doctor_id"] == doctor_id] == []
+    assert [d for d in drift["doctor_drift"] if d["doctor_id"] == doctor_id] == []
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_scheduler import PRIORITY_INTERACTIVE, InferenceScheduler, SchedulerOverloaded
+
+
+def scheduler(max_inflight=1, max_queue=8, max_wait=5.0, expected_latency=0.1) -> InferenceScheduler:
+    return InferenceScheduler(max_inflight, max_queue, max_wait, expected_latency)
+
+
+async def settle():
+    """Let every runnable task reach its next await."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_waiters_are_served_by_priority_then_arrival():
+    llm = scheduler()
+    order = []
+
+    async def request(name, priority=1):
+        async with llm.slot(priority):
+            order.append(name)
+
+    held = await llm.acquire()
+    tasks = [asyncio.ensure_future(request("first")), asyncio.ensure_future(request("second"))]
+    await settle()
+    tasks.append(asyncio.ensure_future(request("interactive", PRIORITY_INTERACTIVE)))
+    await settle()
+    assert llm.stats()["queued"] == 3
+
+    held.release()
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "first", "second"]
+    assert llm.inflight == 0
+
+
+@pytest.mark.anyio
+async def test_full_queue_rejects_at_once():
+    llm = scheduler(max_queue=2)
+    held = await llm.acquire()
+    waiters = [asyncio.ensure_future(llm.acquire()) for _ in range(2)]
+    await settle()
+
+    with pytest.raises(SchedulerOverloaded) as overloaded:
+        await llm.acquire()
+    assert overloaded.value.retry_after >= 1
+    assert llm.rejected == 1
+
+    held.release()
+    for waiter in waiters:
+        (await waiter).release()
+    assert llm.inflight == 0
+
+
+@pytest.mark.anyio
+async def test_expected_wait_beyond_the_deadline_is_rejected_without_queueing():
+    llm = scheduler(max_wait=5.0, expected_latency=10.0)
+    held = await llm.acquire()
+    with pytest.raises(SchedulerOverloaded) as overloaded:
+        await llm.acquire()
+    assert overloaded.value.retry_after == 10
+    assert llm.stats()["queued"] == 0
+    held.release()
+
+
+@pytest.mark.anyio
+async def test_waiter_that_times_out_or_is_cancelled_leaves_no_trace():
+    llm = scheduler(max_wait=0.05, expected_latency=0.01)
+    held = await llm.acquire()
+    with pytest.raises(SchedulerOverloaded):
+        await llm.acquire()
+
+    cancelled = asyncio.ensure_future(llm.acquire())
+    await settle()
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    assert llm.stats()["queued"] == 0
+    held.release()
+    assert llm.inflight == 0
+    # The slot was not leaked to the abandoned waiters
+    (await llm.acquire()).release()
+
+
+@pytest.mark.anyio
+async def test_identical_requests_share_one_generation():
+    llm = scheduler()
+    calls = 0
+    release = asyncio.Event()
+
+    async def generate():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"remedy": "rest"}
+
+    first = asyncio.ensure_future(llm.run("headache:en", generate))
+    second = asyncio.ensure_future(llm.run("headache:en", generate))
+    impatient = asyncio.ensure_future(llm.run("headache:en", generate))
+    await settle()
+    # A caller going away does not cancel the generation the others wait for
+    impatient.cancel()
+    await settle()
+    release.set()
+
+    assert await first == await second == {"remedy": "rest"}
+    assert calls == 1 and llm.coalesced == 2
+    assert llm.inflight == 0
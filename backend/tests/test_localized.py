@@ -0,0 +1,88 @@
+from typing import get_args
+
+import pytest
+
+from app import schemas
+from app.db.readonly import localized_select
+from app.db.session import SessionLocal
+from app.models import Doctor
+from app.schemas.common import FALLBACK_LANGUAGE, Language
+
+DOCTORS = "/api/v1/doctors/"
+LANGUAGES = get_args(Language)
+# The multilingual columns DoctorLocalized flattens to one string
+TRANSLATED = ("name", "qualification", "specialization", "experience", "bio")
+
+
+@pytest.fixture(scope="module")
+def partly_translated(database):
+    """A doctor with a Hindi translation left empty and no Punjabi one."""
+    doctor = Doctor(
+        doctor_id="dr_untranslated", image="-", rating=4.0, reviews=0, availability=False, fees=300,
+        languages=["English"],
+        **{field: {"en": f"English {field}", "hi": ""} for field in TRANSLATED},
+    )
+    with SessionLocal() as db:
+        db.add(doctor)
+        db.commit()
+        doctor_id = doctor.id
+    yield doctor_id
+    with SessionLocal() as db:
+        db.query(Doctor).filter(Doctor.id == doctor_id).delete()
+        db.commit()
+
+
+@pytest.fixture
+def doctors(client, login):
+    headers = login("patient1@example.com")
+
+    def doctors(**params) -> list:
+        response = client.get(DOCTORS, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return doctors
+
+
+def test_each_language_flattens_the_same_list(doctors, partly_translated):
+    everything = doctors()
+    assert "डॉ. राजेश शर्मा" in {doctor["name"]["hi"] for doctor in everything}
+
+    for lang in LANGUAGES:
+        localized = doctors(lang=lang)
+        assert [d["id"] for d in localized] == [d["id"] for d in everything]
+        for full, flat in zip(everything, localized):
+            expected = {field: full[field].get(lang) or full[field][FALLBACK_LANGUAGE] for field in TRANSLATED}
+            assert {field: flat[field] for field in TRANSLATED} == expected
+            # Everything else passes through untouched
+            assert {k: v for k, v in flat.items() if k not in TRANSLATED} == {
+                k: v for k, v in full.items() if k not in TRANSLATED
+            }
+
+
+def test_missing_translations_fall_back_to_english(doctors, partly_translated):
+    for lang in LANGUAGES:
+        (doctor,) = [d for d in doctors(lang=lang) if d["id"] == partly_translated]
+        assert doctor["name"] == "English name" and doctor["bio"] == "English bio"
+
+
+def test_unknown_language(client, login, partly_translated):
+    response = client.get(DOCTORS, params={"lang": "fr"}, headers=login("patient1@example.com"))
+    assert response.status_code == 422
+
+    # Below the API's validation the projection itself still falls back to English
+    with SessionLocal() as db:
+        query = localized_select(Doctor, schemas.DoctorLocalized, "fr").where(Doctor.doctor_id == "dr_sharma")
+        row = db.execute(query).one()
+    assert row.name == "Dr. Rajesh Sharma" and row.specialization == "General Physician"
+
+
+def test_available_doctors_are_localized(client, login):
+    headers = login("patient1@example.com")
+    everything = {d["id"]: d for d in client.get(DOCTORS, headers=headers).json()}
+
+    available = client.get("/api/v1/doctors/available", params={"lang": "pa"}, headers=headers).json()
+    assert available
+    for doctor in available:
+        assert doctor["name"] == everything[doctor["id"]]["name"]["pa"]
+        assert doctor["available_slots_count"] > 0
@@ -0,0 +1,94 @@
+import re
+from collections import defaultdict
+
+import pytest
+
+import main
+from app.core import metrics as metrics_module
+from app.core.config import settings
+from app.core.metrics import MetricsRegistry
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"(?:,|$)')
+RECORD = "/api/v1/health-records/{id}"
+
+
+def parse(text: str) -> dict:
+    """Prometheus text format -> {metric name: [(labels, value)]}, checking the syntax on the way."""
+    types, samples = {}, defaultdict(list)
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ", 3)
+            assert kind in ("counter", "gauge", "histogram"), line
+            types[name] = kind
+            continue
+        if line.startswith("# HELP "):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"unparseable line {line!r}"
+        name, labels, value = match.groups()
+        parsed = dict(LABEL.findall(labels or ""))
+        assert LABEL.sub("", labels or "") == "", f"bad labels in {line!r}"
+        family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in types else name
+        assert family in types, f"{name} has no TYPE"
+        samples[name].append((parsed, float(value)))
+    return samples
+
+
+def histogram(samples: dict, name: str, **labels) -> tuple:
+    """(cumulative bucket counts, sum, count) of one series, checking they agree."""
+    def matching(suffix):
+        return [(l, v) for l, v in samples.get(name + suffix, []) if labels.items() <= l.items()]
+
+    buckets = [v for _, v in matching("_bucket")]
+    (_, total), = matching("_sum")
+    (_, count), = matching("_count")
+    assert buckets == sorted(buckets) and buckets[-1] == count
+    return buckets, total, count
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry in place of the process-wide one."""
+    registry = MetricsRegistry(slow_query_ms=0, slow_query_samples=10)
+    monkeypatch.setattr(metrics_module, "metrics", registry)
+    monkeypatch.setattr(main, "metrics", registry)
+    return registry
+
+
+def test_metrics_parse_and_use_route_templates(client, login, registry):
+    headers = login("patient1@example.com")
+    for record_id in (999991, 999992, 999993):
+        assert client.get(f"/api/v1/health-records/{record_id}", headers=headers).status_code == 404
+    assert client.get("/no/such/page/123").status_code == 404
+
+    samples = parse(client.get("/metrics").text)
+
+    routes = {labels["route"] for labels, _ in samples["http_request_duration_seconds_count"]}
+    assert RECORD in routes and "unmatched" in routes
+    assert not any("99999" in route or "/no/such" in route for route in routes)
+    _, _, count = histogram(samples, "http_request_duration_seconds", route=RECORD, status="4xx")
+    assert count == 3
+    # The slow query threshold is 0 here, so every statement is sampled
+    assert samples["sql_slow_queries_total"][0][1] > 0
+    assert {labels["engine"] for labels, _ in samples["db_pool_checkouts_total"]} == {"sync", "async"}
+
+
+def test_sql_timing_follows_the_sample_rate(client, login, registry, monkeypatch):
+    headers = login("patient1@example.com")
+
+    monkeypatch.setattr(settings, "METRICS_SQL_SAMPLE_RATE", 1.0)
+    client.get("/api/v1/health-records/999991", headers=headers)
+    samples = parse(registry.render())
+    _, statements, count = histogram(samples, "http_request_sql_statements", route=RECORD)
+    assert count == 1 and statements >= 1
+    assert histogram(samples, "http_request_sql_duration_seconds", route=RECORD)[2] == 1
+
+    monkeypatch.setattr(settings, "METRICS_SQL_SAMPLE_RATE", 0)
+    slow_queries = registry.slow_query_total
+    client.get("/api/v1/health-records/999992", headers=headers)
+    samples = parse(registry.render())
+    # Latency still recorded, SQL neither counted nor timed
+    assert histogram(samples, "http_request_duration_seconds", route=RECORD, status="4xx")[2] == 2
+    assert histogram(samples, "http_request_sql_statements", route=RECORD)[2] == 1
+    assert registry.slow_query_total == slow_queries
@@ -0,0 +1,96 @@
+import uuid
+from datetime import date, time
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import CURSOR_HEADER, decode_cursor, encode_cursor
+from app.models import Appointment
+
+KEY = [Appointment.date, Appointment.time, Appointment.id]
+
+
+def walk(client, url, headers, limit, **params) -> list:
+    """Every page of `url` by following X-Next-Cursor; returns the ids in order."""
+    ids, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200, response.text
+        page = [row["id"] for row in response.json()]
+        cursor = response.headers.get(CURSOR_HEADER)
+        ids += page
+        if cursor is None:
+            return ids
+        assert len(page) == limit
+
+
+def new_patient(client, login) -> dict:
+    email = f"patient-{uuid.uuid4().hex[:8]}@example.com"
+    assert client.post("/api/v1/users/signup", json={"email": email, "password": "password"}).status_code == 200
+    return login(email)
+
+
+def test_cursor_round_trips_dates_and_times():
+    values = [date(2031, 5, 1), time(9, 30), 42]
+    assert decode_cursor(encode_cursor(values), KEY) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 json!",
+    encode_cursor(["2031-05-01", "09:30"]),  # too short
+    encode_cursor(["2031-05-01", "09:30", "42"]),  # id is not an int
+    encode_cursor(["yesterday", "09:30", 42]),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, KEY)
+    assert error.value.status_code == 400
+
+
+def test_cursor_pages_match_the_full_list(client, login):
+    headers = login("patient1@example.com")
+    everything = [p["id"] for p in client.get("/api/v1/shop/", params={"limit": 1000}, headers=headers).json()]
+    assert len(everything) > 1
+    assert walk(client, "/api/v1/shop/", headers, limit=1) == everything
+    assert client.get("/api/v1/shop/", params={"cursor": "garbage"}, headers=headers).status_code == 400
+
+
+def test_appointments_page_on_date_time_and_id(client, login, calendar):
+    patient = new_patient(client, login)
+    doctor_id = calendar.doctor_id()
+    first, second = calendar.day(), calendar.day()
+    # Booked out of calendar order; two on the same day
+    for day, at in [(second, "09:00"), (first, "11:00"), (first, "09:00"), (second, "08:00")]:
+        calendar.open_slot(doctor_id, day, time.fromisoformat(at))
+        response = client.post(
+            "/api/v1/appointments/",
+            json={"doctor_id": doctor_id, "date": day.isoformat(), "time": at, "symptoms": "cough"},
+            headers=patient,
+        )
+        assert response.status_code == 200, response.text
+
+    listed = client.get("/api/v1/appointments/", headers=patient).json()
+    assert [(a["date"], a["time"]) for a in listed] == [
+        (first.isoformat(), "9:00 AM"), (first.isoformat(), "11:00 AM"),
+        (second.isoformat(), "8:00 AM"), (second.isoformat(), "9:00 AM"),
+    ]
+    assert walk(client, "/api/v1/appointments/", patient, limit=1) == [a["id"] for a in listed]
+    assert walk(client, "/api/v1/appointments/", patient, limit=3) == [a["id"] for a in listed]
+
+
+def test_records_created_while_paging_are_neither_repeated_nor_skipped(client, login):
+    patient = new_patient(client, login)
+
+    def create(title):
+        return client.post("/api/v1/health-records/", json={"record_type": "note", "title": title}, headers=patient).json()["id"]
+
+    older = [create(f"note {i}") for i in range(4)]
+    response = client.get("/api/v1/health-records/", params={"limit": 2}, headers=patient)
+    assert [r["id"] for r in response.json()] == older[::-1][:2]
+    # Newest first: a record added now sorts before the cursor, so offsets would shift
+    create("newer")
+    rest = client.get(
+        "/api/v1/health-records/", params={"limit": 2, "cursor": response.headers[CURSOR_HEADER]}, headers=patient,
+    )
+    assert [r["id"] for r in rest.json()] == older[::-1][2:]
+    assert CURSOR_HEADER not in rest.headers
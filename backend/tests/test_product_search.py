@@ -0,0 +1,91 @@
+import pytest
+
+from app.db.session import SessionLocal
+from app.models import Product
+
+SEARCH = "/api/v1/shop/search"
+PREFIX = "search-test-"
+
+
+@pytest.fixture(scope="module")
+def products(database):
+    """product_id suffix -> id. Inserted weakest match first, so ranking is not insertion order."""
+    rows = [
+        # "zorvamol" only in the uses (weight C)
+        Product(product_id=f"{PREFIX}vitamin", name="Vitamin C", brand="Nutri", category="supplements",
+                price=200, uses=["zorvamol deficiency"]),
+        # in the brand (weight B)
+        Product(product_id=f"{PREFIX}cold", name="Cold Relief", brand="Zorvamol Labs", category="cold-flu",
+                price=120),
+        # in the name once (weight A)
+        Product(product_id=f"{PREFIX}syrup", name="Zorvamol Kids Syrup", generic_name="paracetamol", brand="Acme",
+                category="pain-relief", price=80, prescription_required=True),
+        # in the name and the generic name
+        Product(product_id=f"{PREFIX}tablet", name="Zorvamol 500", generic_name="zorvamol", brand="Acme",
+                category="pain-relief", price=40),
+    ]
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+        ids = {row.product_id[len(PREFIX):]: row.id for row in rows}
+    yield ids
+    with SessionLocal() as db:
+        db.query(Product).filter(Product.product_id.startswith(PREFIX)).delete(synchronize_session=False)
+        db.commit()
+
+
+@pytest.fixture
+def search(client, login):
+    headers = login("patient1@example.com")
+
+    def search(**params) -> dict:
+        response = client.get(SEARCH, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return search
+
+
+def names(result) -> list:
+    return [item["product_id"][len(PREFIX):] for item in result["items"]]
+
+
+def test_matches_are_ranked_by_field_weight(products, search):
+    assert names(search(q="zorvamol")) == ["tablet", "syrup", "cold", "vitamin"]
+
+
+def test_every_word_matches_as_a_prefix(products, search):
+    assert names(search(q="zorv")) == ["tablet", "syrup", "cold", "vitamin"]
+    # Words are ANDed
+    assert names(search(q="Zorv kid")) == ["syrup"]
+    assert names(search(q="zorv nosuchword")) == []
+
+
+def test_filters_narrow_the_matches(products, search):
+    assert names(search(q="zorv", category="pain-relief")) == ["tablet", "syrup"]
+    assert names(search(q="zorv", min_price=50, max_price=150)) == ["syrup", "cold"]
+    assert names(search(q="zorv", prescription_required=True)) == ["syrup"]
+
+
+def test_facets_count_every_match_not_just_the_page(products, search):
+    result = search(q="zorv", limit=1)
+
+    assert result["total"] == 4 and names(result) == ["tablet"]
+    assert result["facets"]["category"] == {"pain-relief": 2, "cold-flu": 1, "supplements": 1}
+    assert result["facets"]["brand"] == {"Acme": 2, "Zorvamol Labs": 1, "Nutri": 1}
+    assert result["facets"]["prescription_required"] == {"true": 1, "false": 3}
+    # Past the last page: no items, the counts are still there
+    beyond = search(q="zorv", skip=10)
+    assert beyond["items"] == [] and beyond["total"] == 4
+    assert beyond["facets"]["category"] == result["facets"]["category"]
+
+
+def test_query_without_words_matches_nothing(products, search):
+    empty_facets = {"category": {}, "brand": {}, "prescription_required": {}, "in_stock": {}}
+    for q in ("!!", "++ --"):
+        assert search(q=q) == {"total": 0, "facets": empty_facets, "items": []}
+
+
+def test_negative_skip_is_rejected(products, client, login):
+    response = client.get(SEARCH, params={"q": "zorv", "skip": -1}, headers=login("patient1@example.com"))
+    assert response.status_code == 422
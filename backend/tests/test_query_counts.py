@@ -0,0 +1,54 @@
+"""
+List endpoints must issue the same number of SQL statements whatever the
+number of rows they return; more statements for more rows is an N+1 load.
+"""
+from datetime import date, time, timedelta
+
+import pytest
+
+from app import models
+from app.core.security import get_password_hash
+from app.db.query_counter import assert_constant_query_count
+from app.db.session import SessionLocal, async_engine, engine
+
+ROWS = 20
+
+
+@pytest.fixture(scope="module")
+def many_patients(database):
+    """ROWS patients, each with one confirmed appointment with dr_sharma and one health record."""
+    with SessionLocal() as db:
+        doctor_id = db.query(models.Doctor.id).filter(models.Doctor.doctor_id == "dr_sharma").scalar()
+        hashed = get_password_hash("password")
+        for i in range(ROWS):
+            patient = models.User(
+                email=f"querycount{i}@example.com", full_name=f"Query Count {i}",
+                hashed_password=hashed, role="patient", is_active=True,
+            )
+            db.add(patient)
+            db.flush()
+            db.add(models.Appointment(
+                doctor_id=doctor_id, patient_id=patient.id, date=date(2030, 1, 1) + timedelta(days=i),
+                time=time(10, 0), available=False, status="confirmed", symptoms="checkup",
+            ))
+            db.add(models.HealthRecord(patient_id=patient.id, record_type="lab_report", title=f"Report {i}"))
+        db.commit()
+
+
+@pytest.mark.parametrize("path, account", [
+    ("/api/v1/doctors/", "patient1@example.com"),
+    ("/api/v1/shop/", "patient1@example.com"),
+    ("/api/v1/remedies/", "patient1@example.com"),
+    ("/api/v1/appointments/", "dr_sharma@example.com"),
+    ("/api/v1/health-records/", "dr_sharma@example.com"),
+])
+def test_list_endpoint_query_count_is_constant(client, login, many_patients, path, account):
+    headers = login(account)
+
+    def run(limit):
+        response = client.get(path, params={"limit": limit}, headers=headers)
+        assert response.status_code == 200, response.text
+        return len(response.json())
+
+    # Fewer than ROWS rows (e.g. two seeded doctors) still gives two sizes to compare
+    assert_constant_query_count([engine, async_engine], run, sizes=(1, ROWS))
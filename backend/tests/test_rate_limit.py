@@ -0,0 +1,141 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import main
+from app.api import deps
+from app.core import rate_limit as rate_limit_module
+from app.core.config import settings
+from app.core.rate_limit import RateLimited, RateLimiter, parse_limit
+
+FIVE_PER_MINUTE = parse_limit("5/minute")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Both clocks the buckets read: monotonic (memory) and the Redis TIME of fakeredis."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limit_module.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "redis"])
+def limiter(request):
+    limiter = RateLimiter()
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")  # EVALSHA
+        limiter.use_redis(fakeredis.FakeAsyncRedis())
+    return limiter
+
+
+async def allowed(limiter, identity="1.2.3.4", limit=FIVE_PER_MINUTE, cost=1) -> bool:
+    try:
+        await limiter.hit("test", identity, limit, cost)
+    except RateLimited:
+        return False
+    return True
+
+
+@pytest.mark.anyio
+async def test_burst_then_429_with_retry_after(limiter, clock):
+    assert [await allowed(limiter) for _ in range(5)] == [True] * 5
+    with pytest.raises(RateLimited) as rejected:
+        await limiter.hit("test", "1.2.3.4", FIVE_PER_MINUTE)
+    # One token every 12 seconds
+    assert rejected.value.retry_after == 12
+    assert limiter.stats()["rejected"] == {"test": 1}
+    assert limiter.stats()["backend_errors"] == 0
+    # Other clients have their own bucket
+    assert await allowed(limiter, "5.6.7.8")
+
+
+@pytest.mark.anyio
+async def test_tokens_refill_at_the_rate_up_to_the_burst(limiter, clock):
+    for _ in range(5):
+        await allowed(limiter)
+    clock[0] += 11
+    assert not await allowed(limiter)
+    clock[0] += 1
+    assert await allowed(limiter)
+    assert not await allowed(limiter)
+
+    # Idle for an hour: back to a full bucket, not 300 tokens
+    clock[0] += 3600
+    assert [await allowed(limiter) for _ in range(6)] == [True] * 5 + [False]
+
+
+@pytest.mark.anyio
+async def test_cost_takes_several_tokens(limiter, clock):
+    assert await allowed(limiter, cost=3)
+    with pytest.raises(RateLimited) as rejected:
+        await limiter.hit("test", "1.2.3.4", FIVE_PER_MINUTE, cost=3)
+    assert rejected.value.retry_after == 12
+    assert await allowed(limiter, cost=2)
+
+
+@pytest.mark.anyio
+async def test_unreachable_redis_falls_back_to_memory(clock):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    server.connected = False
+    limiter = RateLimiter()
+    limiter.use_redis(fakeredis.FakeAsyncRedis(server=server))
+
+    assert [await allowed(limiter) for _ in range(6)] == [True] * 5 + [False]
+    assert limiter.stats()["backend_errors"] == 6
+    assert limiter.stats()["memory_buckets"] == 1
+
+
+def test_memory_buckets_forget_full_buckets_over_max_keys(clock):
+    buckets = rate_limit_module.MemoryBuckets(max_keys=2)
+    buckets.take("a", FIVE_PER_MINUTE)
+    buckets.take("b", FIVE_PER_MINUTE)
+    clock[0] += 60  # "a" and "b" are full again
+    buckets.take("c", FIVE_PER_MINUTE)
+    assert len(buckets) == 1
+
+
+@pytest.fixture
+def rate_limited_app(monkeypatch):
+    """A small app using the dependency, with main's 429 handler and its own limiter."""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(deps, "rate_limiter", RateLimiter())
+    app = FastAPI()
+    app.add_exception_handler(RateLimited, main.rate_limited_handler)
+
+    @app.get("/by-ip", dependencies=[Depends(deps.rate_limit("test-ip", "2/minute"))])
+    async def by_ip():
+        return {}
+
+    @app.post("/by-account", dependencies=[Depends(deps.rate_limit("test-account", "2/minute", per="account"))])
+    async def by_account():
+        return {}
+
+    return TestClient(app)
+
+
+def test_dependency_answers_429_with_retry_after(rate_limited_app):
+    statuses = [rate_limited_app.get("/by-ip").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    response = rate_limited_app.get("/by-ip")
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["retry-after"]) <= 30
+    assert response.json() == {"detail": "Too many requests, please retry later"}
+
+
+def test_account_limit_ignores_the_case_of_the_username(rate_limited_app):
+    statuses = [
+        rate_limited_app.post("/by-account", data={"username": name, "password": "x"}).status_code
+        for name in ("asha@example.com", "Asha@Example.com", "ASHA@EXAMPLE.COM")
+    ]
+    assert statuses == [200, 200, 429]
+    assert rate_limited_app.post("/by-account", data={"username": "ravi@example.com", "password": "x"}).status_code == 200
+
+
+def test_disabled_rate_limits_add_no_dependency(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    assert deps.rate_limit("test-ip", "1/minute") is deps._no_rate_limit
+    assert deps.rate_limit("test-ip", "") is deps._no_rate_limit
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.core import cache as cache_module
+from app.core.cache import LRUCache
+from app.services import remedy_cache as remedy_cache_module
+from app.services.remedy_cache import RemedyCache
+
+
+class BrokenSession:
+    """Stands in for AsyncSessionLocal() while the database is unreachable."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, *args, **kwargs):
+        raise OperationalError(str(statement), {}, ConnectionRefusedError("connection refused"))
+
+
+@pytest.fixture
+def broken_database(monkeypatch):
+    monkeypatch.setattr(remedy_cache_module, "AsyncSessionLocal", BrokenSession)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.anyio
+async def test_write_failure_keeps_the_answer_in_memory(broken_database):
+    cache = RemedyCache(maxsize=10, ttl_seconds=60)
+    key = cache.key("Headache", "hi")
+
+    await cache.set(key, {"remedy": "rest"})
+
+    assert await cache.get(key) == {"remedy": "rest"}
+    assert cache.stores == 0
+    assert cache.errors == 1
+
+
+@pytest.mark.anyio
+async def test_read_failure_is_a_miss(broken_database):
+    cache = RemedyCache(maxsize=10, ttl_seconds=60)
+
+    assert await cache.get(cache.key("cough", "pa")) is None
+    assert cache.misses == 1
+    assert cache.errors == 1
+
+
+def test_key_normalizes_the_symptom():
+    assert RemedyCache.key("Cold and cough!", "en", "m") == RemedyCache.key("cough, COLD", "en", "m")
+
+
+def test_lru_evicts_the_least_recently_used(clock):
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+
+    clock[0] += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock[0] += 60
+    assert cache.get("default") is None
+    assert cache.stats()["misses"] == 2
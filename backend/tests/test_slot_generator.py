@@ -0,0 +1,100 @@
+from datetime import date, time, timedelta
+
+import pytest
+
+from app.db.session import SessionLocal
+from app.models import ScheduleException, ScheduleRule
+from app.services.slot_generator import generate_slots_sync
+
+# A week no other test uses
+MONDAY = date(2032, 3, 1)
+TUESDAY, WEDNESDAY = MONDAY + timedelta(days=1), MONDAY + timedelta(days=2)
+BOOK = "/api/v1/appointments/"
+
+
+@pytest.fixture
+def doctor_id(calendar):
+    """dr_priya, with no schedule rules or exceptions left behind."""
+    doctor_id = calendar.doctor_id("dr_priya")
+    yield doctor_id
+    with SessionLocal() as db:
+        db.query(ScheduleRule).filter(ScheduleRule.doctor_id == doctor_id).delete()
+        db.query(ScheduleException).filter(ScheduleException.date_from >= MONDAY).delete()
+        db.commit()
+        generate_slots_sync(db, start=MONDAY, days=7, doctor_ids=[doctor_id])
+
+
+def add(*rows) -> None:
+    with SessionLocal() as db:
+        db.add_all(rows)
+        db.commit()
+
+
+def generate(doctor_id) -> tuple:
+    with SessionLocal() as db:
+        report = generate_slots_sync(db, start=MONDAY, days=7, doctor_ids=[doctor_id])
+    return report["added"], report["retired"]
+
+
+def open_times(calendar, doctor_id, day) -> list:
+    return [row["time"].strftime("%H:%M") for row in calendar.rows(doctor_id, day) if row["available"]]
+
+
+def weekday_rule(doctor_id) -> ScheduleRule:
+    # Mon-Wed, two 30-minute slots a day
+    return ScheduleRule(
+        doctor_id=doctor_id, weekdays=[1, 2, 3], start_time=time(10, 0), end_time=time(11, 0),
+        slot_minutes=30, valid_from=MONDAY,
+    )
+
+
+def test_rules_expand_into_counted_slots_once(calendar, doctor_id):
+    add(weekday_rule(doctor_id))
+
+    assert generate(doctor_id) == (6, 0)
+    for day in (MONDAY, TUESDAY, WEDNESDAY):
+        assert open_times(calendar, doctor_id, day) == ["10:00", "10:30"]
+        assert calendar.available(doctor_id, day) == 2
+    assert calendar.rows(doctor_id, MONDAY + timedelta(days=3)) == []
+    # Nothing changed: nothing to do
+    assert generate(doctor_id) == (0, 0)
+
+
+def test_leave_and_holidays_retire_open_slots(calendar, doctor_id):
+    add(weekday_rule(doctor_id))
+    generate(doctor_id)
+
+    add(
+        ScheduleException(doctor_id=doctor_id, date_from=TUESDAY, date_to=TUESDAY, reason="Leave"),
+        # Holidays apply to every doctor; only the overlapped slot goes
+        ScheduleException(date_from=WEDNESDAY, date_to=WEDNESDAY, start_time=time(10, 15), end_time=time(10, 45)),
+    )
+    assert generate(doctor_id) == (0, 4)
+    assert open_times(calendar, doctor_id, MONDAY) == ["10:00", "10:30"]
+    assert calendar.rows(doctor_id, TUESDAY) == [] and calendar.available(doctor_id, TUESDAY) == 0
+    assert open_times(calendar, doctor_id, WEDNESDAY) == []
+
+
+def test_booked_slots_outlive_their_rule(client, login, calendar, doctor_id):
+    add(weekday_rule(doctor_id))
+    generate(doctor_id)
+    patient = login("patient3@example.com")
+    booking = {"doctor_id": doctor_id, "date": MONDAY.isoformat(), "symptoms": "cough"}
+    booked = client.post(BOOK, json={**booking, "time": "10:00"}, headers=patient)
+    assert booked.status_code == 200, booked.text
+    cancelled = client.post(BOOK, json={**booking, "time": "10:30"}, headers=patient).json()
+    assert client.put(f"{BOOK}{cancelled['id']}", json={"status": "cancelled"}, headers=patient).status_code == 200
+
+    # The reopened 10:30 slot is not generated twice next to the cancelled booking
+    assert generate(doctor_id) == (0, 0)
+    assert open_times(calendar, doctor_id, MONDAY) == ["10:30"]
+
+    with SessionLocal() as db:
+        db.query(ScheduleRule).filter(ScheduleRule.doctor_id == doctor_id).delete()
+        db.commit()
+    # Tue and Wed go entirely, Monday keeps the booking and the cancelled history
+    assert generate(doctor_id) == (0, 5)
+    assert [(row["time"].strftime("%H:%M"), row["status"]) for row in calendar.rows(doctor_id, MONDAY)] == [
+        ("10:00", "pending"), ("10:30", "cancelled"),
+    ]
+    assert calendar.available(doctor_id, MONDAY) == 0
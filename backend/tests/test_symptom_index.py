@@ -0,0 +1,175 @@
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.symptom_index import SymptomIndex, SymptomIndexHolder
+from app.services.text import is_negated
+
+REMEDIES = [
+    {"remedy_id": "headache", "symptoms": ["headache", "head pain", "migraine"], "title": "Headache Relief"},
+    {"remedy_id": "fever", "symptoms": ["fever", "high temperature", "body heat"], "title": "Fever Management"},
+    {"remedy_id": "cold", "symptoms": ["cold", "runny nose"], "title": "Cold Care"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SymptomIndex(REMEDIES)
+
+
+def matched(index, query):
+    match = index.match(query, min_confidence=0.85)
+    return match.remedy["remedy_id"] if match else None
+
+
+@pytest.mark.parametrize("query, remedy_id", [
+    ("headache", "headache"),
+    ("I have a bad headache since morning", "headache"),
+    ("hedache", "headache"),
+    ("migrane", "headache"),
+    ("high temprature", "fever"),
+    ("sir dard", "headache"),
+    ("बुखार", "fever"),
+    ("runny nose and cold", "cold"),
+])
+def test_matches(index, query, remedy_id):
+    assert matched(index, query) == remedy_id
+
+
+@pytest.mark.parametrize("query", [
+    # "sever" is one edit from "fever"
+    "severe chest pain and sweating",
+    "sever pain",
+    # short words need an exact spelling: "colt" is not "cold"
+    "colt",
+    "fevr",
+    "tooth pain",
+])
+def test_near_misses_on_short_words_do_not_match(index, query):
+    assert matched(index, query) is None
+
+
+@pytest.mark.parametrize("query", [
+    "no fever",
+    "not a headache",
+    "I don't have a headache",
+    "fever without cold",
+    "bukhar nahi hai",
+    "ਬੁਖਾਰ ਨਹੀਂ",
+])
+def test_negated_queries_are_left_to_the_llm(index, query):
+    assert is_negated(query)
+    assert matched(index, query) is None
+
+
+def test_search_still_lists_negated_phrases(index):
+    # Only match() answers for the patient; search() is a plain lookup
+    assert index.search("no fever", limit=1)[0].remedy["remedy_id"] == "fever"
+
+
+def test_plain_symptoms_are_not_negated():
+    assert not is_negated("nausea and a runny nose")
+    assert not is_negated("सिर दर्द")
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return None  # no remedies data version row
+
+
+class FakeSession:
+    """Answers the queries of ensure_fresh(), or fails like a lost connection."""
+
+    def __init__(self, remedies, fail=False):
+        self.remedies = remedies
+        self.fail = fail
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        if self.fail:
+            raise ConnectionError("connection lost")
+        return FakeResult(self.remedies)
+
+
+def remedy_rows():
+    return [
+        SimpleNamespace(
+            id=i, remedy_id=r["remedy_id"], symptoms=r["symptoms"], title=r["title"],
+            description="", remedies_list=[], warning=None, audio_text=None,
+        )
+        for i, r in enumerate(REMEDIES, 1)
+    ]
+
+
+@pytest.mark.anyio
+async def test_failed_reload_is_retried_on_the_next_request():
+    holder = SymptomIndexHolder()
+    broken = FakeSession(remedy_rows(), fail=True)
+    with pytest.raises(ConnectionError):
+        await holder.ensure_fresh(broken)
+    assert holder.stale and not holder.refreshing
+
+    db = FakeSession(remedy_rows())
+    index = await holder.ensure_fresh(db)
+    assert db.queries == 2 and not holder.stale  # data version, remedies
+    assert index.match("fever").remedy["remedy_id"] == "fever"
+
+    # Fresh now: no further queries
+    assert await holder.ensure_fresh(db) is index
+    assert db.queries == 2
+
+
+@pytest.mark.anyio
+async def test_change_during_a_reload_keeps_the_index_stale():
+    holder = SymptomIndexHolder()
+
+    class ChangingSession(FakeSession):
+        async def execute(self, statement):
+            holder.mark_stale()  # a remedy written while the reload runs
+            return await super().execute(statement)
+
+    await holder.ensure_fresh(ChangingSession(remedy_rows()))
+    assert holder.stale
+
+
+@pytest.mark.anyio
+async def test_remedies_imported_by_another_process_are_picked_up(database, monkeypatch):
+    from app.core.config import settings
+    from app.db.session import AsyncSessionLocal, SessionLocal
+    from app.services.importer import run_import
+
+    holder = SymptomIndexHolder()
+    async with AsyncSessionLocal() as db:
+        await holder.ensure_fresh(db)
+    assert holder.index.match("chilblains") is None
+
+    # What `python -m app.services.importer remedies ...` does; it cannot reach
+    # this holder, only the database
+    remedy = {
+        "id": "test-chilblains", "symptoms": ["chilblains"], "title": "Chilblains",
+        "description": "Itchy swelling after cold", "remedies": ["Keep warm"],
+        "warning": "See a doctor if the skin breaks", "audioText": "Keep warm.",
+    }
+    stream = io.BytesIO(json.dumps({"remedies": [remedy]}).encode())
+    with SessionLocal() as db:
+        assert run_import(db, "remedies", stream, "json").inserted == 1
+
+    async with AsyncSessionLocal() as db:
+        # Not checked again before the interval is up
+        assert (await holder.ensure_fresh(db)).match("chilblains") is None
+        monkeypatch.setattr(settings, "SYMPTOM_INDEX_VERSION_CHECK_SECONDS", 0)
+        index = await holder.ensure_fresh(db)
+    assert index.match("chilblains").remedy["remedy_id"] == "test-chilblains"
+    assert not holder.stale